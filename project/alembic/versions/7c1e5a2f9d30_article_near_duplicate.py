@@ -0,0 +1,37 @@
+"""article near-duplicate (simhash, canonical_id)
+
+Revision ID: 7c1e5a2f9d30
+Revises: 369756494b78
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5a2f9d30'
+down_revision: Union[str, None] = '369756494b78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('article', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('article', sa.Column('canonical_id', sa.BigInteger(), nullable=True))
+    op.create_index('ix_article_canonical_id', 'article', ['canonical_id'])
+    op.create_foreign_key(
+        'fk_article_canonical_id', 'article', 'article',
+        ['canonical_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_article_canonical_id', 'article', type_='foreignkey')
+    op.drop_index('ix_article_canonical_id', table_name='article')
+    op.drop_column('article', 'canonical_id')
+    op.drop_column('article', 'simhash')
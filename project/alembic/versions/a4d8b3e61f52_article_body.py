@@ -0,0 +1,36 @@
+"""article_body table
+
+Revision ID: a4d8b3e61f52
+Revises: 7c1e5a2f9d30
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8b3e61f52'
+down_revision: Union[str, None] = '7c1e5a2f9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'article_body',
+        sa.Column('article_id', sa.BigInteger(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('article_body')
@@ -0,0 +1,28 @@
+"""article (topic, published, canonical_id) index
+
+Revision ID: c2f7e9a04b18
+Revises: a4d8b3e61f52
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7e9a04b18'
+down_revision: Union[str, None] = 'a4d8b3e61f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_article_topic_published', 'article', ['topic', 'published', 'canonical_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_topic_published', table_name='article')
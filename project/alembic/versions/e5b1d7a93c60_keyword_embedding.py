@@ -0,0 +1,39 @@
+"""keyword_embedding table
+
+Revision ID: e5b1d7a93c60
+Revises: c2f7e9a04b18
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1d7a93c60'
+down_revision: Union[str, None] = 'c2f7e9a04b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'keyword_embedding',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('model', 'name', name='uq_keyword_embedding_model_name'),
+    )
+    op.create_index(op.f('ix_keyword_embedding_id'), 'keyword_embedding', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_keyword_embedding_id'), table_name='keyword_embedding')
+    op.drop_table('keyword_embedding')
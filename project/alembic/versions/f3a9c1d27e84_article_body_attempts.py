@@ -0,0 +1,31 @@
+"""article_body.attempts (retry transient body fetch failures)
+
+Revision ID: f3a9c1d27e84
+Revises: e5b1d7a93c60
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d27e84'
+down_revision: Union[str, None] = 'e5b1d7a93c60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('article_body', sa.Column('attempts', sa.Integer(), nullable=False, server_default='1'))
+    # 예전에는 타임아웃·5xx도 영구 'error'로 기록됐으므로 한 번 더 기회를 줌
+    op.execute("UPDATE article_body SET status = 'retry' WHERE status = 'error'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE article_body SET status = 'error' WHERE status = 'retry'")
+    op.drop_column('article_body', 'attempts')
@@ -5,12 +5,12 @@ from fastapi import FastAPI, Request, Response
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from .routes import cluster, knowledge_map, news, notes, scrap, trend, user
 from starlette.concurrency import run_in_threadpool
-from clustering.pipeline_by_topic import run_all_topics_pipeline
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 #from tasks.user_scrap_pipeline import generate_user_scrap_knowledge_maps
 from database.connection import SessionLocal
 from collector.rss_collector import parse_and_store
+from collector.body_fetcher import fetch_article_bodies
 from tasks.daily_trend import generate_daily_trend
 from fastapi_cache import FastAPICache            # 캐시 초기화
 from fastapi_cache.backends.redis import RedisBackend
@@ -19,6 +19,10 @@ from .config import settings
 import traceback
 import redis
 import asyncio
+import os
+
+# 기사 본문 수집 단계 (선택): ARTICLE_BODY_FETCH=true 일 때만 스케줄 등록
+ARTICLE_BODY_FETCH = os.getenv("ARTICLE_BODY_FETCH", "false").lower() == "true"
 
 
 def hourly_clustering():
@@ -28,10 +32,10 @@ def hourly_clustering():
     2) 모든 토픽에 대해 run_all_topics_pipeline 실행 (임베딩→클러스터링→키워드 추출)
     3) 사용자 스크랩 기반 지식맵 생성
     """
-    # 1) RSS 크롤링 & DB 저장
+    # 1) RSS 크롤링 & DB 저장 (수집 주기가 돌아온 피드만)
     print("⏳ [Pipeline] RSS 크롤링 시작…")
     try:
-        parse_and_store()
+        parse_and_store(only_due=True)
         print("✅ [Pipeline] RSS 크롤링 완료.")
     except Exception as e:
         print(f"⚠️ [Pipeline] RSS 크롤링 중 에러 발생: {e}")
@@ -40,6 +44,8 @@ def hourly_clustering():
     # 2) 토픽별 전체 파이프라인 실행
     print("⏳ [Pipeline] 토픽별 전체 파이프라인 실행…")
     try:
+        # torch·umap·hdbscan 등은 여기서 처음 import (웹 워커 기동 시에는 불러오지 않음)
+        from clustering.pipeline_by_topic import run_all_topics_pipeline
         # 기본값: kmeans, 클러스터 개수 10, eps=0.5, min_samples=5, since_hours=24, data_dir="data"
         run_all_topics_pipeline(
             clustering_method="kmeans",
@@ -63,10 +69,28 @@ def hourly_clustering():
     finally:
         db.close()"""
 
+def collect_due_feeds():
+    """
+    정각 사이(10분 간격)에 수집 주기가 돌아온 피드만 가져옵니다.
+    발행이 잦은 피드는 자주, 뜸한 피드는 드물게 수집됩니다 (collector/feed_scheduler.py).
+    """
+    try:
+        parse_and_store(only_due=True)
+    except Exception as e:
+        print(f"⚠️ [Collector] 피드 수집 중 에러 발생: {e}")
+        traceback.print_exc()
+
 def create_scheduler() -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler(timezone="Asia/Seoul")
     # 매시간 정각에 실행되도록 cron 트리거만 등록 (next_run_time 제거)
     scheduler.add_job(hourly_clustering, trigger="cron", minute=0, coalesce=True, misfire_grace_time=600)
+    # 정각을 제외한 10분마다 주기가 돌아온 피드만 수집
+    scheduler.add_job(collect_due_feeds, trigger="cron", minute="10-50/10", id="collect_due_feeds",
+                      coalesce=True, max_instances=1, replace_existing=True)
+    # 30분마다 본문이 없는 최근 기사 본문 수집 (RSS 수집 경로와 분리)
+    if ARTICLE_BODY_FETCH:
+        scheduler.add_job(fetch_article_bodies, trigger="cron", minute="5,35", id="article_body_job",
+                          coalesce=True, max_instances=1, replace_existing=True)
     # 매일 자정에 이전 24시간 트렌드 집계
     scheduler.add_job(generate_daily_trend, trigger='cron', hour=0, minute=0, id='daily_trend_job', replace_existing=True)
     return scheduler
@@ -109,6 +133,9 @@ def create_app():
         FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
     
         # 2) 기존 스케줄러·파이프라인
+        # 멀티 워커(gunicorn.conf.py)에서는 워커 하나만 RUN_SCHEDULER=true 로 스케줄러를 돌림
+        if os.getenv("RUN_SCHEDULER", "true").lower() != "true":
+            return
         # 서버 구동 시 한 번만 스케줄러 시작
         scheduler.start()  
         # 초기 클러스터링 (백그라운드)
@@ -119,7 +146,8 @@ def create_app():
 
     @app.on_event("shutdown")
     async def shutdown_event():
-        scheduler.shutdown()
+        if scheduler.running:
+            scheduler.shutdown()
     
     @app.get("/")
     async def root():
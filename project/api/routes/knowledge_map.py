@@ -2,7 +2,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sklearn.metrics.pairwise import cosine_similarity
 from pydantic import ValidationError
 from models.article import Article
 from models.user import User, KnowledgeMap
@@ -11,7 +10,6 @@ from api.utils.auth import get_current_user_flexible as get_current_user
 from api.utils.cache import get_cache
 from tasks.user_scrap_pipeline import build_knowledge_map
 from database.deps import get_db
-from clustering.embedder import make_embeddings
 from clustering.keyword_extractor import get_top_keywords
 from api.schemas.knowledge_map import KnowledgeMapOut, Message
 from api.schemas.cluster import ArticleOut
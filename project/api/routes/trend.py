@@ -10,7 +10,6 @@ from database.deps import get_db                             # :contentReference
 from models.article import Article, ClusterArticle, ClusterKeyword, Keyword, TrendKeyword
 from clustering.keyword_extractor import extract_top_keywords
 from clustering.embedder import preprocess_text
-from konlpy.tag import Okt
 from fastapi_cache.decorator import cache
 from zoneinfo import ZoneInfo
 
@@ -19,9 +18,6 @@ router = APIRouter()
 KST = ZoneInfo("Asia/Seoul")
 today = datetime.now(KST).date()
 
-# Okt 인스턴스와 불용어는 embedder.py 쪽에 정의돼 있다고 가정
-_okt = Okt()
-
 @router.get("/weekly", response_model=WeeklyTrendResponse)
 @cache(expire=86300)  # 하루(24시간) = 86400
 def get_weekly_trends(db: Session = Depends(get_db)):
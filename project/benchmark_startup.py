@@ -0,0 +1,57 @@
+# benchmark_startup.py
+# 역할: API 워커 기동 비용 측정 — 새 프로세스에서 `app:app` import 시간과 메모리(RSS),
+#       무거운 ML/JVM 모듈(torch, sentence_transformers, umap, hdbscan, sklearn, jpype)이
+#       import 시점에 딸려 들어왔는지 확인합니다.
+#
+# 사용 예 (project/ 에서, .env 필요):
+#   python benchmark_startup.py --runs 5
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers", "umap", "hdbscan", "sklearn", "jpype", "konlpy"]
+
+# 측정용 자식 프로세스 코드: import만 하고 결과를 JSON 한 줄로 출력
+_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from app import app
+elapsed = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("__RESULT__" + json.dumps({{"import_s": elapsed, "rss_mb": rss_mb, "heavy": heavy}}))
+"""
+
+
+def probe_once() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    line = next(l for l in out.splitlines() if l.startswith("__RESULT__"))
+    return json.loads(line[len("__RESULT__"):])
+
+
+def run(runs: int = 5) -> dict:
+    samples = [probe_once() for _ in range(runs)]
+    report = {
+        "runs": runs,
+        "import_s_median": round(statistics.median(s["import_s"] for s in samples), 3),
+        "import_s_max": round(max(s["import_s"] for s in samples), 3),
+        "rss_mb_median": round(statistics.median(s["rss_mb"] for s in samples), 1),
+        "heavy_loaded": samples[-1]["heavy"],
+    }
+    print(f"📊 app:app 기동: {report}")
+    if report["heavy_loaded"]:
+        print(f"⚠️ import 시점에 무거운 모듈이 로드됨: {', '.join(report['heavy_loaded'])}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API 워커 기동 시간/메모리 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    run(args.runs)
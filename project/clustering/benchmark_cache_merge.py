@@ -0,0 +1,83 @@
+# clustering/benchmark_cache_merge.py
+# 역할: run_embedding_stage 의 캐시 병합(재사용 마스크 + 최종 임베딩 재조합) 비용 비교
+# - legacy : 기사마다 `aid in cached_ids` + np.where 로 위치 찾기 (O(N·M))
+# - vector : align_cache (정렬 + searchsorted) + merge_cached_embeddings
+# 윈도우의 약 95%가 이전 캐시에 있고, 순서는 섞인 상태를 가정합니다. 두 결과가 같은지도 확인합니다.
+#
+# 사용 예:
+#   python -m clustering.benchmark_cache_merge --sizes 5000 50000 500000 --dim 256
+
+import argparse
+import time
+
+import numpy as np
+
+from clustering.cache import align_cache, merge_cached_embeddings
+
+
+def make_case(n: int, dim: int, overlap: float = 0.95, seed: int = 0):
+    """(윈도우 ID 리스트, 캐시 ID 배열, 캐시 임베딩, 신규 임베딩)"""
+    rng = np.random.default_rng(seed)
+    n_hit = int(n * overlap)
+    cached_ids = rng.permutation(np.arange(1, n + 1, dtype=np.int64) * 7)
+    window = np.concatenate([
+        rng.choice(cached_ids, n_hit, replace=False),
+        np.arange(n - n_hit, dtype=np.int64) * 7 + 7 * (n + 1),
+    ])
+    rng.shuffle(window)
+    cached_embs = rng.standard_normal((n, dim), dtype=np.float32)
+    new_embs = rng.standard_normal((n - n_hit, dim), dtype=np.float32)
+    return window.tolist(), cached_ids, cached_embs, new_embs
+
+
+def legacy_merge(ids_window, cached_ids, cached_embs, new_embs) -> np.ndarray:
+    """기존 run_embedding_stage 의 두 루프 그대로"""
+    new_ids = []
+    for aid in ids_window:
+        if aid in cached_ids:
+            idx = int(np.where(cached_ids == aid)[0][0])
+        else:
+            new_ids.append(aid)
+    final_embs_list, new_idx = [], 0
+    for aid in ids_window:
+        if aid in cached_ids:
+            idx = int(np.where(cached_ids == aid)[0][0])
+            final_embs_list.append(cached_embs[idx])
+        else:
+            final_embs_list.append(new_embs[new_idx])
+            new_idx += 1
+    return np.vstack(final_embs_list)
+
+
+def vector_merge(ids_window, cached_ids, cached_embs, new_embs) -> np.ndarray:
+    hit, gather_idx = align_cache(ids_window, cached_ids)
+    return merge_cached_embeddings(hit, gather_idx, cached_embs, new_embs)
+
+
+def run(sizes, dim: int, legacy_max: int, repeat: int):
+    print(f"{'N':>9} {'legacy(s)':>11} {'vector(s)':>11} {'speedup':>9}  일치")
+    for n in sizes:
+        case = make_case(n, dim)
+        t_vec = min(_timed(vector_merge, case) for _ in range(repeat))
+        if n <= legacy_max:
+            t_old = _timed(legacy_merge, case)
+            same = np.array_equal(legacy_merge(*case), vector_merge(*case))
+            print(f"{n:>9} {t_old:>11.3f} {t_vec:>11.4f} {t_old / t_vec:>8.0f}x  {'✅' if same else '❌'}")
+        else:
+            print(f"{n:>9} {'(skip)':>11} {t_vec:>11.4f} {'-':>9}  -")
+
+
+def _timed(fn, case) -> float:
+    t0 = time.perf_counter()
+    fn(*case)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="임베딩 캐시 병합(legacy 루프 vs searchsorted) 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000, 500000])
+    parser.add_argument("--dim", type=int, default=256, help="임베딩 차원 (768은 500k에서 메모리 ~3GB)")
+    parser.add_argument("--legacy-max", type=int, default=50000, help="이 크기까지만 legacy 루프 측정 (O(N·M))")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.legacy_max, args.repeat)
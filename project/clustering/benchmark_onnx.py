@@ -0,0 +1,89 @@
+# clustering/benchmark_onnx.py
+# 역할: 임베딩 백엔드 비교 — torch(fp32) vs onnx(int8) (DB 없이 리플레이 fixture 사용)
+# - 정확도: 같은 문서에 대한 두 임베딩의 코사인 유사도(평균/최소),
+#           KMeans(k) 클러스터 라벨의 ARI (torch 결과 기준)
+# - 속도: 단건 지연(p50/p95, ms)과 전체 코퍼스 처리량(texts/sec)
+# 결과는 {ONNX_DIR}/{모델명}/agreement.json 에 기록되며, 운영에서 EMBED_BACKEND=onnx 로 로드하려면
+# 이 기록의 코사인 일치도가 기준(ONNX_MIN_COSINE_MEAN / ONNX_MIN_COSINE_MIN) 이상이어야 합니다.
+#
+# 사용 예:
+#   python -m clustering.benchmark_onnx --fixtures data/feeds --k 10 --latency-samples 50
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score
+from sklearn.preprocessing import normalize
+
+from collector.replay import DEFAULT_FIXTURE_DIR
+from clustering.benchmark_preprocess import load_corpus
+from clustering.embedder import (
+    clean_for_embedding, load_model, _encode_bucketed, _token_lengths, _DEFAULT_TOKEN_BUDGET, _MODEL_NAME,
+)
+from clustering.onnx_backend import save_agreement, verify_agreement
+
+
+def _embed(model, texts, lengths) -> tuple[np.ndarray, float]:
+    t0 = time.perf_counter()
+    embs = _encode_bucketed(model, texts, lengths, _DEFAULT_TOKEN_BUDGET, None, False)
+    return normalize(embs, norm="l2"), time.perf_counter() - t0
+
+
+def _latency_ms(model, texts, samples: int) -> tuple[float, float]:
+    times = []
+    for t in texts[:samples]:
+        t0 = time.perf_counter()
+        model.encode([t], batch_size=1)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 95))
+
+
+def run(fixture_dir: str = DEFAULT_FIXTURE_DIR, k: int = 10, latency_samples: int = 50,
+        limit: int | None = None) -> dict:
+    texts = clean_for_embedding(load_corpus(fixture_dir)[:limit])
+    print(f"▶️ 문서 {len(texts)}개")
+
+    report = {"docs": len(texts)}
+    embs = {}
+    for backend in ("torch", "onnx"):
+        model = load_model(backend, verify=False)
+        lengths = _token_lengths(model, texts)
+        _embed(model, texts[:32], lengths[:32])                # 워밍업
+        embs[backend], wall = _embed(model, texts, lengths)
+        p50, p95 = _latency_ms(model, texts, latency_samples)
+        report[backend] = {
+            "texts_per_s": round(len(texts) / wall, 1) if wall > 0 else 0.0,
+            "latency_ms_p50": round(p50, 2),
+            "latency_ms_p95": round(p95, 2),
+        }
+        print(f"📊 {backend}: {report[backend]}")
+
+    cos = np.sum(embs["torch"] * embs["onnx"], axis=1)
+    labels = {b: KMeans(n_clusters=k, random_state=42, n_init=10).fit_predict(e) for b, e in embs.items()}
+    report.update({
+        "cosine_mean": round(float(cos.mean()), 4),
+        "cosine_min": round(float(cos.min()), 4),
+        f"kmeans{k}_ari": round(float(adjusted_rand_score(labels["torch"], labels["onnx"])), 4),
+        "speedup": round(report["onnx"]["texts_per_s"] / max(report["torch"]["texts_per_s"], 1e-9), 2),
+    })
+    print(f"📊 정확도/속도 비교: cosine_mean={report['cosine_mean']}, cosine_min={report['cosine_min']}, "
+          f"ARI={report[f'kmeans{k}_ari']}, speedup={report['speedup']}x")
+    print(f"📝 일치도 기록: {save_agreement(_MODEL_NAME, report)}")
+    try:
+        verify_agreement(_MODEL_NAME)
+        print("✅ 기준 통과 → EMBED_BACKEND=onnx 사용 가능")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="torch vs onnx(int8) 임베딩 정확도/속도 벤치마크")
+    parser.add_argument("--fixtures", type=str, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--k", type=int, default=10, help="ARI 비교용 KMeans 클러스터 수")
+    parser.add_argument("--latency-samples", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    run(args.fixtures, k=args.k, latency_samples=args.latency_samples, limit=args.limit)
@@ -0,0 +1,90 @@
+# clustering/benchmark_preprocess.py
+# 역할: 전처리 경로별 문서당 비용 비교 (DB 없이 collector 리플레이 fixture 사용)
+# - legacy : 문서마다 정규식 4번 + Okt 호출 1번 (기존 preprocess_text)
+# - batch  : 배치 전체 정규식 1번 + 구분자로 묶은 Okt 호출 (preprocess_batch)
+# - pool   : preprocess_texts (프로세스 풀, --workers)
+# 결과가 legacy와 얼마나 일치하는지도 함께 보고합니다.
+#
+# 사용 예:
+#   python -m clustering.benchmark_preprocess --fixtures data/feeds --repeat 3 --workers 4
+
+import argparse
+import re
+import time
+from typing import Callable, List
+
+from collector.replay import load_fixtures, DEFAULT_FIXTURE_DIR
+from collector.parsers import parse_feed
+from clustering.embedder import (
+    get_okt, _keep_tokens, normalize_texts, preprocess_batch, preprocess_texts, OKT_BATCH_DOCS,
+)
+
+
+def load_corpus(fixture_dir: str = DEFAULT_FIXTURE_DIR) -> List[str]:
+    """fixture 피드의 제목+요약 (run_embedding_stage 입력과 같은 형태)"""
+    corpus = []
+    for _, body in load_fixtures(fixture_dir):
+        for e in parse_feed(body):
+            corpus.append(f"{e.get('title', '')} {e.get('summary') or ''}".strip())
+    return corpus
+
+
+def _legacy_normalize(text: str) -> str:
+    text = re.sub(r'<[^>]+>', '', text)
+    text = text.lower()
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[^a-z0-9가-힣\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _legacy_preprocess(text: str) -> str:
+    return " ".join(_keep_tokens(get_okt().pos(_legacy_normalize(text), norm=True, stem=True)))
+
+
+def _timed(fn: Callable[[], List[str]], repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run(fixture_dir: str, repeat: int = 3, workers: int = 4, limit: int | None = None) -> dict:
+    corpus = load_corpus(fixture_dir)[:limit]
+    n = len(corpus)
+    print(f"▶️ 문서 {n}개, 배치 {OKT_BATCH_DOCS}개 단위, 반복 {repeat}회(최솟값)")
+
+    get_okt().pos("워밍업", norm=True, stem=True)          # JVM 기동 비용 제외
+    report = {"docs": n}
+
+    t_norm_old, _ = _timed(lambda: [_legacy_normalize(t) for t in corpus], repeat)
+    t_norm_new, _ = _timed(lambda: normalize_texts(corpus), repeat)
+    t_old, legacy = _timed(lambda: [_legacy_preprocess(t) for t in corpus], repeat)
+    t_new, batch = _timed(lambda: preprocess_batch(corpus), repeat)
+    preprocess_texts(corpus, workers=workers)               # 풀 기동 비용 제외
+    t_pool, pooled = _timed(lambda: preprocess_texts(corpus, workers=workers), repeat)
+
+    us = lambda t: round(t / n * 1e6, 1) if n else 0.0
+    report.update({
+        "normalize_us_per_doc_legacy": us(t_norm_old),
+        "normalize_us_per_doc_batch": us(t_norm_new),
+        "preprocess_us_per_doc_legacy": us(t_old),
+        "preprocess_us_per_doc_batch": us(t_new),
+        f"preprocess_us_per_doc_pool{workers}": us(t_pool),
+        "batch_matches_legacy": sum(a == b for a, b in zip(legacy, batch)),
+        "pool_matches_legacy": sum(a == b for a, b in zip(legacy, pooled)),
+    })
+    for k, v in report.items():
+        print(f"  {k}: {v}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전처리(정규식 + Okt) 문서당 비용 벤치마크")
+    parser.add_argument("--fixtures", type=str, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N개 문서만 사용")
+    args = parser.parse_args()
+    run(args.fixtures, repeat=args.repeat, workers=args.workers, limit=args.limit)
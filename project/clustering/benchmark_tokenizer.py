@@ -0,0 +1,91 @@
+# clustering/benchmark_tokenizer.py
+# 역할: 토크나이저 백엔드(okt / mecab / regex) 처리량·품질 비교 (DB 없이 리플레이 fixture 사용)
+# - docs/sec: 전처리 경로(tokenize_texts) 기준
+# - token_jaccard: 문서별 토큰 집합이 Okt와 얼마나 겹치는지 (평균)
+# - kw_overlap@3: 기사별 TF-IDF 상위 3 키워드 중 Okt 결과와 겹치는 비율 (평균)
+# - top_nouns_overlap@50: 코퍼스 전체 명사 빈도 상위 50개 중 Okt와 겹치는 비율
+# 설치되지 않은 백엔드는 건너뜁니다.
+#
+# 사용 예:
+#   python -m clustering.benchmark_tokenizer --fixtures data/feeds --repeat 3
+
+import argparse
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from collector.replay import DEFAULT_FIXTURE_DIR
+from clustering.benchmark_preprocess import load_corpus
+from clustering.embedder import tokenize_texts
+from clustering.keyword_extractor import extract_keywords_per_article
+from clustering.tokenizer import available_backends, get_tokenizer
+
+
+def _jaccard(a, b) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def _overlap(pred: List[str], ref: List[str]) -> float:
+    return len(set(pred) & set(ref)) / len(ref) if ref else 1.0
+
+
+def _top_nouns(name: str, corpus: List[str], n: int = 50) -> List[str]:
+    tok = get_tokenizer(name)
+    counts = Counter(w for doc in corpus for w in tok.nouns(doc) if len(w) > 1)
+    return [w for w, _ in counts.most_common(n)]
+
+
+def _run_backend(name: str, corpus: List[str], repeat: int) -> Tuple[float, List[Tuple[str, ...]]]:
+    best, tokens = float("inf"), []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        tokens = tokenize_texts(corpus, tokenizer=name)
+        best = min(best, time.perf_counter() - t0)
+    return best, tokens
+
+
+def run(fixture_dir: str = DEFAULT_FIXTURE_DIR, repeat: int = 3, limit: int | None = None) -> Dict[str, dict]:
+    corpus = load_corpus(fixture_dir)[:limit]
+    n = len(corpus)
+    backends = available_backends()
+    print(f"▶️ 문서 {n}개, 백엔드: {', '.join(backends)}")
+
+    results: Dict[str, dict] = {}
+    ref_tokens = ref_kws = ref_nouns = None
+    if "okt" in backends:           # Okt를 기준으로 먼저 계산
+        backends.remove("okt")
+        backends.insert(0, "okt")
+
+    for name in backends:
+        elapsed, tokens = _run_backend(name, corpus, repeat)
+        docs = [" ".join(t) for t in tokens]
+        kws = extract_keywords_per_article(docs, top_n=3) if any(docs) else [[] for _ in docs]
+        nouns = _top_nouns(name, corpus)
+        row = {"docs_per_s": round(n / elapsed, 1) if elapsed > 0 else 0.0}
+        if name == "okt":
+            ref_tokens, ref_kws, ref_nouns = tokens, kws, nouns
+        elif ref_tokens is not None:
+            row.update({
+                "token_jaccard": round(sum(map(_jaccard, tokens, ref_tokens)) / max(n, 1), 3),
+                "kw_overlap@3": round(sum(map(_overlap, kws, ref_kws)) / max(n, 1), 3),
+                "top_nouns_overlap@50": round(_overlap(nouns, ref_nouns), 3),
+            })
+        results[name] = row
+        print(f"📊 {name}: {row}")
+
+    if "okt" in results:
+        base = results["okt"]["docs_per_s"] or 1.0
+        for name, row in results.items():
+            row["speedup_vs_okt"] = round(row["docs_per_s"] / base, 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="토크나이저 백엔드 처리량/품질 벤치마크")
+    parser.add_argument("--fixtures", type=str, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N개 문서만 사용")
+    args = parser.parse_args()
+    for name, row in run(args.fixtures, repeat=args.repeat, limit=args.limit).items():
+        print(f"  {name}: {row}")
@@ -1,20 +1,279 @@
-import os, numpy as np
+import os, json, time, fcntl, numpy as np
+from contextlib import contextmanager
 from pathlib import Path
 from clustering.embedder import EMBEDDING_DIM
 
-def load_embedding_cache(id_path: str, emb_path: str):
-    if os.path.exists(id_path) and os.path.exists(emb_path):
-        ids = np.load(id_path)
-        embs = np.load(emb_path)
-    else:
-        ids = np.array([], dtype=int)
-        embs = np.zeros((0, EMBEDDING_DIM))  # EMBEDDING_DIM은 사용 모델 차원
-    return ids, embs
-
-def save_embedding_cache(ids, embs, id_path: str, emb_path: str):
-    # 디렉토리 자동 생성
-    Path(id_path).parent.mkdir(parents=True, exist_ok=True)
-    Path(emb_path).parent.mkdir(parents=True, exist_ok=True)
-    
-    np.save(id_path, ids)
-    np.save(emb_path, embs)
+
+def align_cache(window_ids, cached_ids):
+    """
+    윈도우 기사 ID들을 캐시 ID 배열에 정렬+searchsorted로 한 번에 매칭합니다 (O((N+M) log M)).
+    Returns: (hit_mask[N]: 캐시에 있는지, gather_idx[hit 개수]: hit인 기사들의 cached 배열 내 위치)
+    캐시에 같은 ID가 여러 번 있으면 첫 번째 위치를 씁니다.
+    """
+    window_ids = np.asarray(window_ids, dtype=np.int64)
+    cached_ids = np.asarray(cached_ids, dtype=np.int64)
+    if cached_ids.size == 0 or window_ids.size == 0:
+        return np.zeros(window_ids.shape[0], dtype=bool), np.zeros(0, dtype=np.int64)
+    order = np.argsort(cached_ids, kind="stable")
+    sorted_ids = cached_ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, window_ids), sorted_ids.size - 1)
+    hit = sorted_ids[pos] == window_ids
+    return hit, order[pos[hit]]
+
+
+def merge_cached_embeddings(hit, gather_idx, cached_embs: np.ndarray, new_embs: np.ndarray) -> np.ndarray:
+    """hit 위치엔 캐시 임베딩, 나머지엔 new_embs(윈도우 순서)를 채운 (N, D) 배열"""
+    dim = new_embs.shape[1] if new_embs.size else cached_embs.shape[1]
+    out = np.empty((hit.shape[0], dim), dtype=np.result_type(cached_embs.dtype, new_embs.dtype))
+    if gather_idx.size:
+        out[hit] = cached_embs[gather_idx]
+    out[~hit] = new_embs
+    return out
+
+
+# ── 추가 전용(append-only) 디스크 임베딩 저장소 ─────────────────────────────
+# 디렉토리 구성 ({data_dir}/{cache_name}_store/):
+#   meta.json     : {"dim", "gen", "segments": [...], "index": "..."}  ← 교체(os.replace)가 곧 커밋
+#   g{gen}_{n}.f32: float32 행(dim 고정)만 이어 붙인 세그먼트, np.memmap으로 읽음
+#   index_g{gen}.bin: (id, seg, row, ts) 고정폭 레코드를 이어 붙인 ID→위치 인덱스
+# 실행마다 새 벡터만 덧붙이고(벡터 먼저, 인덱스 나중), 윈도우는 memmap에서 필요한 행만 꺼냅니다.
+# 만료/중복 행이 EMB_STORE_COMPACT_RATIO 이상이면 살아 있는 행만 새 세대로 다시 써서 교체합니다.
+EMB_STORE_SEGMENT_ROWS  = int(os.getenv("EMB_STORE_SEGMENT_ROWS", 32768))   # 768차원 기준 세그먼트당 96MB
+EMB_STORE_COMPACT_RATIO = float(os.getenv("EMB_STORE_COMPACT_RATIO", 0.5))
+
+_INDEX_DTYPE = np.dtype([("id", "<i8"), ("seg", "<i4"), ("row", "<i4"), ("ts", "<f8")])
+_VEC_DTYPE = np.dtype("<f4")
+
+
+class EmbeddingStore:
+    """
+    기사 ID → float32 임베딩 (append-only 세그먼트 + memmap).
+    같은 디렉토리를 여러 인스턴스·프로세스(정각 파이프라인, 임베딩 워커)가 함께 쓰므로
+    모든 작업은 파일 잠금 안에서 디스크 상태(meta/인덱스/세그먼트 크기)를 다시 읽은 뒤 수행합니다.
+    (조회: 공유 잠금, 추가·압축: 배타 잠금)
+    """
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._row_bytes = dim * _VEC_DTYPE.itemsize
+        self.meta: dict | None = None
+        self.index = np.zeros(0, dtype=_INDEX_DTYPE)
+        self._index_bytes = 0          # self.index 로 읽어 들인 인덱스 파일 바이트 수
+        self._seg_rows: list = []
+        self._segs: dict = {}
+        with self._locked():
+            if not (self.path / "meta.json").exists():
+                self.meta = {"dim": self.dim, "gen": 0, "segments": [], "index": "index_g0.bin"}
+                self._write_meta()
+            self._recover()
+            self._refresh()
+
+    # ---- 디스크 상태 ----
+    def _write_meta(self):
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(self.meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _read_meta(self) -> dict:
+        meta = json.loads((self.path / "meta.json").read_text())
+        if meta["dim"] != self.dim:
+            raise ValueError(f"임베딩 차원 불일치: 저장소 {meta['dim']} vs 요청 {self.dim} ({self.path})")
+        return meta
+
+    def _recover(self):
+        """
+        기록 도중 죽어 잘린 세그먼트 끝 행·인덱스 끝 레코드를 잘라냄 (배타 잠금 안에서).
+        잘라 두지 않으면 다음 "ab" 추가가 부분 바이트 뒤에 붙어 이후 행이 모두 어긋남.
+        """
+        meta = self._read_meta()
+        for name, unit in [*((n, self._row_bytes) for n in meta["segments"]),
+                           (meta["index"], _INDEX_DTYPE.itemsize)]:
+            f = self.path / name
+            if f.exists() and f.stat().st_size % unit:
+                size = f.stat().st_size // unit * unit
+                print(f"⚠️ 저장소 {self.path}: {name} 끝의 잘린 기록 {f.stat().st_size - size}바이트 제거")
+                os.truncate(f, size)
+
+    def _refresh(self):
+        """다른 인스턴스가 덧붙이거나 압축한 내용을 반영 (잠금 안에서 호출). 인덱스는 늘어난 끝부분만 읽음"""
+        meta = self._read_meta()
+        if self.meta is None or meta["index"] != self.meta["index"]:
+            self.index = np.zeros(0, dtype=_INDEX_DTYPE)
+            self._index_bytes = 0
+            self._segs = {}
+        self.meta = meta
+        self._seg_rows = [self._rows_on_disk(name) for name in meta["segments"]]
+
+        index_path = self.path / meta["index"]
+        size = index_path.stat().st_size if index_path.exists() else 0
+        usable = size // _INDEX_DTYPE.itemsize * _INDEX_DTYPE.itemsize
+        if usable > self._index_bytes:
+            with open(index_path, "rb") as f:
+                f.seek(self._index_bytes)
+                tail = np.frombuffer(f.read(usable - self._index_bytes), dtype=_INDEX_DTYPE)
+            self.index = np.concatenate([self.index, tail])
+            self._index_bytes = usable
+
+    def _rows_on_disk(self, name: str) -> int:
+        f = self.path / name
+        return f.stat().st_size // self._row_bytes if f.exists() else 0
+
+    def _segment(self, seg: int) -> np.ndarray:
+        mm = self._segs.get(seg)
+        if mm is None or len(mm) != self._seg_rows[seg]:
+            mm = self._segs[seg] = np.memmap(self.path / self.meta["segments"][seg], dtype=_VEC_DTYPE,
+                                             mode="r", shape=(self._seg_rows[seg], self.dim))
+        return mm
+
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        with open(self.path / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(np.unique(self.index["id"]))
+
+    # ---- 조회 ----
+    def _gather(self, recs) -> np.ndarray:
+        out = np.empty((len(recs), self.dim), dtype=np.float32)
+        for seg in np.unique(recs["seg"]):
+            sel = recs["seg"] == seg
+            out[sel] = self._segment(int(seg))[recs["row"][sel]]
+        return out
+
+    def lookup(self, ids):
+        """
+        ids 중 저장소에 있는 기사의 (ID 배열, (N, dim) float32 행렬). 같은 ID가 여러 번 있으면 마지막 기록을 씀.
+        세그먼트는 memmap으로 열려 있어 필요한 행만 읽힙니다.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._locked(shared=True):
+            self._refresh()
+            if not len(self.index) or not len(ids):
+                return np.array([], dtype=int), np.zeros((0, self.dim), dtype=np.float32)
+            rev = self.index[::-1]
+            hit, gather_idx = align_cache(ids, rev["id"])
+            recs = rev[gather_idx]
+            # 세그먼트에 없는 행을 가리키는 레코드(손상)는 미스로 취급
+            valid = recs["row"] < np.asarray(self._seg_rows, dtype=np.int64)[recs["seg"]]
+            hit[np.flatnonzero(hit)[~valid]] = False
+            return ids[hit].astype(int), self._gather(recs[valid])
+
+    # ---- 추가 ----
+    def append(self, ids, embs: np.ndarray):
+        """새 벡터를 마지막 세그먼트 끝에 덧붙이고 인덱스 레코드를 추가합니다."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        embs = np.ascontiguousarray(embs, dtype=_VEC_DTYPE).reshape(len(ids), self.dim)
+        now = time.time()
+        with self._locked():
+            self._recover()
+            self._refresh()
+            records, start = [], 0
+            while start < len(ids):
+                if not self.meta["segments"] or self._seg_rows[-1] >= EMB_STORE_SEGMENT_ROWS:
+                    self.meta["segments"].append(f"g{self.meta['gen']}_{len(self.meta['segments']):05d}.f32")
+                    self._seg_rows.append(0)
+                    self._write_meta()
+                seg = len(self.meta["segments"]) - 1
+                take = min(len(ids) - start, EMB_STORE_SEGMENT_ROWS - self._seg_rows[seg])
+                with open(self.path / self.meta["segments"][seg], "ab") as f:
+                    f.write(embs[start:start + take].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                rec = np.empty(take, dtype=_INDEX_DTYPE)
+                rec["id"] = ids[start:start + take]
+                rec["seg"] = seg
+                rec["row"] = np.arange(self._seg_rows[seg], self._seg_rows[seg] + take)
+                rec["ts"] = now
+                records.append(rec)
+                self._seg_rows[seg] += take
+                start += take
+            new_index = np.concatenate(records)
+            # 벡터가 디스크에 내려간 뒤에 인덱스를 기록 → 인덱스가 없는 행을 가리키는 일은 없음
+            with open(self.path / self.meta["index"], "ab") as f:
+                f.write(new_index.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self.index = np.concatenate([self.index, new_index])
+            self._index_bytes += new_index.nbytes
+
+    # ---- 압축 ----
+    def _live_mask(self, keep_ids, ttl: float | None, now: float) -> np.ndarray:
+        """ID별 마지막 기록만, 그중 keep_ids에 있거나 ttl 안에 기록된 행만 살림"""
+        ids = self.index["id"]
+        order = np.argsort(ids[::-1], kind="stable")
+        _, first = np.unique(ids[::-1][order], return_index=True)
+        latest = np.zeros(len(ids), dtype=bool)
+        latest[len(ids) - 1 - order[first]] = True
+        keep = np.isin(ids, np.asarray(keep_ids, dtype=np.int64)) if keep_ids is not None else np.zeros(len(ids), dtype=bool)
+        if ttl is not None:
+            keep |= self.index["ts"] >= now - ttl
+        valid = self.index["row"] < np.asarray(self._seg_rows, dtype=np.int64)[self.index["seg"]]
+        return latest & keep & valid
+
+    def compact(self, keep_ids=None, ttl: float | None = None, min_dead_ratio: float = 0.0) -> int:
+        """
+        살아 있는 행만 새 세대 세그먼트/인덱스로 다시 쓰고 meta.json 교체로 전환한 뒤 옛 파일을 지웁니다.
+        죽은 행 비율이 min_dead_ratio 미만이면 아무것도 하지 않습니다. 지운 행 수를 반환합니다.
+        """
+        with self._locked():
+            self._recover()
+            self._refresh()
+            if not len(self.index):
+                return 0
+            live_mask = self._live_mask(keep_ids, ttl, time.time())
+            if 1.0 - live_mask.mean() < min_dead_ratio:
+                return 0
+            live = self.index[live_mask]
+            old_files = [*self.meta["segments"], self.meta["index"]]
+            gen = self.meta["gen"] + 1
+            segments, records = [], []
+            for start in range(0, len(live), EMB_STORE_SEGMENT_ROWS):
+                chunk = live[start:start + EMB_STORE_SEGMENT_ROWS]
+                name = f"g{gen}_{len(segments):05d}.f32"
+                with open(self.path / name, "wb") as f:
+                    f.write(self._gather(chunk).astype(_VEC_DTYPE, copy=False).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                rec = chunk.copy()
+                rec["seg"] = len(segments)
+                rec["row"] = np.arange(len(chunk))
+                records.append(rec)
+                segments.append(name)
+            new_index = np.concatenate(records) if records else np.zeros(0, dtype=_INDEX_DTYPE)
+            index_name = f"index_g{gen}.bin"
+            with open(self.path / index_name, "wb") as f:
+                f.write(new_index.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            removed = len(self.index) - len(new_index)
+            # meta.json 교체가 커밋 지점: 이 전에 죽으면 옛 세대가 그대로 유효
+            self.meta = {"dim": self.dim, "gen": gen, "segments": segments, "index": index_name}
+            self._write_meta()
+            self._segs = {}
+            self._seg_rows = [self._rows_on_disk(name) for name in segments]
+            self.index = new_index
+            self._index_bytes = new_index.nbytes
+            for name in old_files:
+                (self.path / name).unlink(missing_ok=True)
+        return removed
+
+    def maybe_compact(self, keep_ids=None, ttl: float | None = None,
+                      ratio: float = EMB_STORE_COMPACT_RATIO) -> int:
+        """죽은 행 비율이 ratio 이상일 때만 compact"""
+        return self.compact(keep_ids, ttl, min_dead_ratio=ratio)
+
+
+def open_embedding_store(data_dir: str, cache_name: str, dim: int = EMBEDDING_DIM) -> EmbeddingStore:
+    """data/{cache_name}_store/ 저장소 열기 (topic:raw 처럼 ':'가 들어간 이름은 '_'로 바꿈)"""
+    return EmbeddingStore(os.path.join(data_dir, f"{cache_name.replace(':', '_')}_store"), dim=dim)
+
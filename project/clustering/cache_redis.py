@@ -1,4 +1,4 @@
-import pickle
+import time
 import numpy as np
 import redis
 from clustering.embedder import EMBEDDING_DIM
@@ -11,30 +11,113 @@ REDIS_DB   = int(os.getenv("REDIS_DB", 0))
 
 redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
 
-def load_embedding_cache(topic: str):
+# 필드 값 = little-endian float32 원시 바이트 (768차원 → 3072B, pickle float64 대비 약 1/2.1)
+EMB_DTYPE      = np.dtype("<f4")
+EMB_CHUNK_SIZE = int(os.getenv("EMB_CACHE_CHUNK", 2000))   # HMGET / HSET 한 번에 보낼 필드 수
+# 기사별 만료: emb:{topic}:ts (ZSET, member=기사 ID, score=마지막으로 윈도우에 보인 시각)
+# 매 실행마다 윈도우 기사의 시각을 갱신하고, ttl 동안 안 보인 기사만 해시에서 지웁니다.
+# 정리(trim_embedding_cache)는 윈도우 크기를 아는 run_embedding_stage 만 호출합니다 (임베딩 워커는 저장만).
+# 해시 전체 EXPIRE는 토픽 자체가 오래 쉬었을 때의 안전장치로만 둡니다.
+EMB_CACHE_IDLE_TTL = int(os.getenv("EMB_CACHE_IDLE_TTL", 7 * 24 * 3600))
+
+
+def _key(topic: str) -> str:
+    return f"emb:{topic}"
+
+
+def _ts_key(topic: str) -> str:
+    return f"emb:{topic}:ts"
+
+
+def _fill(ids, raws, dim: int):
+    """raws 중 올바른 길이(dim * 4바이트)인 값만 골라 (ids, 행렬)로 변환. 예전 pickle 값은 미스로 취급"""
+    nbytes = dim * EMB_DTYPE.itemsize
+    keep = [i for i, r in enumerate(raws) if r is not None and len(r) == nbytes]
+    embs = np.empty((len(keep), dim), dtype=np.float32)
+    for row, i in enumerate(keep):
+        embs[row] = np.frombuffer(raws[i], dtype=EMB_DTYPE)
+    return np.array([ids[i] for i in keep], dtype=int), embs
+
+
+def load_embedding_cache(topic: str, ids=None, dim: int = EMBEDDING_DIM):
     """
     Redis에서 임베딩 캐시 로드.
     key: f"emb:{topic}"
     field: article_id (bytes)
-    value: pickle-serialized numpy array
+    value: float32 little-endian 원시 바이트
+    ids를 주면 그 기사들만 HMGET으로 가져옵니다 (윈도우 밖 항목은 전송하지 않음).
+    Returns: (캐시에 있던 기사 ID 배열, (N, dim) float32 행렬)
     """
-    key = f"emb:{topic}"
-    raw = redis_client.hgetall(key)
-    if not raw:
-        return np.array([], dtype=int), np.zeros((0, EMBEDDING_DIM))
+    key = _key(topic)
+    if ids is None:
+        raw = redis_client.hgetall(key)
+        return _fill([int(k) for k in raw.keys()], list(raw.values()), dim)
 
-    ids = np.array([int(k) for k in raw.keys()], dtype=int)
-    embs = np.vstack([pickle.loads(v) for v in raw.values()])
-    return ids, embs
+    ids = [int(a) for a in ids]
+    raws = []
+    for start in range(0, len(ids), EMB_CHUNK_SIZE):
+        raws.extend(redis_client.hmget(key, ids[start:start + EMB_CHUNK_SIZE]))
+    return _fill(ids, raws, dim)
+
+
+def touch_embedding_cache(ids, topic: str, now: float | None = None):
+    """윈도우에 있는 기사들의 마지막 사용 시각을 갱신 (캐시 적중한 기사도 만료가 밀림)"""
+    now = time.time() if now is None else now
+    ts_key = _ts_key(topic)
+    pipe = redis_client.pipeline(transaction=False)
+    for start in range(0, len(ids), EMB_CHUNK_SIZE):
+        pipe.zadd(ts_key, {str(int(aid)): now for aid in ids[start:start + EMB_CHUNK_SIZE]})
+    pipe.execute()
+
+
+# 만료 항목 조회·ZSET에 없는 필드 검사·삭제를 서버에서 한 번에 실행 (Lua 스크립트는 원자적)
+# → 조회와 삭제 사이에 임베딩 워커의 MULTI(HSET + ZADD)가 끼어들어 방금 쓴 필드가 지워지는 일이 없음
+_TRIM_LUA = """
+local key, ts_key = KEYS[1], KEYS[2]
+local chunk = tonumber(ARGV[2])
+local stale = redis.call('ZRANGEBYSCORE', ts_key, '-inf', ARGV[1])
+if redis.call('HLEN', key) > redis.call('ZCARD', ts_key) then
+    for _, field in ipairs(redis.call('HKEYS', key)) do
+        if not redis.call('ZSCORE', ts_key, field) then
+            table.insert(stale, field)
+        end
+    end
+end
+for i = 1, #stale, chunk do
+    local part = {unpack(stale, i, math.min(i + chunk - 1, #stale))}
+    redis.call('HDEL', key, unpack(part))
+    redis.call('ZREM', ts_key, unpack(part))
+end
+return #stale
+"""
+_trim_script = redis_client.register_script(_TRIM_LUA)
+_TRIM_UNPACK_CHUNK = 1000     # Lua unpack 인자 수 한도(약 8000) 안쪽
+
+
+def trim_embedding_cache(topic: str, ttl: int, now: float | None = None) -> int:
+    """
+    ttl초 동안 윈도우에 보이지 않은 기사만 해시에서 지웁니다. 지운 개수를 반환합니다.
+    ZSET에 없는 필드(기사별 만료 도입 전에 쓰인 값)도 함께 정리합니다.
+    """
+    now = time.time() if now is None else now
+    return int(_trim_script(keys=[_key(topic), _ts_key(topic)], args=[now - ttl, _TRIM_UNPACK_CHUNK]))
 
 
 def save_embedding_cache(ids: np.ndarray, embs: np.ndarray, topic: str, ttl: int = 86400):
     """
-    Redis에 임베딩 캐시 저장. 기본 TTL=24시간
+    Redis에 임베딩 캐시 저장. 기본 TTL=24시간 (기사별: 마지막으로 윈도우에 보인 뒤 ttl초, 정리는 trim_embedding_cache)
+    호출하는 쪽에서 새로 계산한 기사만 넘깁니다 (이미 있는 필드는 다시 쓰지 않음).
+    ttl은 키 전체 안전장치(EMB_CACHE_IDLE_TTL과 큰 쪽)에만 쓰이므로 한 번 실행을 건너뛰어도 캐시 전체가 사라지지 않습니다.
     """
-    key = f"emb:{topic}"
-    pipe = redis_client.pipeline()
-    for aid, emb in zip(ids, embs):
-        pipe.hset(key, str(int(aid)), pickle.dumps(emb))
-    pipe.expire(key, ttl)
-    pipe.execute()
\ No newline at end of file
+    key, ts_key = _key(topic), _ts_key(topic)
+    now = time.time()
+    embs = np.ascontiguousarray(embs, dtype=EMB_DTYPE)
+    # HSET 과 ZADD 를 MULTI 로 묶음 → 다른 프로세스의 trim 이 ZSET에 아직 없는 새 필드를 지우지 않음
+    pipe = redis_client.pipeline(transaction=True)
+    for start in range(0, len(ids), EMB_CHUNK_SIZE):
+        chunk_ids = [str(int(aid)) for aid in ids[start:start + EMB_CHUNK_SIZE]]
+        pipe.hset(key, mapping={aid: embs[i].tobytes() for i, aid in enumerate(chunk_ids, start)})
+        pipe.zadd(ts_key, {aid: now for aid in chunk_ids})
+    pipe.expire(key, max(ttl, EMB_CACHE_IDLE_TTL))
+    pipe.expire(ts_key, max(ttl, EMB_CACHE_IDLE_TTL))
+    pipe.execute()
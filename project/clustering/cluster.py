@@ -102,11 +102,24 @@ def save_clusters_to_db(article_ids: list[int], labels: np.ndarray, topic: Topic
             )
             # 각 Cluster.num_articles 카운트
             # (원한다면 나중에 업데이트하거나, bulk로 처리 가능)
+        # 2-1) 임베딩에서 제외된 재게재 사본도 원본 기사의 클러스터에 연결
+        #      (트렌드 집계·기사 수에는 사본도 포함되어야 함)
+        art_to_cid = {art_id: label_to_cluster_id[int(lbl)] for art_id, lbl in zip(article_ids, labels.tolist())}
+        copies = (
+            session.query(Article.id, Article.canonical_id)
+            .filter(Article.canonical_id.in_(list(art_to_cid)))
+            .all()
+        ) if art_to_cid else []
+        cid_counts = Counter(art_to_cid.values())
+        for copy_id, canon_id in copies:
+            cid = art_to_cid[canon_id]
+            mappings.append(ClusterArticle(article_id=copy_id, cluster_id=cid))
+            cid_counts[cid] += 1
         session.bulk_save_objects(mappings)
 
         # 3) num_articles 업데이트 (선택)
         for lbl, cid in label_to_cluster_id.items():
-            count = int((labels == lbl).sum())
+            count = cid_counts[cid]
             session.query(Cluster).filter(Cluster.id == cid).update({
                 Cluster.num_articles: count
             })
@@ -0,0 +1,240 @@
+# clustering/embed_server.py
+# 역할: SBERT 모델 한 벌을 가진 로컬 임베딩 서버 + 얇은 클라이언트
+# - 정각 파이프라인, 임베딩 워커, 지식맵/스크랩 API가 각자 모델(400MB+)을 올리지 않도록
+#   이 프로세스만 모델을 로드하고, 나머지는 EMBED_SERVER_URL 로 요청합니다.
+# - 동시에 들어온 작은 요청들은 마이크로 배치로 묶어 한 번에 인코딩합니다
+#   (최대 EMBED_SERVER_MAX_BATCH개 문장 또는 EMBED_SERVER_MAX_WAIT_MS 마감 중 먼저 오는 쪽).
+# - 프로토콜: POST /embed  {"texts": [...], "batch_size": null}
+#             → application/octet-stream (float32 little-endian, X-Shape: "N,D", L2 정규화됨)
+#             GET /health → {"backend", "model", "dim", "batches", "requests"}
+#
+# 실행: python -m clustering.embed_server --host 127.0.0.1 --port 8601
+# 클라이언트 측: EMBED_SERVER_URL=http://127.0.0.1:8601 이면 make_embeddings가 자동으로 서버를 사용
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+import numpy as np
+import requests
+
+EMBED_SERVER_URL          = os.getenv("EMBED_SERVER_URL", "")
+EMBED_SERVER_TIMEOUT      = float(os.getenv("EMBED_SERVER_TIMEOUT", 600))
+EMBED_SERVER_MAX_BATCH    = int(os.getenv("EMBED_SERVER_MAX_BATCH", 256))
+EMBED_SERVER_MAX_WAIT_MS  = float(os.getenv("EMBED_SERVER_MAX_WAIT_MS", 10))
+
+
+class _Job:
+    """요청 하나 (큰 요청은 max_batch 조각 단위로 여러 배치에 나눠 처리)"""
+
+    __slots__ = ("texts", "batch_size", "fut", "pos", "parts")
+
+    def __init__(self, texts: List[str], batch_size: int | None):
+        self.texts = texts
+        self.batch_size = batch_size
+        self.fut: Future = Future()
+        self.pos = 0                        # 다음에 배치에 넣을 문장 위치
+        self.parts: List[np.ndarray] = []   # 처리된 조각 결과 (순서대로)
+
+
+class MicroBatcher:
+    """
+    요청 큐를 하나의 스레드가 소비하며, 첫 요청 이후 max_wait 동안 더 들어온 요청을
+    max_batch 문장까지 합쳐 한 번에 인코딩한 뒤 요청별로 잘라 돌려줍니다.
+    - 배치에 다 들어가지 않는 요청은 큐 맨 앞에 그대로 남아 다음 배치의 첫 요청이 됨 (FIFO 유지)
+    - max_batch보다 큰 요청(정각 윈도우 전체 등)은 max_batch 조각 하나씩만 처리하고 큐 뒤로 보내,
+      그 사이 들어온 작은 요청(지식맵 등)이 큰 요청 전체를 기다리지 않고 조각 사이에 처리됨
+    """
+
+    def __init__(self, encode_fn, max_batch: int = EMBED_SERVER_MAX_BATCH,
+                 max_wait_ms: float = EMBED_SERVER_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._jobs: "deque[_Job]" = deque()
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.requests = 0
+        self._thread = threading.Thread(target=self._loop, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str], batch_size: int | None = None) -> Future:
+        job = _Job(texts, batch_size)
+        with self._cond:
+            self._jobs.append(job)
+            self._cond.notify()
+        return job.fut
+
+    def _gather(self) -> List[Tuple[_Job, int, int]]:
+        """이번 배치에 넣을 (요청, 시작, 끝) 조각들"""
+        pieces: List[Tuple[_Job, int, int]] = []
+        total = 0
+        with self._cond:
+            while not self._jobs:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while total < self.max_batch:
+                if not self._jobs:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining) or not self._jobs:
+                        break
+                job = self._jobs[0]
+                if job.fut.done():              # 앞 조각이 실패한 큰 요청
+                    self._jobs.popleft()
+                    continue
+                left = len(job.texts) - job.pos
+                room = self.max_batch - total
+                if left <= room:
+                    self._jobs.popleft()
+                    pieces.append((job, job.pos, len(job.texts)))
+                    job.pos = len(job.texts)
+                    total += left
+                elif not pieces:
+                    # 큰 요청: 한 조각만 처리하고 나머지는 큐 뒤로 (기다리던 작은 요청이 먼저)
+                    self._jobs.popleft()
+                    pieces.append((job, job.pos, job.pos + room))
+                    job.pos += room
+                    self._jobs.append(job)
+                    total += room
+                else:
+                    break                       # 맨 앞에 그대로 두고 다음 배치에서 처리
+        return pieces
+
+    def _loop(self):
+        while True:
+            pieces = self._gather()
+            if not pieces:
+                continue
+            texts = [t for job, start, end in pieces for t in job.texts[start:end]]
+            # 요청 하나를 통째로 처리할 때만 호출자가 지정한 batch_size 존중, 나머지는 자동 배치
+            whole = len(pieces) == 1 and pieces[0][1] == 0 and pieces[0][2] == len(pieces[0][0].texts)
+            batch_size = pieces[0][0].batch_size if whole else None
+            try:
+                embs = self.encode_fn(texts, batch_size=batch_size)
+            except Exception as e:
+                for job, _, _ in pieces:
+                    if not job.fut.done():
+                        job.fut.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for job, start, end in pieces:
+                job.parts.append(embs[offset:offset + end - start])
+                offset += end - start
+                if end == len(job.texts):
+                    self.requests += 1
+                    job.fut.set_result(job.parts[0] if len(job.parts) == 1 else np.vstack(job.parts))
+
+
+def _make_handler(batcher: MicroBatcher, info: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):   # 요청마다 로그를 남기지 않음
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self.send_error(404)
+                return
+            self._send_json(200, {**info, "batches": batcher.batches, "requests": batcher.requests})
+
+        def do_POST(self):
+            if self.path != "/embed":
+                self.send_error(404)
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                texts = [str(t) for t in payload["texts"]]
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"잘못된 요청: {e}"})
+                return
+            try:
+                embs = batcher.submit(texts, payload.get("batch_size")).result()
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            body = np.ascontiguousarray(embs, dtype="<f4").tobytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("X-Shape", f"{embs.shape[0]},{embs.shape[1] if embs.ndim == 2 else 0}")
+            self.send_header("X-Backend", info["backend"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8601, max_batch: int = EMBED_SERVER_MAX_BATCH,
+          max_wait_ms: float = EMBED_SERVER_MAX_WAIT_MS):
+    from clustering.embedder import _embed_local, _get_model, EMBED_BACKEND, _MODEL_NAME
+
+    model = _get_model()                  # 요청 전에 모델을 올려 둠
+    info = {"backend": EMBED_BACKEND, "model": _MODEL_NAME, "dim": model.get_sentence_embedding_dimension()}
+    batcher = MicroBatcher(_embed_local, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    httpd = ThreadingHTTPServer((host, port), _make_handler(batcher, info))
+    httpd.daemon_threads = True
+    print(f"🚀 임베딩 서버 시작: http://{host}:{port} ({info['backend']}, max_batch={max_batch}, "
+          f"max_wait={max_wait_ms}ms)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+# --- 클라이언트 ---
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def embed_remote(texts: List[str], url: str = EMBED_SERVER_URL, batch_size: int | None = None,
+                 timeout: float = EMBED_SERVER_TIMEOUT, backend: str | None = None) -> np.ndarray:
+    """
+    임베딩 서버에 요청해 (N, D) float32 배열을 받습니다. 실패 시 requests 예외를 그대로 올림.
+    backend를 주면 서버 백엔드(X-Backend)가 다를 때도 예외 (다른 백엔드 벡터가 캐시에 섞이지 않도록)
+    """
+    resp = _get_session().post(f"{url.rstrip('/')}/embed",
+                               json={"texts": list(texts), "batch_size": batch_size}, timeout=timeout)
+    resp.raise_for_status()
+    server_backend = resp.headers.get("X-Backend")
+    if backend and server_backend != backend:
+        raise requests.RequestException(f"임베딩 서버 백엔드 불일치: 서버 {server_backend} / 요청 {backend}")
+    n, d = (int(x) for x in resp.headers["X-Shape"].split(","))
+    return np.frombuffer(resp.content, dtype="<f4").reshape(n, d)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 SBERT 임베딩 서버")
+    parser.add_argument("--host", type=str, default=os.getenv("EMBED_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("EMBED_SERVER_PORT", 8601)))
+    parser.add_argument("--max-batch", type=int, default=EMBED_SERVER_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=EMBED_SERVER_MAX_WAIT_MS)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_batch, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
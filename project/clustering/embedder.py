@@ -1,11 +1,23 @@
 # clustering/embedder.py
+# torch/sentence-transformers, sklearn, JVM(Okt)은 무거우므로 import 시점이 아니라
+# 처음 쓰일 때(_get_model, get_okt, make_embeddings) 불러옵니다 → API 워커 기동이 가벼움
 
+import atexit
+import json
+import multiprocessing
+import os
 import re
-from typing import List
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 import numpy as np
-from konlpy.tag import Okt
-from sklearn.preprocessing import normalize
+
+from clustering.tokenizer import get_okt, get_tokenizer, stage_backend
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # 불용어 리스트 (초안)
 STOPWORDS_KO = {
@@ -17,57 +29,377 @@ STOPWORDS_KO = {
 
 EMBEDDING_DIM = 768
 
+# 전처리 규칙(정제 정규식·품사·불용어)을 바꾸면 올려주세요 → 전처리 캐시가 자동 무효화됩니다
+PREPROCESS_VERSION = 1
+
 # 1) 전역에서 한 번만 모델 로딩
+# EMBED_BACKEND: "torch"(기본, sentence-transformers fp32) 또는 "onnx"(onnxruntime + 동적 int8 양자화)
 _MODEL_NAME = "jhgan/ko-sbert-sts" 
-_model: SentenceTransformer | None = None
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+_model: "SentenceTransformer | None" = None
+
+def load_model(backend: str = EMBED_BACKEND, model_name: str = _MODEL_NAME, verify: bool = True):
+    """
+    임베딩 모델 생성 (캐시하지 않음, 벤치마크에서 백엔드를 나란히 비교할 때 사용)
+    verify=True이면 onnx 백엔드는 torch와의 일치도 검사(benchmark_onnx)를 통과한 경우에만 로드
+    """
+    if backend == "onnx":
+        from clustering.onnx_backend import load_onnx_model
+        return load_onnx_model(model_name, verify=verify)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
 
-def _get_model() -> SentenceTransformer:
+def _get_model() -> "SentenceTransformer":
     global _model
     if _model is None:
-        _model = SentenceTransformer(_MODEL_NAME)
+        _model = load_model(EMBED_BACKEND)
     return _model
 
-# KoNLPy Okt 토크나이저
-_okt = Okt()
-
 # 2) 간단 전처리: 소문자화, 특수문자 제거
-def preprocess_text(text: str) -> str:
-    # 1) 기본 정제
-    text = re.sub(r'<[^>]+>', '', text)
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)          # URL 제거
-    text = re.sub(r"[^a-z0-9가-힣\s]", " ", text)  # 특수문자 제거 (한글+영문+숫자만 남김)
-    text = re.sub(r"\s+", " ", text).strip()     # multiple space -> single
-    # 2) 형태소 분석
-    morphs = _okt.pos(text, norm=True, stem=True)
-    # 3) 의미 있는 품사만 (명사, 동사, 형용사 등)
-    tokens = [
-        word for word, pos in morphs
-        if pos in ("Noun", "Verb", "Adjective")
-        and word not in STOPWORDS_KO
-    ]
-
-    # 4) 다시 문자열로
-    clean = " ".join(tokens)
-    clean = re.sub(r"\s+", " ", clean).strip()
-    return clean
-
-
-# 3) 임베딩 배치 생성 함수
-def make_embeddings(
-    texts: List[str],
-    batch_size: int = 32,
-) -> np.ndarray:
+# 태그·URL·특수문자·공백을 한 번의 정규식 순회로 정리합니다 (기존 4단계 re.sub와 같은 결과).
+# 배치 처리를 위해 문서 구분자 "\n"은 건드리지 않습니다.
+_NORMALIZE_RE = re.compile(r"(?:<[^>\n]+>|http[^\s]+|[^a-z0-9가-힣\n])+")
+_STRIP_TAG_URL_RE = re.compile(r"<[^>\n]+>|http[^\s]+")
+_KEEP_POS = ("Noun", "Verb", "Adjective")
+OKT_BATCH_DOCS = int(os.getenv("OKT_BATCH_DOCS", 64))
+
+
+def _normalize_run(m: re.Match) -> str:
+    # 태그·URL만으로 이뤄진 구간은 붙여 쓰고(기존: 빈 문자열로 치환), 그 외 문자가 섞이면 공백 하나
+    return "" if not _STRIP_TAG_URL_RE.sub("", m.group()) else " "
+
+
+def normalize_texts(texts: Sequence[str]) -> List[str]:
+    """여러 문서를 이어 붙여 한 번의 정규식 순회로 정제합니다."""
+    joined = "\n".join(t.replace("\n", " ") for t in texts).lower()
+    return [t.strip() for t in _NORMALIZE_RE.sub(_normalize_run, joined).split("\n")]
+
+
+def _keep_tokens(morphs) -> Tuple[str, ...]:
+    # 의미 있는 품사만 (명사, 동사, 형용사)
+    return tuple(w for w, pos in morphs if pos in _KEEP_POS and w not in STOPWORDS_KO)
+
+
+def tokenize_texts(
+    texts: Sequence[str], batch_docs: int = OKT_BATCH_DOCS, tokenizer: str | None = None,
+) -> List[Tuple[str, ...]]:
+    """
+    문서별 토큰 튜플 리스트. batch_docs개씩 묶어 형태소 분석기를 호출합니다.
+    tokenizer: 백엔드 이름 (기본: TOKENIZER_PREPROCESS → TOKENIZER → "okt")
+    """
+    tok = get_tokenizer(tokenizer, stage="preprocess")
+    normed = normalize_texts(texts)
+    out: List[Tuple[str, ...]] = []
+    for i in range(0, len(normed), max(1, batch_docs)):
+        batch = normed[i:i + batch_docs]
+        docs = [t for t in batch if t]           # 빈 문서는 분석기를 거치지 않음
+        it = iter(tok.pos_batch(docs) if docs else [])
+        out.extend(_keep_tokens(next(it)) if t else () for t in batch)
+    return out
+
+
+def preprocess_batch(texts: Sequence[str], tokenizer: str | None = None) -> List[str]:
+    """[preprocess_text(t) for t in texts] 와 같은 결과를 배치 경로로 계산"""
+    return [" ".join(tokens) for tokens in tokenize_texts(texts, tokenizer=tokenizer)]
+
+
+def preprocess_text(text: str, tokenizer: str | None = None) -> str:
+    return preprocess_batch([text], tokenizer=tokenizer)[0]
+
+
+# 2-1) 배치 전처리: 프로세스마다 자기 JVM/Okt를 갖는 풀로 나눠 처리
+# JPype 브리지 때문에 한 프로세스 안에서는 사실상 한 코어만 쓰므로 프로세스로 샤딩합니다.
+PREPROCESS_WORKERS   = int(os.getenv("PREPROCESS_WORKERS", min(8, os.cpu_count() or 1)))
+PREPROCESS_CHUNKSIZE = int(os.getenv("PREPROCESS_CHUNKSIZE", 64))
+
+_prep_pool: ProcessPoolExecutor | None = None
+_prep_pool_workers = 0
+_prep_pool_lock = threading.Lock()
+
+
+def _init_preprocess_worker(tokenizer: str):
+    # 첫 청크가 JVM 워밍업 비용을 떠안지 않도록 미리 한 번 돌려둠
+    get_tokenizer(tokenizer).pos("워밍업")
+
+
+def _get_preprocess_pool(workers: int, tokenizer: str) -> ProcessPoolExecutor:
+    # JVM을 띄운 부모를 fork하면 위험하므로 spawn, 풀은 재사용 (JVM 기동 비용이 큼)
+    global _prep_pool, _prep_pool_workers
+    with _prep_pool_lock:
+        if _prep_pool is None or _prep_pool_workers != workers:
+            if _prep_pool is not None:
+                _prep_pool.shutdown(wait=False)
+            _prep_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_preprocess_worker,
+                initargs=(tokenizer,),
+            )
+            _prep_pool_workers = workers
+        return _prep_pool
+
+
+@atexit.register
+def _shutdown_preprocess_pool():
+    if _prep_pool is not None:
+        _prep_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def preprocess_texts(
+    texts: Sequence[str],
+    workers: int = PREPROCESS_WORKERS,
+    chunksize: int = PREPROCESS_CHUNKSIZE,
+    tokenizer: str | None = None,
+) -> List[str]:
+    """
+    [preprocess_text(t) for t in texts] 와 같은 결과(순서 유지)를 프로세스 풀로 계산합니다.
+    workers<=1 이거나 청크 2개 분량보다 적으면 현재 프로세스에서 바로 처리합니다.
+    """
+    # 워커 프로세스 환경변수와 상관없이 부모가 고른 백엔드를 쓰도록 이름을 넘김
+    tokenizer = tokenizer or stage_backend("preprocess")
+    texts = list(texts)
+    chunksize = max(1, chunksize)
+    if workers <= 1 or len(texts) < chunksize * 2:
+        return preprocess_batch(texts, tokenizer=tokenizer)
+    # 청크 단위로 넘겨 워커 안에서도 배치 경로(Okt 호출 최소화)를 타도록 함
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    pool = _get_preprocess_pool(workers, tokenizer)
+    return [t for chunk in pool.map(partial(preprocess_batch, tokenizer=tokenizer), chunks) for t in chunk]
+
+
+# 2-2) SBERT 입력 모드
+# - "cleaned"(기본): 형태소 분석·불용어 제거된 전처리 결과를 임베딩 (기존 방식)
+# - "raw": 태그·URL만 걷어낸 원문을 임베딩 → 느린 형태소 분석을 기다리지 않고,
+#          TF-IDF용 전처리는 임베딩과 동시에 다른 스레드(프로세스 풀)에서 진행
+# 두 모드의 임베딩은 섞이면 안 되므로 캐시 이름을 분리합니다 (embedding_cache_name).
+EMBED_INPUT = os.getenv("EMBED_INPUT", "cleaned").lower()
+# 임베딩 입력에 article_body 본문 앞부분(EMBED_BODY_CHARS자)을 덧붙일지 (collector/body_fetcher.py 가 채움)
+# 본문 포함 여부에 따라 같은 기사도 벡터가 달라지므로 캐시 이름을 분리합니다 ("{토픽}:body").
+EMBED_WITH_BODY  = os.getenv("EMBED_WITH_BODY", "false").lower() == "true"
+EMBED_BODY_CHARS = int(os.getenv("EMBED_BODY_CHARS", 1000))
+_RAW_CLEAN_RE = re.compile(r"<[^>]+>|https?://\S+")
+
+
+def clean_for_embedding(texts: Sequence[str]) -> List[str]:
+    """raw 모드 SBERT 입력: HTML 태그·URL 제거, 공백 정리 (대소문자·문장부호는 유지)"""
+    return [" ".join(_RAW_CLEAN_RE.sub(" ", t).split()) for t in texts]
+
+
+def embedding_cache_name(
+    topic: str, mode: str | None = None, backend: str | None = None, with_body: bool | None = None,
+) -> str:
     """
-    입력된 텍스트 리스트를 SBERT 임베딩 벡터(NxD)로 반환합니다.
-    내부에서 전처리(preprocess_text)를 먼저 수행합니다.
+    임베딩 캐시 이름 (cleaned: 토픽 그대로, raw: "{토픽}:raw")
+    본문을 덧붙인 입력이면 ":body"를 붙임 (예: "{토픽}:raw:body")
+    torch가 아닌 백엔드는 ":{backend}"를 붙임 (예: "{토픽}:onnx") → int8 벡터와 fp32 벡터가 섞이지 않음
     """
+    mode = mode or EMBED_INPUT
+    backend = backend or EMBED_BACKEND
+    with_body = EMBED_WITH_BODY if with_body is None else with_body
+    name = topic if mode == "cleaned" else f"{topic}:{mode}"
+    if with_body:
+        name = f"{name}:body"
+    return name if backend == "torch" else f"{name}:{backend}"
+
+
+# 3) 임베딩 배치 생성
+# 짧은 제목과 긴 요약이 한 배치에 섞이면 짧은 쪽도 긴 길이로 패딩되어 CPU를 낭비하므로
+# 토큰 길이순으로 정렬해 비슷한 길이끼리 묶고, 결과는 원래 순서로 되돌립니다.
+# 배치 크기는 "배치당 토큰 수" 예산으로 정하며, 처음 큰 입력이 들어올 때 가용 메모리 한도 안에서
+# 후보 예산별 처리량(tokens/sec)을 재서 가장 빠른 값을 고릅니다.
+# 튜닝 결과는 (모델, 백엔드, 디바이스)별로 EMBED_AUTOTUNE_PATH 에 저장해 두고, 다른 프로세스
+# (gunicorn 워커·임베딩 워커·임베딩 서버)와 재시작 후에는 다시 재지 않고 읽어서 씁니다.
+EMBED_TOKENS_PER_BATCH = int(os.getenv("EMBED_TOKENS_PER_BATCH", 0))    # 0 = 자동 튜닝
+EMBED_MAX_BATCH        = int(os.getenv("EMBED_MAX_BATCH", 256))
+EMBED_AUTOTUNE_PATH    = os.getenv("EMBED_AUTOTUNE_PATH", "data/embed_autotune.json")
+_DEFAULT_TOKEN_BUDGET  = 4096
+_TOKEN_BUDGETS         = (1024, 2048, 4096, 8192, 16384, 32768)
+_AUTOTUNE_MIN_TEXTS    = 256
+_tuned_budget: int | None = None
+_tuned_loaded = False
+_tune_lock = threading.Lock()
+
+
+def _available_memory() -> int:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 2 << 30
+
+
+def _memory_token_cap(model) -> int:
+    """가용 메모리의 1/4 안에서 한 배치에 넣을 수 있는 토큰 수 (활성값 크기 대략 추정)"""
+    config = getattr(model, "config", None) or getattr(model[0].auto_model, "config", None)
+    hidden = getattr(config, "hidden_size", EMBEDDING_DIM)
+    layers = getattr(config, "num_hidden_layers", 12)
+    bytes_per_token = hidden * layers * 4 * 12      # float32, 어텐션·FFN 중간값 포함 여유
+    return max(_TOKEN_BUDGETS[0], _available_memory() // 4 // bytes_per_token)
+
+
+def _token_lengths(model, texts: Sequence[str]) -> np.ndarray:
+    enc = model.tokenizer(list(texts), add_special_tokens=True, truncation=True,
+                          max_length=model.max_seq_length)
+    return np.fromiter((len(ids) for ids in enc["input_ids"]), dtype=np.int64, count=len(texts))
+
+
+def _length_batches(lengths: np.ndarray, token_budget: int, batch_size: int | None):
+    """토큰 길이 오름차순 인덱스를 배치로 나눔 (고정 batch_size 또는 토큰 예산 기준)"""
+    order = np.argsort(lengths, kind="stable")
+    if batch_size:
+        for i in range(0, len(order), batch_size):
+            yield order[i:i + batch_size]
+        return
+    start = 0
+    for end in range(1, len(order) + 1):
+        # 정렬돼 있으므로 배치 안 최대 길이는 마지막 원소 → 패딩 포함 토큰 수 = 개수 × 마지막 길이
+        over = (end - start) * lengths[order[end - 1]] > token_budget or end - start > EMBED_MAX_BATCH
+        if over and end - 1 > start:
+            yield order[start:end - 1]
+            start = end - 1
+    if start < len(order):
+        yield order[start:]
+
+
+def _encode_bucketed(model, texts: Sequence[str], lengths: np.ndarray,
+                     token_budget: int, batch_size: int | None, show_progress_bar: bool) -> np.ndarray:
+    out = np.zeros((len(texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    for idx in _length_batches(lengths, token_budget, batch_size):
+        out[idx] = model.encode([texts[i] for i in idx], batch_size=len(idx),
+                                show_progress_bar=show_progress_bar, convert_to_numpy=True)
+    return out
+
+
+def _autotune_token_budget(model, texts: Sequence[str], lengths: np.ndarray) -> int:
+    """입력 표본으로 예산 후보별 tokens/sec를 재서 가장 빠른 예산을 고름 (5% 이상 안 좋아지면 중단)"""
+    cap = _memory_token_cap(model)
+    pick = np.linspace(0, len(texts) - 1, num=min(len(texts), 512)).astype(int)
+    sample, sample_lens = [texts[i] for i in pick], lengths[pick]
+    _encode_bucketed(model, sample[:32], sample_lens[:32], _DEFAULT_TOKEN_BUDGET, None, False)  # 워밍업
+
+    best, best_tps = _TOKEN_BUDGETS[0], 0.0
+    for budget in _TOKEN_BUDGETS:
+        if budget > cap:
+            break
+        t0 = time.perf_counter()
+        _encode_bucketed(model, sample, sample_lens, budget, None, False)
+        tps = float(sample_lens.sum()) / max(time.perf_counter() - t0, 1e-9)
+        if tps > best_tps * 1.05:
+            best, best_tps = budget, tps
+        else:
+            break
+    print(f"⚙️ 임베딩 배치 자동 튜닝: 배치당 {best} 토큰 ({best_tps:.0f} tokens/s, 메모리 한도 {cap} 토큰)")
+    return best
+
+
+def _autotune_key(model) -> str:
+    return f"{_MODEL_NAME}|{EMBED_BACKEND}|{getattr(model, 'device', 'cpu')}"
+
+
+def _load_tuned_budget(key: str) -> int | None:
+    try:
+        with open(EMBED_AUTOTUNE_PATH, encoding="utf-8") as f:
+            return int(json.load(f)[key])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_tuned_budget(key: str, budget: int):
+    """튜닝 결과를 파일에 합쳐 씀 (임시 파일 → os.replace, 실패해도 이번 프로세스 값은 유지)"""
+    try:
+        try:
+            with open(EMBED_AUTOTUNE_PATH, encoding="utf-8") as f:
+                tuned = json.load(f)
+        except (OSError, ValueError):
+            tuned = {}
+        tuned[key] = budget
+        os.makedirs(os.path.dirname(EMBED_AUTOTUNE_PATH) or ".", exist_ok=True)
+        tmp = f"{EMBED_AUTOTUNE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(tuned, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, EMBED_AUTOTUNE_PATH)
+    except OSError as e:
+        print(f"⚠️ 배치 튜닝 결과 저장 실패 ({EMBED_AUTOTUNE_PATH}): {e}")
+
+
+def _token_budget(model, texts: Sequence[str], lengths: np.ndarray) -> int:
+    global _tuned_budget, _tuned_loaded
+    if EMBED_TOKENS_PER_BATCH > 0:
+        return EMBED_TOKENS_PER_BATCH
+    if not _tuned_loaded:                         # 다른 프로세스가 저장해 둔 튜닝 결과 (프로세스당 한 번 읽음)
+        with _tune_lock:
+            if not _tuned_loaded:
+                _tuned_budget = _load_tuned_budget(_autotune_key(model))
+                _tuned_loaded = True
+    if _tuned_budget is not None:
+        return _tuned_budget
+    if len(texts) < _AUTOTUNE_MIN_TEXTS:          # 표본이 작으면 튜닝하지 않고 기본값
+        return min(_DEFAULT_TOKEN_BUDGET, _memory_token_cap(model))
+    with _tune_lock:
+        if _tuned_budget is None:
+            _tuned_budget = _autotune_token_budget(model, texts, lengths)
+            _save_tuned_budget(_autotune_key(model), _tuned_budget)
+    return _tuned_budget
+
+
+def _embed_local(
+    texts: List[str],
+    batch_size: int | None = None,
+    show_progress_bar: bool = False,
+) -> np.ndarray:
+    """이 프로세스에 로드한 모델로 임베딩 (임베딩 서버도 이 함수를 씀)"""
+    from sklearn.preprocessing import normalize
+
     model = _get_model()
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()))
 
-    # 모델에 batch 단위로 전달
-    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=True)
+    lengths = _token_lengths(model, texts)
+    budget = _token_budget(model, texts, lengths) if not batch_size else 0
+    embeddings = _encode_bucketed(model, texts, lengths, budget, batch_size, show_progress_bar)
 
     # 정규화
     embeddings = normalize(embeddings, norm="l2")
 
     return np.array(embeddings)
+
+
+# 공유 임베딩 서버(clustering/embed_server.py) 주소가 있으면 모델을 직접 올리지 않고 서버에 요청
+# EMBED_SERVER_FALLBACK: 서버 장애 시 이 프로세스에 모델을 직접 올려 처리할지 (기본 false → 예외).
+#   gunicorn 웹 워커마다 SBERT를 따로 올리면 단일 모델 구성이 깨지고 컨테이너 메모리가 넘칠 수 있으므로,
+#   프로세스가 하나뿐인 곳(임베딩 워커 등)에서만 명시적으로 켭니다.
+EMBED_SERVER_URL      = os.getenv("EMBED_SERVER_URL", "")
+EMBED_SERVER_FALLBACK = os.getenv("EMBED_SERVER_FALLBACK", "false").lower() == "true"
+
+
+def make_embeddings(
+    texts: List[str],
+    batch_size: int | None = None,
+    show_progress_bar: bool = False,
+) -> np.ndarray:
+    """
+    입력된 텍스트 리스트를 SBERT 임베딩 벡터(NxD, L2 정규화)로 반환합니다.
+    - EMBED_SERVER_URL이 있으면 공유 임베딩 서버에 요청 (다른 호출자 요청과 마이크로 배치로 묶임)
+      서버에 닿지 않으면 예외, EMBED_SERVER_FALLBACK=true로 켠 프로세스만 로컬 모델로 처리
+    - 토큰 길이순으로 묶어 인코딩하고 결과는 입력 순서대로 돌려줌
+    - batch_size=None: 배치당 토큰 수 예산으로 배치 크기 자동 결정 (EMBED_TOKENS_PER_BATCH로 고정 가능)
+    - show_progress_bar: 배치 작업 로그가 지저분해지지 않도록 기본 끔
+    """
+    if EMBED_SERVER_URL:
+        import requests
+        from clustering.embed_server import embed_remote
+        try:
+            # 서버 백엔드가 EMBED_BACKEND와 다르면 예외 → 캐시 이름과 맞는 로컬 모델로 처리
+            return embed_remote(list(texts), EMBED_SERVER_URL, batch_size=batch_size, backend=EMBED_BACKEND)
+        except requests.RequestException as e:
+            if not EMBED_SERVER_FALLBACK:
+                print(f"❌ 임베딩 서버 요청 실패 ({EMBED_SERVER_URL}): {e} (EMBED_SERVER_FALLBACK=false → 로컬 모델 로드 안 함)")
+                raise
+            print(f"⚠️ 임베딩 서버 요청 실패 → 로컬 모델 사용 (pid {os.getpid()}, EMBED_SERVER_FALLBACK=true): {e}")
+    return _embed_local(texts, batch_size=batch_size, show_progress_bar=show_progress_bar)
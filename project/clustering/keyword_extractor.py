@@ -1,19 +1,21 @@
 # clustering/keyword_extractor.py
 
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict
 from sqlalchemy.orm import Session
-from sklearn.feature_extraction.text import TfidfVectorizer
 from models.scrap import PKeyword
 from clustering.embedder import STOPWORDS_KO
+from clustering.tokenizer import get_tokenizer
 from models.article import Keyword, ClusterKeyword
 from collections import Counter
 from itertools import chain
-from konlpy.tag import Okt
+
+if TYPE_CHECKING:       # sklearn은 실제로 TF-IDF를 계산할 때만 import
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
 def extract_top_keywords(
     documents: List[str], cluster_id : int,
     top_n: int = 3, max_features: int = 300,
-    global_vectorizer: TfidfVectorizer = None
+    global_vectorizer: "TfidfVectorizer" = None
 ) -> List[str]:
     """
     주어진 문서 리스트에 대해 TF-IDF를 계산하고,
@@ -93,9 +95,9 @@ def generate_candidates(
     Returns:
         등장 빈도 기준으로 필터링된 후보 키워드 리스트
     """
-    okt = Okt()
+    tokenizer = get_tokenizer(stage="keywords")     # TOKENIZER_KEYWORDS (기본 okt)
     # 1) 형태소 분석으로 문서별 명사 리스트 생성
-    docs_nouns = [okt.nouns(doc) for doc in docs]
+    docs_nouns = [tokenizer.nouns(doc) for doc in docs]
     
     # 2) unigram(단어) 후보
     unigrams = list(chain.from_iterable(docs_nouns))
@@ -129,6 +131,8 @@ def extract_keywords_per_article(documents: List[str], top_n: int = 3, max_featu
     여러 기사에 대해 각각의 top_n 키워드를 추출해서 리스트로 반환.
     전체 문서를 기준으로 TF-IDF 모델을 학습한 후, 각 기사에 적용함.
     """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     vectorizer = TfidfVectorizer(
         stop_words=list(STOPWORDS_KO),
         max_features=max_features,
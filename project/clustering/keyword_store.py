@@ -0,0 +1,127 @@
+# clustering/keyword_store.py
+# 역할: 전역 키워드 → 임베딩 벡터 저장소 (지식맵용)
+# - 대통령, 금리, 손흥민처럼 수많은 사용자가 공유하고 변하지 않는 키워드를 매번 다시 임베딩하지 않도록
+# - 1차: Redis 해시 kwemb:{모델명} (field=키워드, value=float32 바이트)
+#   모델명에는 torch가 아닌 백엔드를 붙임 (예: "jhgan/ko-sbert-sts:onnx") → int8·fp32 벡터가 섞이지 않음
+# - 2차(영구): MySQL keyword_embedding 테이블 — Redis가 비워져도 모델을 다시 돌리지 않음
+# - 둘 다 없는 키워드만 한 번에 모아 make_embeddings 로 계산한 뒤 양쪽에 채움 (lazy, 배치)
+# 벡터는 L2 정규화되어 있으므로 코사인 유사도 = 행렬 곱
+
+import os
+from typing import Dict, List, Sequence
+
+import numpy as np
+import redis
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.connection import SessionLocal
+from models.article import KeywordEmbedding
+from clustering.cache_redis import redis_client
+from clustering.embedder import make_embeddings, _MODEL_NAME, EMBED_BACKEND
+
+# 임베딩 서버를 쓰더라도 make_embeddings 가 서버 백엔드 == EMBED_BACKEND 를 확인하므로 이 이름과 일치
+KWEMB_MODEL = os.getenv(
+    "KWEMB_MODEL", _MODEL_NAME if EMBED_BACKEND == "torch" else f"{_MODEL_NAME}:{EMBED_BACKEND}"
+)
+_DTYPE = "<f4"
+# keyword_embedding 컬럼 길이 (INSERT IGNORE 는 긴 값을 오류 없이 잘라 넣으므로 저장 전에 직접 확인)
+_MODEL_MAX_LEN = KeywordEmbedding.__table__.c.model.type.length
+_NAME_MAX_LEN  = KeywordEmbedding.__table__.c.name.type.length
+if len(KWEMB_MODEL) > _MODEL_MAX_LEN:
+    raise ValueError(f"KWEMB_MODEL 이 keyword_embedding.model 길이({_MODEL_MAX_LEN}자)를 넘습니다: {KWEMB_MODEL!r}")
+
+
+def _redis_key(model: str = KWEMB_MODEL) -> str:
+    return f"kwemb:{model}"
+
+
+def _to_bytes(vec: np.ndarray) -> bytes:
+    return np.ascontiguousarray(vec, dtype=_DTYPE).tobytes()
+
+
+def _from_bytes(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype=_DTYPE)
+
+
+def _load_from_redis(names: List[str]) -> Dict[str, np.ndarray]:
+    try:
+        raws = redis_client.hmget(_redis_key(), names)
+    except redis.RedisError as e:
+        print(f"⚠️ 키워드 임베딩 Redis 조회 실패: {e}")
+        return {}
+    return {n: _from_bytes(r) for n, r in zip(names, raws) if r is not None}
+
+
+def _save_to_redis(vectors: Dict[str, np.ndarray]):
+    if not vectors:
+        return
+    try:
+        redis_client.hset(_redis_key(), mapping={n: _to_bytes(v) for n, v in vectors.items()})
+    except redis.RedisError as e:
+        print(f"⚠️ 키워드 임베딩 Redis 저장 실패: {e}")
+
+
+def _load_from_db(session, names: List[str]) -> Dict[str, np.ndarray]:
+    try:
+        rows = session.execute(
+            select(KeywordEmbedding.name, KeywordEmbedding.vector)
+            .where(KeywordEmbedding.model == KWEMB_MODEL, KeywordEmbedding.name.in_(names))
+        ).all()
+    except SQLAlchemyError as e:
+        session.rollback()
+        print(f"⚠️ 키워드 임베딩 DB 조회 실패: {e}")
+        return {}
+    return {name: _from_bytes(vec) for name, vec in rows}
+
+
+def _save_to_db(session, vectors: Dict[str, np.ndarray]):
+    # 컬럼보다 긴 이름은 잘린 채 저장되어 다른 키워드와 섞이지 않도록 DB에는 넣지 않음 (Redis 에만 캐시)
+    too_long = [n for n in vectors if len(n) > _NAME_MAX_LEN]
+    if too_long:
+        print(f"⚠️ 키워드 임베딩 DB 저장 제외 ({_NAME_MAX_LEN}자 초과 {len(too_long)}개): {too_long[:3]}")
+    rows = [{"model": KWEMB_MODEL, "name": n, "vector": _to_bytes(v)}
+            for n, v in vectors.items() if len(n) <= _NAME_MAX_LEN]
+    if not rows:
+        return
+    # 다른 요청이 같은 키워드를 먼저 넣었을 수 있으므로 IGNORE
+    try:
+        session.execute(insert(KeywordEmbedding.__table__).prefix_with("IGNORE"), rows)
+        session.commit()
+    except SQLAlchemyError as e:
+        # 벡터는 이미 계산됐으므로 지식맵은 그대로 만들고, 다음 요청에서 다시 저장 시도
+        session.rollback()
+        print(f"⚠️ 키워드 임베딩 DB 저장 실패: {e}")
+
+
+def get_keyword_vectors(names: Sequence[str]) -> np.ndarray:
+    """
+    키워드 이름 순서대로 (N, D) float32 정규화 벡터를 돌려줍니다.
+    Redis → MySQL → 모델 순으로 찾고, 아래 계층에서 찾은 것은 위 계층에 다시 채웁니다.
+    """
+    names = list(names)
+    unique = list(dict.fromkeys(names))
+    if not unique:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    found = _load_from_redis(unique)
+    missing = [n for n in unique if n not in found]
+    if missing:
+        session = SessionLocal()
+        try:
+            from_db = _load_from_db(session, missing)
+            _save_to_redis(from_db)
+            found.update(from_db)
+
+            to_embed = [n for n in missing if n not in found]
+            if to_embed:
+                embs = make_embeddings(to_embed).astype(np.float32)
+                computed = dict(zip(to_embed, embs))
+                _save_to_db(session, computed)
+                _save_to_redis(computed)
+                found.update(computed)
+                print(f"🧠 키워드 임베딩 신규 {len(to_embed)}개 계산 (캐시 {len(unique) - len(to_embed)}개 재사용)")
+        finally:
+            session.close()
+
+    return np.vstack([found[n] for n in names])
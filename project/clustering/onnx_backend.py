@@ -0,0 +1,193 @@
+# clustering/onnx_backend.py
+# 역할: ko-sbert를 ONNX로 한 번 내보내고 동적 int8 양자화 → onnxruntime(CPU)으로 추론하는 백엔드
+# - EMBED_BACKEND=onnx 일 때 clustering.embedder._get_model 이 이 모델을 돌려줍니다.
+# - make_embeddings 가 쓰는 SentenceTransformer 인터페이스(tokenizer, max_seq_length, encode,
+#   get_sentence_embedding_dimension)만 흉내 내므로 호출 측 코드는 그대로입니다.
+# - 내보내기(torch 필요)는 {ONNX_DIR}/{모델명}/ 에 파일이 없을 때 최초 1회만 수행합니다.
+# - 운영 로드(verify=True)는 benchmark_onnx 가 남긴 agreement.json 의 torch 대비 코사인 일치도가
+#   ONNX_MIN_COSINE_MEAN / ONNX_MIN_COSINE_MIN 이상일 때만 허용합니다 (검사 전에는 int8 벡터를 만들지 않음).
+# - 캐시는 백엔드별로 분리됩니다 (embedder.embedding_cache_name → "{토픽}:onnx").
+#
+# 미리 내보내기: python -m clustering.onnx_backend export
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+ONNX_DIR     = os.getenv("ONNX_DIR", "data/onnx")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", 0))       # 0 = onnxruntime 기본값(물리 코어 수)
+_FP32_FILE   = "model.onnx"
+_INT8_FILE   = "model.int8.onnx"
+_META_FILE   = "sbert_meta.json"
+_AGREEMENT_FILE = "agreement.json"
+ONNX_MIN_COSINE_MEAN = float(os.getenv("ONNX_MIN_COSINE_MEAN", 0.99))
+ONNX_MIN_COSINE_MIN  = float(os.getenv("ONNX_MIN_COSINE_MIN", 0.95))
+_export_lock = threading.Lock()
+
+
+def _model_dir(model_name: str, base_dir: str = ONNX_DIR) -> Path:
+    return Path(base_dir) / model_name.replace("/", "__")
+
+
+def export_onnx(model_name: str, base_dir: str = ONNX_DIR, quantize: bool = True) -> Path:
+    """
+    SentenceTransformer의 트랜스포머 본체를 ONNX로 내보내고(동적 배치·길이 축),
+    토크나이저·풀링 설정을 함께 저장한 뒤 가중치를 동적 int8로 양자화합니다.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    out = _model_dir(model_name, base_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = st[0], st[1]
+    auto_model = transformer.auto_model.eval()
+
+    dummy = st.tokenizer(["내보내기 테스트 문장"], return_tensors="pt")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in dummy]
+    dynamic = {name: {0: "batch", 1: "seq"} for name in input_names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "seq"}
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(dummy[k] for k in input_names),
+            str(out / _FP32_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=14,
+        )
+
+    st.tokenizer.save_pretrained(str(out))
+    meta = {
+        "model_name": model_name,
+        "max_seq_length": st.max_seq_length,
+        "dim": st.get_sentence_embedding_dimension(),
+        "pooling": "cls" if getattr(pooling, "pooling_mode_cls_token", False) else "mean",
+        "input_names": input_names,
+        "hidden_size": auto_model.config.hidden_size,
+        "num_hidden_layers": auto_model.config.num_hidden_layers,
+    }
+    (out / _META_FILE).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(out / _FP32_FILE), str(out / _INT8_FILE), weight_type=QuantType.QInt8)
+    print(f"✅ ONNX 내보내기 완료: {out}")
+    return out
+
+
+class _Config:
+    def __init__(self, meta: dict):
+        self.hidden_size = meta["hidden_size"]
+        self.num_hidden_layers = meta["num_hidden_layers"]
+
+
+class OnnxSentenceEncoder:
+    """onnxruntime 세션 + 토크나이저 + 풀링 (SentenceTransformer.encode 호환 부분집합)"""
+
+    def __init__(self, model_dir: Path, quantized: bool = True):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        meta = json.loads((model_dir / _META_FILE).read_text(encoding="utf-8"))
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_seq_length = meta["max_seq_length"]
+        self.config = _Config(meta)
+        self._dim = meta["dim"]
+        self._pooling = meta["pooling"]
+        self._input_names = meta["input_names"]
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS > 0:
+            opts.intra_op_num_threads = ONNX_THREADS
+        path = model_dir / (_INT8_FILE if quantized else _FP32_FILE)
+        self.session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer(texts, padding=True, truncation=True,
+                             max_length=self.max_seq_length, return_tensors="np")
+        feeds = {name: enc[name].astype(np.int64) for name in self._input_names}
+        hidden = self.session.run(["last_hidden_state"], feeds)[0]
+        if self._pooling == "cls":
+            return hidden[:, 0]
+        mask = enc["attention_mask"][..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True, **_) -> np.ndarray:
+        sentences = list(sentences)
+        if not sentences:
+            return np.zeros((0, self._dim), dtype=np.float32)
+        out = [self._forward(sentences[i:i + batch_size]) for i in range(0, len(sentences), batch_size)]
+        return np.vstack(out).astype(np.float32)
+
+
+def save_agreement(model_name: str, report: dict, base_dir: str = ONNX_DIR) -> Path:
+    """benchmark_onnx 결과(torch 대비 코사인·ARI)를 모델 디렉토리에 기록"""
+    path = _model_dir(model_name, base_dir) / _AGREEMENT_FILE
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def verify_agreement(model_name: str, base_dir: str = ONNX_DIR):
+    """기록된 일치도가 없거나 기준 미달이면 RuntimeError"""
+    path = _model_dir(model_name, base_dir) / _AGREEMENT_FILE
+    if not path.exists():
+        raise RuntimeError(
+            f"ONNX 일치도 검사 기록이 없습니다 ({path}). "
+            f"먼저 python -m clustering.benchmark_onnx 로 torch와 비교하세요."
+        )
+    report = json.loads(path.read_text(encoding="utf-8"))
+    if report["cosine_mean"] < ONNX_MIN_COSINE_MEAN or report["cosine_min"] < ONNX_MIN_COSINE_MIN:
+        raise RuntimeError(
+            f"ONNX int8 벡터가 torch와 충분히 같지 않습니다: cosine_mean={report['cosine_mean']} "
+            f"(기준 {ONNX_MIN_COSINE_MEAN}), cosine_min={report['cosine_min']} (기준 {ONNX_MIN_COSINE_MIN})"
+        )
+
+
+def ensure_exported(model_name: str, base_dir: str = ONNX_DIR, quantized: bool = True) -> Path:
+    """내보낸 파일이 없으면 내보내고 모델 디렉토리를 돌려줍니다 (프로세스 안에서 한 번만)"""
+    model_dir = _model_dir(model_name, base_dir)
+    needed = model_dir / (_INT8_FILE if quantized else _FP32_FILE)
+    with _export_lock:
+        if not needed.exists() or not (model_dir / _META_FILE).exists():
+            print(f"⏳ ONNX 모델이 없어 내보냅니다: {model_name} → {model_dir}")
+            export_onnx(model_name, base_dir, quantize=quantized)
+    return model_dir
+
+
+def load_onnx_model(model_name: str, base_dir: str = ONNX_DIR, quantized: bool = True,
+                    verify: bool = True) -> OnnxSentenceEncoder:
+    """
+    내보낸 파일이 없으면 먼저 내보낸 뒤 onnxruntime 인코더를 돌려줍니다.
+    verify=True이면 torch 대비 일치도 검사를 통과한 모델만 로드합니다.
+    """
+    model_dir = ensure_exported(model_name, base_dir, quantized)
+    if verify and quantized:
+        verify_agreement(model_name, base_dir)
+    return OnnxSentenceEncoder(model_dir, quantized=quantized)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ko-sbert ONNX 내보내기 / int8 양자화")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_exp = sub.add_parser("export")
+    p_exp.add_argument("--model", type=str, default="jhgan/ko-sbert-sts")
+    p_exp.add_argument("--out", type=str, default=ONNX_DIR)
+    p_exp.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+    export_onnx(args.model, args.out, quantize=not args.no_quantize)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,15 @@ import numpy as np
 import argparse
 from collections import Counter
 from clustering.keyword_extractor import extract_top_keywords
-from clustering.cache import load_embedding_cache, save_embedding_cache
-from clustering.embedder import make_embeddings, preprocess_text
+from clustering.cache import open_embedding_store, align_cache, merge_cached_embeddings
+from clustering.embedder import (
+    make_embeddings, clean_for_embedding, embedding_cache_name,
+    EMBED_INPUT, EMBED_WITH_BODY, EMBED_BODY_CHARS,
+)
+from clustering.prep_cache import preprocess_cached, preprocess_cached_async
 from collector.rss_collector import fetch_texts_with_ids_by_topic, fetch_all_texts
 import time
 from umap import UMAP
-import os
 from clustering.cluster import (
     load_embeddings, run_kmeans, run_dbscan, run_hdbscan,
     save_clusters_to_db, fetch_article_ids
@@ -21,22 +24,25 @@ from models.topic import TopicEnum
 
 def run_embedding_stage(
     topic: TopicEnum, since_hours: int = 24,
-    data_dir: str = "data", batch_size: int = 32,
+    data_dir: str = "data", batch_size: int | None = None, embed_input: str = EMBED_INPUT,
+    with_body: bool = EMBED_WITH_BODY,
 ) -> Tuple[np.ndarray, List[int], List[str], List[str]] | None:
     """
     1) 특정 topic 기사 ID와 원문 리스트(fetched within since_hours) 가져오기
     2) 전처리→캐시 로드→새 임베딩 생성→캐시 업데이트
-    3) 토픽별로 id_path, emb_path를 "data/{topic}_ids.npy", "data/{topic}_embs.npy"로 관리
+    3) 토픽별 캐시는 추가 전용 저장소 "data/{topic}_store/"로 관리 (새 벡터만 덧붙이고 윈도우만 memmap으로 읽음)
+       (embed_input="raw"이면 "data/{topic}_raw_store/" 처럼 저장소를 분리하고,
+        전처리는 임베딩과 동시에 진행)
+    4) with_body(EMBED_WITH_BODY)이면 article_body 본문 앞부분도 입력에 포함 ("data/{topic}_body_store/")
     """
 
-    # 1) 토픽별 파일 경로 생성 (토픽 이름에 따라 파일명 동적 지정)
-    # 예: "data/정치_ids.npy", "data/정치_embs.npy"
-    os.makedirs(data_dir, exist_ok=True)
-    id_path = os.path.join(data_dir, f"{topic.value}_ids_768.npy")
-    emb_path = os.path.join(data_dir, f"{topic.value}_embs_768.npy")
+    # 1) 토픽별 저장소 열기 (예: "data/정치_store/")
+    store = open_embedding_store(data_dir, embedding_cache_name(topic.value, embed_input, with_body=with_body))
 
     # 2) 지난 24시간 동안 발행된 topic별 기사 가져오기
-    rows = fetch_texts_with_ids_by_topic(topic=topic, since_hours=since_hours)
+    rows = fetch_texts_with_ids_by_topic(
+        topic=topic, since_hours=since_hours, with_body=with_body, body_chars=EMBED_BODY_CHARS,
+    )
     if not rows:
         print(f"♨️ [{topic.value}] 기사 없음 → 임베딩 단계 스킵")
         return None
@@ -46,49 +52,42 @@ def run_embedding_stage(
     raw_texts = list(raw_texts)
 
     # 3) 전처리 (한 번만!)
-    cleaned_texts = [preprocess_text(t) for t in raw_texts]
     # cleaned_texts[i] 는 ids_window[i] 에 대한 전처리 결과
+    if embed_input == "raw":
+        cleaned_future = preprocess_cached_async(ids_window, raw_texts)
+        embed_texts = clean_for_embedding(raw_texts)
+    else:
+        cleaned_texts = preprocess_cached(ids_window, raw_texts)
+        embed_texts = cleaned_texts
 
-    # 4) 기존 캐시 로드
-    cached_ids, cached_embs = load_embedding_cache(id_path, emb_path)
-
-    # 5) 캐시와 비교해서 신규로 생성해야 할 ID & 텍스트 추리기
-    reused_embs = []
-    new_texts = []
-    new_ids = []
-    for idx, aid in enumerate(ids_window):
-        # 기존 캐시에 있으면, 그 위치의 embedding을 reused_embs에 담기
-        if aid in cached_ids:
-            idx = int(np.where(cached_ids == aid)[0][0])
-            reused_embs.append(cached_embs[idx])
-        else:
-            new_ids.append(aid)
-            new_texts.append(cleaned_texts[idx])
-
-    # 6) 새로운 임베딩 생성: 이미 전처리된 cleaned_texts 중 새로 필요한 부분만
+    # 4) 기존 캐시에서 윈도우 기사만 로드
+    cached_ids, cached_embs = store.lookup(ids_window)
+
+    # 5) 캐시와 비교해서 신규로 생성해야 할 ID & 텍스트 추리기 (정렬 + searchsorted 한 번)
+    hit, gather_idx = align_cache(ids_window, cached_ids)
+    new_pos = np.flatnonzero(~hit)
+    new_ids = [ids_window[i] for i in new_pos]
+    new_texts = [embed_texts[i] for i in new_pos]
+
+    # 6) 새로운 임베딩 생성: 임베딩 입력(embed_texts) 중 새로 필요한 부분만
     if new_texts:
         new_embs = make_embeddings(new_texts, batch_size=batch_size)
         print(f"✅ [{topic.value}] 신규 {len(new_ids)}개 임베딩 생성")
     else:
-        new_embs = np.zeros((0, cached_embs.shape[1] if cached_embs.size else new_embs.shape[1]))
+        new_embs = np.zeros((0, cached_embs.shape[1]))
         print(f"✅ [{topic.value}] 신규 임베딩 없음, 모두 캐시 재사용")
 
     # 7) 최종 윈도우 임베딩 배열 재조합
-    final_embs_list = []
-    new_idx = 0
-    for aid in ids_window:
-        if aid in cached_ids:
-            idx = int(np.where(cached_ids == aid)[0][0])
-            final_embs_list.append(cached_embs[idx])
-        else:
-            final_embs_list.append(new_embs[new_idx])
-            new_idx += 1
-    final_embs = np.vstack(final_embs_list)
+    final_embs = merge_cached_embeddings(hit, gather_idx, cached_embs, new_embs)
     final_ids = np.array(ids_window, dtype=int)
 
-    # 8) 캐시에 덮어쓰기
-    save_embedding_cache(final_ids, final_embs, id_path, emb_path)
-    print(f"✅ [{topic.value}] 캐시 갱신됨 (since {since_hours}시간) : {len(final_ids)}개")
+    # 8) 신규 벡터만 덧붙이고, 윈도우 밖·중복 행이 많아지면 압축
+    store.append(new_ids, new_embs)
+    removed = store.maybe_compact(keep_ids=final_ids, ttl=since_hours * 3600)
+    print(f"✅ [{topic.value}] 캐시 갱신됨 (since {since_hours}시간) : 신규 {len(new_ids)}개 / 윈도우 {len(final_ids)}개 / 압축 {removed}개")
+
+    if embed_input == "raw":
+        cleaned_texts = cleaned_future.result()
 
     # 9) 결과 리턴: (임베딩 배열, ID 리스트, 원문 리스트, 전처리된 텍스트 리스트)
     return final_embs, ids_window, raw_texts, cleaned_texts
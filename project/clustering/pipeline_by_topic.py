@@ -51,7 +51,7 @@ def run_all_topics_pipeline(
             topic=topic,
             since_hours=since_hours,
             data_dir=data_dir,
-            batch_size=32
+            batch_size=None     # 토큰 길이 기반 자동 배치 (clustering/embedder.py)
         )
         if emb_result is None:
             print(f"----- [{topic.value}] 임베딩 단계 건너뜀 -----")
@@ -0,0 +1,83 @@
+# clustering/prep_cache.py
+# 역할: 기사별 전처리 결과(Okt 형태소 분석 후 토큰 문자열) Redis 캐시
+# - 매시간 24시간 창 전체를 다시 형태소 분석하지 않도록, 기사당 한 번만 preprocess_text 실행
+# - key: prep:v{PREPROCESS_VERSION}:{토크나이저}:{article_id}  (키마다 TTL → Redis가 알아서 만료)
+# - value: "{원문 해시}\t{전처리 결과}"  원문(제목·요약·본문)이 바뀌면 해시가 달라져 다시 계산
+# - 캐시에 없는 기사만 preprocess_texts(프로세스 풀)로 한꺼번에 계산
+# - Redis 장애 시 캐시 없이 전부 계산 (파이프라인은 멈추지 않음)
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Sequence
+
+import redis
+
+from clustering.cache_redis import redis_client
+from clustering.embedder import preprocess_texts, PREPROCESS_VERSION
+from clustering.tokenizer import stage_backend
+
+PREP_CACHE_TTL = int(os.getenv("PREP_CACHE_TTL", 3 * 86400))   # 수집 창(24h)보다 넉넉하게
+
+
+def _key(article_id: int, tokenizer: str) -> str:
+    return f"prep:v{PREPROCESS_VERSION}:{tokenizer}:{int(article_id)}"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()[:16]
+
+
+def preprocess_cached(article_ids: Sequence[int], raw_texts: Sequence[str]) -> List[str]:
+    """
+    preprocess_texts(raw_texts) 와 같은 결과를 돌려주되,
+    캐시에 (기사 ID, 원문 해시)가 맞는 결과가 있으면 재사용하고 나머지만 계산해 저장합니다.
+    """
+    tokenizer = stage_backend("preprocess")
+    hashes = [content_hash(t) for t in raw_texts]
+    keys = [_key(aid, tokenizer) for aid in article_ids]
+    try:
+        cached = redis_client.mget(keys) if keys else []
+    except redis.RedisError as e:
+        print(f"⚠️ 전처리 캐시 조회 실패, 전부 계산합니다: {e}")
+        return preprocess_texts(raw_texts, tokenizer=tokenizer)
+
+    cleaned: List[str | None] = [None] * len(keys)
+    misses = []
+    for i, (h, raw) in enumerate(zip(hashes, cached)):
+        if raw is not None:
+            cached_hash, _, text = raw.decode("utf-8").partition("\t")
+            if cached_hash == h:
+                cleaned[i] = text
+                continue
+        misses.append(i)
+
+    for i, text in zip(misses, preprocess_texts([raw_texts[i] for i in misses], tokenizer=tokenizer)):
+        cleaned[i] = text
+
+    print(f"🧹 전처리 캐시: 재사용 {len(cleaned) - len(misses)}개, 신규 {len(misses)}개")
+    if misses:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for i in misses:
+                pipe.set(keys[i], f"{hashes[i]}\t{cleaned[i]}", ex=PREP_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ 전처리 캐시 저장 실패: {e}")
+    return cleaned
+
+
+# EMBED_INPUT=raw 일 때 임베딩과 겹쳐 돌리기 위한 백그라운드 실행기
+# (실제 형태소 분석은 preprocess_texts의 프로세스 풀에서 돌고, 이 스레드는 대기·캐시 입출력만 담당)
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def preprocess_cached_async(article_ids: Sequence[int], raw_texts: Sequence[str]) -> Future:
+    """preprocess_cached를 백그라운드 스레드에서 실행하고 Future를 돌려줍니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prep-cache")
+    return _executor.submit(preprocess_cached, list(article_ids), list(raw_texts))
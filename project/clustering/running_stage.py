@@ -2,9 +2,13 @@ from models.topic import TopicEnum
 from typing import List, Dict, Tuple, Optional
 import numpy as np
 import os
-from collector.rss_collector import fetch_texts_with_ids_by_topic
-from clustering.embedder import make_embeddings, preprocess_text
-from clustering.cache import load_embedding_cache, save_embedding_cache
+from collector.rss_collector import iter_texts_with_ids_by_topic
+from clustering.embedder import (
+    make_embeddings, clean_for_embedding, embedding_cache_name,
+    EMBED_INPUT, EMBED_WITH_BODY, EMBED_BODY_CHARS,
+)
+from clustering.prep_cache import preprocess_cached, preprocess_cached_async
+from clustering.cache import open_embedding_store, align_cache, merge_cached_embeddings
 from umap import UMAP
 from collections import Counter
 import time
@@ -12,72 +16,118 @@ from clustering.keyword_extractor import extract_top_keywords
 from models.article import ClusterKeyword, Keyword
 from database.connection import SessionLocal
 from sklearn.feature_extraction.text import TfidfVectorizer
-from clustering.cache_redis import load_embedding_cache, save_embedding_cache
+from clustering.cache_redis import load_embedding_cache, save_embedding_cache, touch_embedding_cache, trim_embedding_cache
 from clustering.cluster import (
     load_embeddings, run_kmeans, run_dbscan, run_hdbscan,
     save_clusters_to_db, fetch_article_ids
 )
 
+# 윈도우를 서버 사이드 커서로 읽을 때 한 번에 처리할 기사 수 (전처리·캐시 조회·임베딩 단위)
+# chunk 하나를 처리하는 동안 커서가 멈춰 있으므로 MySQL net_write_timeout(기본 60초) 안에 끝나는 크기로
+EMBED_WINDOW_CHUNK = int(os.getenv("EMBED_WINDOW_CHUNK", 500))
+
+
+def _embed_window_chunk(
+    ids: List[int], raw_texts: List[str], cache_name: str, store,
+    embed_input: str, batch_size: int | None, ttl_seconds: int,
+):
+    """
+    윈도우 한 덩어리(chunk)에 대해 전처리 → Redis/디스크 캐시 조회 → 캐시 미스만 임베딩 → 캐시 기록.
+    Returns: (chunk 임베딩, 전처리 결과 리스트 또는 raw 모드의 Future, 신규 임베딩 수, 디스크 복구 수)
+    """
+    # 전처리 (raw 모드: 백그라운드에서 시작만 하고 임베딩 입력은 원문 정제본)
+    if embed_input == "raw":
+        cleaned = preprocess_cached_async(ids, raw_texts)
+        embed_texts = clean_for_embedding(raw_texts)
+    else:
+        cleaned = preprocess_cached(ids, raw_texts)
+        embed_texts = cleaned
+
+    # Redis 캐시 로드 (chunk 기사만 HMGET) → 없는 기사는 디스크 저장소에서 찾아 Redis에 다시 채움
+    cached_ids, cached_embs = load_embedding_cache(cache_name, ids=ids)
+    redis_hit, _ = align_cache(ids, cached_ids)
+    disk_ids, disk_embs = store.lookup(np.asarray(ids)[~redis_hit])
+    if len(disk_ids):
+        save_embedding_cache(disk_ids, disk_embs, cache_name, ttl=ttl_seconds)
+        cached_ids = np.concatenate([cached_ids, disk_ids])
+        cached_embs = np.vstack([cached_embs, disk_embs])
+
+    # 캐시된 임베딩과 신규 텍스트 분리 (정렬 + searchsorted 한 번) → 신규만 임베딩
+    hit, gather_idx = align_cache(ids, cached_ids)
+    new_pos = np.flatnonzero(~hit)
+    new_ids = [ids[i] for i in new_pos]
+    if len(new_pos):
+        new_embs = make_embeddings([embed_texts[i] for i in new_pos], batch_size=batch_size)
+    else:
+        new_embs = np.zeros((0, cached_embs.shape[1] if cached_embs.size else 0))
+    embs = merge_cached_embeddings(hit, gather_idx, cached_embs, new_embs)
+
+    # 캐시 기록: 사용 시각 갱신 → 신규 기사만 Redis·디스크 저장소에 추가
+    touch_embedding_cache(ids, cache_name)
+    save_embedding_cache(np.array(new_ids, dtype=int), new_embs, cache_name, ttl=ttl_seconds)
+    store.append(new_ids, new_embs)
+    return embs, cleaned, len(new_ids), len(disk_ids)
+
 
 def run_embedding_stage(
     topic: TopicEnum, since_hours: int = 24,
-    data_dir: str = "data", batch_size: int = 32,
+    data_dir: str = "data", batch_size: int | None = None, embed_input: str = EMBED_INPUT,
+    with_body: bool = EMBED_WITH_BODY, chunk_size: int = EMBED_WINDOW_CHUNK,
 ) -> Tuple[np.ndarray, List[int], List[str], List[str]] | None:
     """
-    1) 특정 topic 기사 ID와 원문 리스트(fetched within since_hours) 가져오기
-    2) 전처리→캐시 로드→새 임베딩 생성→캐시 업데이트
+    1) 특정 topic 기사 ID와 원문 리스트(fetched within since_hours)를 chunk_size개씩 스트리밍으로 읽으며
+    2) chunk마다 전처리→캐시 로드→새 임베딩 생성→캐시 업데이트 (_embed_window_chunk)
+    3) UMAP·클러스터링 입력인 윈도우 전체 임베딩·ID·텍스트만 모아서 반환
+    embed_input="raw"이면 정제한 원문을 임베딩하고, 전처리(TF-IDF용)는 임베딩과 동시에 진행
+    캐시는 Redis(1차) + data_dir 아래 추가 전용 디스크 저장소(2차, Redis 재시작에도 유지) 두 단계
+    with_body(EMBED_WITH_BODY)이면 article_body 본문 앞부분도 입력에 포함 (캐시 이름 "{토픽}:body"로 분리)
     """
-    # 1) 최근 since_hours 시간 동안 발행된 topic별 기사 가져오기
-    rows = fetch_texts_with_ids_by_topic(topic=topic, since_hours=since_hours)
-    if not rows:
+    cache_name = embedding_cache_name(topic.value, embed_input, with_body=with_body)
+    store = open_embedding_store(data_dir, cache_name)
+    ttl_seconds = since_hours * 3600
+
+    # 1)~2) 최근 since_hours 시간 동안 발행된 topic별 기사를 chunk 단위로 임베딩
+    ids_window: List[int] = []
+    raw_texts: List[str] = []
+    emb_parts, cleaned_parts = [], []
+    n_new = n_disk = 0
+    for chunk_ids, chunk_texts in iter_texts_with_ids_by_topic(
+        topic, since_hours=since_hours, chunk_size=chunk_size,
+        with_body=with_body, body_chars=EMBED_BODY_CHARS,
+    ):
+        embs, cleaned, new, disk = _embed_window_chunk(
+            chunk_ids, chunk_texts, cache_name, store, embed_input, batch_size, ttl_seconds,
+        )
+        ids_window.extend(chunk_ids)
+        raw_texts.extend(chunk_texts)
+        emb_parts.append(embs)
+        cleaned_parts.append(cleaned)
+        n_new += new
+        n_disk += disk
+
+    if not ids_window:
         print(f"♨️ [{topic.value}] 기사 없음 → 임베딩 단계 스킵")
         return None
+    if n_disk:
+        print(f"💾 [{topic.value}] 디스크 저장소에서 {n_disk}개 복구 → Redis 재적재")
+    print(f"✅ [{topic.value}] 신규 {n_new}개 임베딩 생성 / 캐시 재사용 {len(ids_window) - n_new}개")
 
-    ids_window, raw_texts = zip(*rows)
-    ids_window = list(ids_window)
-    raw_texts = list(raw_texts)
-
-    # 2) 전처리
-    cleaned_texts = [preprocess_text(t) for t in raw_texts]
-
-    # 3) Redis 캐시 로드 (TTL 기반 자동 만료)
-    cached_ids, cached_embs = load_embedding_cache(topic.value)
-
-    # 4) 캐시된 임베딩과 신규 텍스트 분리
-    new_ids, new_texts, reused_embs = [], [], []
-    for aid, text in zip(ids_window, cleaned_texts):
-        if aid in cached_ids:
-            idx = int(np.where(cached_ids == aid)[0][0])
-            reused_embs.append(cached_embs[idx])
-        else:
-            new_ids.append(aid)
-            new_texts.append(text)
-
-    # 5) 신규 임베딩 생성
-    if new_texts:
-        new_embs = make_embeddings(new_texts, batch_size=batch_size)
-        print(f"✅ [{topic.value}] 신규 {len(new_ids)}개 임베딩 생성")
-    else:
-        new_embs = np.zeros((0, cached_embs.shape[1] if cached_embs.size else 0))
-        print(f"✅ [{topic.value}] 신규 임베딩 없음 → 캐시 재사용만")
-
-    # 6) 최종 임베딩 재조합
-    final_embs_list, new_idx = [], 0
-    for aid in ids_window:
-        if aid in cached_ids:
-            idx = int(np.where(cached_ids == aid)[0][0])
-            final_embs_list.append(cached_embs[idx])
-        else:
-            final_embs_list.append(new_embs[new_idx])
-            new_idx += 1
-    final_embs = np.vstack(final_embs_list)
+    # 3) UMAP 입력: 윈도우 전체 임베딩 재조합
+    final_embs = np.vstack(emb_parts)
     final_ids = np.array(ids_window, dtype=int)
 
-    # 7) Redis 캐시 업데이트 (TTL = since_hours * 3600초)
-    ttl_seconds = since_hours * 3600
-    save_embedding_cache(final_ids, final_embs, topic.value, ttl=ttl_seconds)
-    print(f"✅ [{topic.value}] Redis 캐시 갱신 (TTL={ttl_seconds}s): {len(final_ids)}개")
-
+    # 4) 윈도우를 벗어난 지 TTL(= since_hours * 3600초)이 지난 기사만 Redis에서 정리,
+    #    디스크 저장소는 윈도우 밖 행이 많아지면 압축
+    evicted = trim_embedding_cache(cache_name, ttl_seconds)
+    print(f"✅ [{topic.value}] Redis 캐시 갱신 (TTL={ttl_seconds}s): 신규 {n_new}개 / 윈도우 {len(final_ids)}개 / 만료 {evicted}개")
+    store.maybe_compact(keep_ids=final_ids, ttl=ttl_seconds)
+
+    # 5) raw 모드: 임베딩과 동시에 돌던 전처리 결과 회수
+    cleaned_texts = [
+        text
+        for part in cleaned_parts
+        for text in (part.result() if embed_input == "raw" else part)
+    ]
     return final_embs, ids_window, raw_texts, cleaned_texts
 
 
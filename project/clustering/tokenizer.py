@@ -0,0 +1,210 @@
+# clustering/tokenizer.py
+# 역할: 형태소 분석기 백엔드 추상화 (단계별로 골라 쓸 수 있음)
+# - "okt"  : KoNLPy Okt (기본값, JVM, 가장 느리지만 기존 결과와 동일)
+# - "mecab": Mecab-ko (C 구현, python-mecab-ko 또는 konlpy.tag.Mecab 필요, 선택 설치)
+# - "regex": 의존성 없는 공백 분리 + 조사·어미 제거 규칙 (가장 빠름, 품질은 가장 낮음)
+# 모든 백엔드는 Okt 품사 이름(Noun/Verb/Adjective/Alpha/Number/Punctuation/...)으로 맞춰 돌려줍니다.
+#
+# 단계별 선택 (환경변수, 없으면 TOKENIZER → "okt"):
+#   TOKENIZER_PREPROCESS : 임베딩 전처리 (embedder.preprocess_text / preprocess_texts)
+#   TOKENIZER_KEYWORDS   : 키워드 후보 생성 (keyword_extractor.generate_candidates)
+
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from konlpy.tag import Okt
+
+Morphs = List[Tuple[str, str]]
+
+DEFAULT_TOKENIZER = os.getenv("TOKENIZER", "okt")
+STAGES = ("preprocess", "keywords")
+
+
+# KoNLPy Okt 인스턴스 (프로세스당 하나, 첫 사용 시 JVM 기동)
+_okt: "Okt | None" = None
+_okt_lock = threading.Lock()
+
+
+def get_okt() -> "Okt":
+    global _okt
+    if _okt is None:
+        with _okt_lock:
+            if _okt is None:
+                from konlpy.tag import Okt
+                _okt = Okt()
+    return _okt
+
+
+class Tokenizer(ABC):
+    """형태소 분석기 공통 인터페이스 (pos를 구현하지 않은 백엔드는 생성 시점에 TypeError)"""
+
+    name = "base"
+
+    @abstractmethod
+    def pos(self, text: str) -> Morphs:
+        """(단어, Okt 품사) 리스트"""
+
+    def pos_batch(self, docs: Sequence[str]) -> List[Morphs]:
+        """문서별 (단어, 품사) 리스트. 백엔드가 묶음 호출을 지원하면 재정의합니다."""
+        return [self.pos(d) for d in docs]
+
+    def nouns(self, text: str) -> List[str]:
+        return [w for w, tag in self.pos(text) if tag == "Noun"]
+
+
+class OktTokenizer(Tokenizer):
+    name = "okt"
+    _SEP = " . "       # 정규화된 입력엔 문장부호가 없으므로 Punctuation "."이면 문서 경계
+
+    def pos(self, text: str) -> Morphs:
+        return get_okt().pos(text, norm=True, stem=True)
+
+    def pos_batch(self, docs: Sequence[str]) -> List[Morphs]:
+        """
+        문서들을 구분자로 이어 Okt를 한 번만 호출(JVM 왕복 1회)하고 문서별로 다시 나눕니다.
+        구분자 개수가 맞지 않으면(분석기가 구분자를 합친 경우) 문서별 호출로 폴백합니다.
+        """
+        if len(docs) <= 1:
+            return [self.pos(d) for d in docs]
+        parts: List[Morphs] = [[]]
+        for word, tag in self.pos(self._SEP.join(docs)):
+            if tag == "Punctuation" and word == ".":
+                parts.append([])
+            else:
+                parts[-1].append((word, tag))
+        if len(parts) != len(docs):
+            return [self.pos(d) for d in docs]
+        return parts
+
+    def nouns(self, text: str) -> List[str]:
+        return get_okt().nouns(text)
+
+
+class MecabTokenizer(Tokenizer):
+    """
+    Mecab-ko 백엔드. 세종 품사를 Okt 품사로 바꾸고,
+    동사·형용사는 Okt(stem=True)처럼 어간 + "다" 형태로 돌려줍니다.
+    어미가 붙은 복합 태그(예: "했" VV+EP)는 이미 활용된 형태라 "다"를 붙이지 않고 그대로 둡니다.
+    대응표에 없는 품사(어근 XR, 접두사 XPN 등)는 "Unknown".
+    """
+
+    name = "mecab"
+    _TAGS = {"NNG": "Noun", "NNP": "Noun", "NNB": "Noun", "NR": "Noun", "NP": "Noun",
+             "VV": "Verb", "VA": "Adjective", "VX": "Verb", "VCN": "Adjective", "VCP": "Josa",
+             "MAG": "Adverb", "MAJ": "Conjunction", "MM": "Determiner", "IC": "Exclamation",
+             "XSN": "Suffix", "XSV": "Suffix", "XSA": "Suffix",
+             "EP": "PreEomi", "EF": "Eomi", "EC": "Eomi", "ETN": "Eomi", "ETM": "Eomi",
+             "SL": "Alpha", "SH": "Foreign", "SN": "Number",
+             "SF": "Punctuation", "SP": "Punctuation", "SE": "Punctuation",
+             "SSO": "Punctuation", "SSC": "Punctuation", "SC": "Punctuation", "SY": "Punctuation"}
+    # 어간만 있는 용언 태그 (복합 태그가 아닐 때만 "다"를 붙임)
+    _STEM_TAGS = {"VV", "VA", "VX", "VCN"}
+
+    def __init__(self):
+        try:
+            from mecab import MeCab                # python-mecab-ko (사전 포함 휠)
+            self._tagger = MeCab()
+        except ImportError:
+            from konlpy.tag import Mecab           # 시스템에 mecab-ko-dic이 설치된 경우
+            self._tagger = Mecab()
+
+    def pos(self, text: str) -> Morphs:
+        out: Morphs = []
+        for word, tag in self._tagger.pos(text):
+            head = tag.split("+")[0]
+            mapped = self._TAGS.get(head, "Josa" if head.startswith("J") else "Unknown")
+            if tag in self._STEM_TAGS:
+                word = word + "다"
+            out.append((word, mapped))
+        return out
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    공백 단위로 자르고 끝의 조사·어미를 떼어내는 규칙 기반 토크나이저.
+    "~하다/~되다"류 활용형은 Verb(기본형), 나머지 한글 어절은 Noun으로 봅니다.
+    """
+
+    name = "regex"
+    _TOKEN_RE = re.compile(r"[가-힣]+|[a-z]+|[0-9]+|[^\s가-힣a-z0-9]")
+    # "~하다/~되다/~시키다" 활용형 → 기본형 (어근 2자 이상만: "한다", "된다" 자체는 제외)
+    _VERB_RE = re.compile(
+        r"^(.{2,}?)(했다|했던|했고|했으며|했지만|한다|하는|하고|하며|하면|하다|하기|한|할|함|해서|해|"
+        r"됐다|됐던|됐고|된다|되는|되고|되며|되다|되기|된|될|됨|돼|"
+        r"시켰다|시킨다|시키는|시키고|시키다|시킨)$"
+    )
+    _LEMMA = {"하": "하다", "했": "하다", "한": "하다", "할": "하다", "함": "하다", "해": "하다",
+              "되": "되다", "됐": "되다", "된": "되다", "될": "되다", "됨": "되다", "돼": "되다",
+              "시": "시키다"}
+    _JOSA = sorted([
+        "은", "는", "이", "가", "을", "를", "에", "의", "도", "만", "와", "과", "로", "으로",
+        "에서", "에게", "한테", "까지", "부터", "보다", "처럼", "에는", "에서는", "으로는",
+        "이라", "라고", "이라고", "이다", "였다", "이며", "이고", "들", "들은", "들이", "들을", "들의",
+    ], key=len, reverse=True)
+
+    def _strip_josa(self, word: str) -> str:
+        for suffix in self._JOSA:
+            if len(word) > len(suffix) + 1 and word.endswith(suffix):
+                return word[: -len(suffix)]
+        return word
+
+    def pos(self, text: str) -> Morphs:
+        out: Morphs = []
+        for tok in self._TOKEN_RE.findall(text):
+            first = tok[0]
+            if "가" <= first <= "힣":
+                m = self._VERB_RE.match(tok)
+                if m:
+                    out.append((m.group(1) + self._LEMMA[m.group(2)[0]], "Verb"))
+                else:
+                    out.append((self._strip_josa(tok), "Noun"))
+            elif first.isdigit():
+                out.append((tok, "Number"))
+            elif first.isalpha():
+                out.append((tok, "Alpha"))
+            else:
+                out.append((tok, "Punctuation"))
+        return out
+
+
+_BACKENDS = {"okt": OktTokenizer, "mecab": MecabTokenizer, "regex": RegexTokenizer}
+_instances: Dict[str, Tokenizer] = {}
+_instances_lock = threading.Lock()
+
+
+def stage_backend(stage: str) -> str:
+    """단계(preprocess/keywords)에 설정된 백엔드 이름"""
+    return os.getenv(f"TOKENIZER_{stage.upper()}", DEFAULT_TOKENIZER).lower()
+
+
+def get_tokenizer(name: str | None = None, stage: str | None = None) -> Tokenizer:
+    """
+    백엔드 인스턴스(프로세스당 하나)를 돌려줍니다.
+    name을 주지 않으면 stage의 환경변수 설정을, 그것도 없으면 TOKENIZER(기본 "okt")를 씁니다.
+    """
+    name = (name or (stage_backend(stage) if stage else DEFAULT_TOKENIZER)).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"알 수 없는 토크나이저: {name} (가능: {', '.join(_BACKENDS)})")
+    tok = _instances.get(name)
+    if tok is None:
+        with _instances_lock:
+            tok = _instances.get(name)
+            if tok is None:
+                tok = _instances[name] = _BACKENDS[name]()
+    return tok
+
+
+def available_backends() -> List[str]:
+    """현재 환경에서 만들 수 있는 백엔드 이름들 (벤치마크용)"""
+    names = []
+    for name in _BACKENDS:
+        try:
+            get_tokenizer(name).pos("테스트")        # Okt는 여기서 JVM이 실제로 뜸
+            names.append(name)
+        except Exception as e:
+            print(f"⚠️ 토크나이저 '{name}' 사용 불가: {e}")
+    return names
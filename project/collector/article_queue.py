@@ -0,0 +1,38 @@
+# collector/article_queue.py
+# 역할: 새로 저장된 기사 ID를 Redis Stream(emb:queue)에 발행
+# tasks/embed_worker.py 가 이 스트림을 소비해 임베딩 캐시를 미리 채웁니다.
+
+import os
+from typing import Iterable
+
+import redis
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_DB   = int(os.getenv("REDIS_DB", 0))
+
+EMBED_QUEUE_KEY     = os.getenv("EMBED_QUEUE_KEY", "emb:queue")
+EMBED_QUEUE_MAXLEN  = int(os.getenv("EMBED_QUEUE_MAXLEN", 10000))
+EMBED_QUEUE_ENABLED = os.getenv("EMBED_QUEUE_ENABLED", "true").lower() == "true"
+
+redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+
+
+def publish_new_articles(article_ids: Iterable[int], topic: str) -> None:
+    """
+    신규 기사 ID 묶음을 스트림 메시지 하나로 발행합니다.
+    Redis 장애가 수집 자체를 막지 않도록 예외는 출력만 하고 삼킵니다.
+    (놓친 기사는 다음 run_embedding_stage에서 평소처럼 임베딩됩니다)
+    """
+    ids = [str(int(aid)) for aid in article_ids]
+    if not ids or not EMBED_QUEUE_ENABLED:
+        return
+    try:
+        redis_client.xadd(
+            EMBED_QUEUE_KEY,
+            {"topic": topic, "ids": ",".join(ids)},
+            maxlen=EMBED_QUEUE_MAXLEN,
+            approximate=True,
+        )
+    except redis.RedisError as e:
+        print(f"⚠️ 임베딩 큐 발행 실패 ({topic}, {len(ids)}건): {e}")
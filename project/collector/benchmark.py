@@ -0,0 +1,216 @@
+# collector/benchmark.py
+# 역할: 리플레이 서버를 상대로 parse_and_store 처리량 측정 (실제 언론사에 요청하지 않음)
+# 보고 항목: 처리 아이템 수, items/sec, DB 왕복(쿼리) 횟수, 벽시계 시간
+# --parsers: DB 없이 fixture만으로 feedparser vs fast 파서 / 프로세스 풀 파싱 속도 비교
+#
+# ⚠️ 기사가 실제로 저장되므로 .env 의 MYSQL_DB 를 벤치마크용 DB로 지정해서 실행하세요.
+#    Redis는 벤치마크 동안 피드 상태(feed:state:*)를 별도 DB(--redis-db, 기본 BENCHMARK_REDIS_DB=15)에 쓰고
+#    끝나면 리플레이 URL의 상태를 지우며, 임베딩 큐(emb:queue) 발행은 끕니다.
+# 사용 예:
+#   python -m collector.benchmark --latency 0.1 0.5 --rounds 2
+#   python -m collector.benchmark --sequential          # 순차 요청과 비교
+#   python -m collector.benchmark --parsers --repeat 5  # 파서 백엔드 비교 (DB 불필요)
+
+import argparse
+import os
+import time
+from contextlib import contextmanager
+
+import redis
+from sqlalchemy import event
+
+from collector.replay import ReplayServer, DEFAULT_FIXTURE_DIR, load_fixtures
+from collector.parsers import parse_fast, parse_with_feedparser, submit_parse, RSS_PARSE_WORKERS
+
+
+BENCHMARK_REDIS_DB = int(os.getenv("BENCHMARK_REDIS_DB", 15))
+
+
+@contextmanager
+def isolated_redis(urls: list[str], db: int = BENCHMARK_REDIS_DB):
+    """
+    피드 상태 저장소를 벤치마크용 Redis DB로 바꾸고 임베딩 큐 발행을 끕니다.
+    시작·종료 시 리플레이 URL의 상태를 지워 라운드 1이 항상 콜드 상태가 되도록 합니다.
+    """
+    from collector import feed_state, article_queue
+
+    orig_client, orig_enabled = feed_state.redis_client, article_queue.EMBED_QUEUE_ENABLED
+    bench_client = redis.Redis(host=feed_state.REDIS_HOST, port=feed_state.REDIS_PORT, db=db,
+                               decode_responses=True)
+    keys = [feed_state._key(u) for u in urls]
+
+    def _clear():
+        try:
+            if keys:
+                bench_client.delete(*keys)
+        except redis.RedisError as e:
+            print(f"⚠️ 벤치마크 피드 상태 정리 실패: {e}")
+
+    feed_state.redis_client = bench_client
+    article_queue.EMBED_QUEUE_ENABLED = False
+    _clear()
+    try:
+        yield
+    finally:
+        _clear()
+        feed_state.redis_client = orig_client
+        article_queue.EMBED_QUEUE_ENABLED = orig_enabled
+
+
+class QueryCounter:
+    """engine에서 실행되는 SQL 문 개수(= DB 왕복 횟수)를 셉니다."""
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+
+
+def run_benchmark(
+    fixture_dir: str = DEFAULT_FIXTURE_DIR,
+    latency: tuple[float, float] = (0.0, 0.0),
+    error_rate: float = 0.0,
+    truncate_rate: float = 0.0,
+    rounds: int = 1,
+    redis_db: int = BENCHMARK_REDIS_DB,
+    **collector_kwargs,
+) -> list[dict]:
+    """
+    리플레이 서버를 띄우고 parse_and_store 를 rounds번 실행해 라운드별 지표를 반환합니다.
+    두 번째 라운드부터는 조건부 GET / 중복 제거 경로가 측정됩니다.
+    피드 상태는 redis_db 에만 쓰고, 임베딩 큐에는 발행하지 않습니다.
+    """
+    # 파서 벤치마크는 DB 없이 돌 수 있도록 여기서 import
+    from database.connection import engine
+    from collector.rss_collector import parse_and_store
+
+    results = []
+    with ReplayServer(fixture_dir, latency=latency, error_rate=error_rate,
+                      truncate_rate=truncate_rate) as server:
+        urls_by_topic = server.urls_by_topic()
+        urls = [u for v in urls_by_topic.values() for u in v]
+        n_feeds = len(urls)
+        print(f"▶️ 리플레이 서버 {server.base_url} / 피드 {n_feeds}개 / Redis DB {redis_db}")
+
+        with isolated_redis(urls, redis_db):
+            for r in range(1, rounds + 1):
+                with QueryCounter(engine) as qc:
+                    t0 = time.perf_counter()
+                    inserted, skipped = parse_and_store(urls_by_topic=urls_by_topic, **collector_kwargs)
+                    wall = time.perf_counter() - t0
+                items = inserted + skipped
+                row = {
+                    "round": r,
+                    "feeds": n_feeds,
+                    "items": items,
+                    "inserted": inserted,
+                    "skipped": skipped,
+                    "wall_s": round(wall, 3),
+                    "items_per_s": round(items / wall, 1) if wall > 0 else 0.0,
+                    "db_roundtrips": qc.count,
+                }
+                results.append(row)
+                print(f"📊 round {r}: {row}")
+    return results
+
+
+def _time_parser(fn, docs, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            fn(doc)
+    return time.perf_counter() - t0
+
+
+def benchmark_parsers(fixture_dir: str = DEFAULT_FIXTURE_DIR, repeat: int = 3,
+                      workers: int = RSS_PARSE_WORKERS) -> dict:
+    """
+    fixture 피드 전체를 feedparser / fast 파서로 repeat번 파싱해 docs/sec를 비교하고,
+    두 결과의 엔트리 수·링크 일치 여부와 프로세스 풀 파싱 시간을 보고합니다.
+    fast 파서가 처리하지 못한(폴백 대상) 문서 수도 함께 셉니다.
+    """
+    docs = [body for _, body in load_fixtures(fixture_dir)]
+    n = len(docs) * repeat
+
+    slow = _time_parser(parse_with_feedparser, docs, repeat)
+
+    fast_docs, fallback = [], 0
+    for doc in docs:
+        try:
+            parse_fast(doc)
+            fast_docs.append(doc)
+        except Exception:
+            fallback += 1
+    fast = _time_parser(parse_fast, fast_docs, repeat)
+
+    mismatched = 0
+    for doc in fast_docs:
+        a, b = parse_fast(doc), parse_with_feedparser(doc)
+        if [e["link"] for e in a] != [e["link"] for e in b]:
+            mismatched += 1
+
+    submit_parse(docs[0], workers).result()        # 풀 기동(spawn) 비용은 제외
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for fut in [submit_parse(doc, workers) for doc in docs]:
+            fut.result()
+    pooled = time.perf_counter() - t0
+
+    report = {
+        "docs": len(docs),
+        "fallback_docs": fallback,
+        "link_mismatch_docs": mismatched,
+        "feedparser_docs_per_s": round(n / slow, 1) if slow > 0 else 0.0,
+        "fast_docs_per_s": round(len(fast_docs) * repeat / fast, 1) if fast > 0 else 0.0,
+        "pool_docs_per_s": round(n / pooled, 1) if pooled > 0 else 0.0,
+        "pool_workers": workers,
+    }
+    if report["feedparser_docs_per_s"]:
+        report["speedup"] = round(report["fast_docs_per_s"] / report["feedparser_docs_per_s"], 1)
+    print(f"📊 파서 비교: {report}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS 수집기 오프라인 처리량 벤치마크")
+    parser.add_argument("--fixtures", type=str, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--latency", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--sequential", action="store_true", help="동시 요청 대신 순차 요청")
+    parser.add_argument("--no-conditional", action="store_true", help="조건부 GET 끄기")
+    parser.add_argument("--parse-workers", type=int, default=RSS_PARSE_WORKERS, help="파싱 프로세스 수 (0: 인라인)")
+    parser.add_argument("--redis-db", type=int, default=BENCHMARK_REDIS_DB, help="피드 상태를 쓸 벤치마크용 Redis DB 번호")
+    parser.add_argument("--parsers", action="store_true", help="수집 대신 파서 백엔드 비교만 실행")
+    parser.add_argument("--repeat", type=int, default=3, help="--parsers 반복 횟수")
+    args = parser.parse_args()
+
+    if args.parsers:
+        benchmark_parsers(args.fixtures, repeat=args.repeat, workers=args.parse_workers)
+        return
+
+    run_benchmark(
+        fixture_dir=args.fixtures,
+        latency=tuple(args.latency),
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+        rounds=args.rounds,
+        redis_db=args.redis_db,
+        concurrent=not args.sequential,
+        conditional=not args.no_conditional,
+        parse_workers=args.parse_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
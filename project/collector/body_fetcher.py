@@ -0,0 +1,225 @@
+# collector/body_fetcher.py
+# 역할: 수집된 기사의 본문을 별도로(저렴한 주기로) 크롤링해 article_body 테이블에 저장
+# - 제한된 워커 풀 + 호스트별 동시 요청 제한 + 호스트별 초당 요청 수 제한
+# - RSS 수집과 같은 keep-alive 세션(collector.fetcher.get_http_session)을 재사용
+# - 일시적 실패(타임아웃·연결 오류·5xx·429)는 status='retry'로 두고 지수 백오프로 BODY_MAX_ATTEMPTS번까지 재시도,
+#   4xx(404 등)와 재시도 소진은 status='error'로 영구 기록
+#
+# 실행: python -m collector.body_fetcher --limit 200
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from sqlalchemy import Integer, cast, func, literal_column, or_, select
+from sqlalchemy.dialects.mysql import insert
+
+from database.connection import SessionLocal
+from models.article import Article, ArticleBody
+from collector.fetcher import HostLimiter, get_http_session, FETCH_TIMEOUT
+
+BODY_WORKERS      = int(os.getenv("BODY_FETCH_WORKERS", 8))
+BODY_PER_HOST     = int(os.getenv("BODY_PER_HOST_LIMIT", 2))
+BODY_HOST_RPS     = float(os.getenv("BODY_HOST_RPS", 1.0))     # 호스트별 초당 요청 수
+# TEXT 컬럼은 65,535바이트 (utf8mb4에서 한글은 글자당 3바이트) → 글자 수가 아니라 인코딩된 바이트로 자름
+BODY_MAX_BYTES    = 65000
+MIN_PARAGRAPH_LEN = 20
+BODY_MAX_ATTEMPTS = int(os.getenv("BODY_MAX_ATTEMPTS", 4))
+BODY_RETRY_BASE   = int(os.getenv("BODY_RETRY_BASE_MIN", 15))  # 재시도 대기(분): 15 → 30 → 60 ...
+
+
+class HostRateLimiter:
+    """호스트별 최소 요청 간격을 지키도록 대기합니다 (스레드 안전)."""
+
+    def __init__(self, rps: float = BODY_HOST_RPS):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _ParagraphExtractor(HTMLParser):
+    """<p> 태그 텍스트만 모읍니다. script/style/nav 등 내부는 무시."""
+
+    _SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figcaption"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self._buf: List[str] = []
+        self._skip_depth = 0
+        self._in_p = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag == "p":
+            self._in_p += 1
+        elif tag == "br" and self._in_p:
+            self._buf.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "p" and self._in_p:
+            self._in_p -= 1
+            text = " ".join("".join(self._buf).split())
+            if len(text) >= MIN_PARAGRAPH_LEN:
+                self.paragraphs.append(text)
+            self._buf = []
+
+    def handle_data(self, data):
+        if self._in_p and not self._skip_depth:
+            self._buf.append(data)
+
+
+def truncate_utf8(text: str, max_bytes: int = BODY_MAX_BYTES) -> str:
+    """utf-8 인코딩 기준 max_bytes 이하로 자름 (글자 중간에서 끊기지 않게)"""
+    raw = text.encode("utf-8")
+    if len(raw) <= max_bytes:
+        return text
+    return raw[:max_bytes].decode("utf-8", "ignore")
+
+
+def extract_body(html: str) -> str:
+    parser = _ParagraphExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    return truncate_utf8("\n".join(parser.paragraphs))
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """다시 시도해도 소용없는 실패인지 (429를 제외한 4xx)"""
+    resp = getattr(exc, "response", None)
+    if isinstance(exc, requests.HTTPError) and resp is not None:
+        return 400 <= resp.status_code < 500 and resp.status_code != 429
+    return False
+
+
+def _fetch_one(article_id: int, url: str, attempts: int, limiter: HostLimiter, rate: HostRateLimiter) -> dict:
+    """attempts: 이전까지의 시도 횟수"""
+    rate.wait(url)
+    sem = limiter(url)
+    attempts += 1
+    try:
+        with sem:
+            resp = get_http_session(limiter.per_host).get(url, timeout=FETCH_TIMEOUT)
+            resp.raise_for_status()
+            if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
+                resp.encoding = resp.apparent_encoding
+            body = extract_body(resp.text)
+        status = "ok" if body else "empty"
+    except Exception as e:
+        body = None
+        status = "error" if _is_permanent(e) or attempts >= BODY_MAX_ATTEMPTS else "retry"
+        print(f"⚠️ 본문 수집 실패 ({url}, {attempts}회차 → {status}): {e}")
+    return {"article_id": article_id, "body": body, "status": status, "attempts": attempts,
+            "fetched_at": datetime.now(timezone.utc)}
+
+
+def _retry_due_at(attempts_col, fetched_at_col):
+    """지수 백오프: attempts번 실패한 기사는 BODY_RETRY_BASE * 2^(attempts-1) 분 뒤에 재시도 (SQL 식)"""
+    minutes = cast(BODY_RETRY_BASE * func.pow(2, func.greatest(attempts_col - 1, 0)), Integer)
+    return func.timestampadd(literal_column("MINUTE"), minutes, fetched_at_col)
+
+
+def _pending_articles(session, since_hours: int, limit: int) -> List[Tuple[int, str, int]]:
+    """
+    본문이 아직 없는 최근 원본 기사 + 재시도 시각이 된 일시 실패 기사 (최신순)
+    백오프 시각 비교를 SQL에서 해야 LIMIT이 실제로 재시도할 행에만 적용됩니다
+    (대기 중인 retry 행이 최신 limit건을 채워 오래된 미수집 기사가 밀리지 않도록).
+    Returns: [(기사 ID, 링크, 이전 시도 횟수), ...]
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=since_hours)
+    q = (
+        select(Article.id, Article.link, ArticleBody.attempts)
+        .outerjoin(ArticleBody, ArticleBody.article_id == Article.id)
+        .where(
+            or_(
+                ArticleBody.article_id.is_(None),
+                (ArticleBody.status == "retry")
+                & (ArticleBody.attempts < BODY_MAX_ATTEMPTS)
+                & (_retry_due_at(ArticleBody.attempts, ArticleBody.fetched_at) <= now),
+            ),
+            Article.canonical_id.is_(None),
+            Article.fetched_at >= cutoff,
+        )
+        .order_by(Article.id.desc())
+        .limit(limit)
+    )
+    return [(aid, link, attempts or 0) for aid, link, attempts in session.execute(q)]
+
+
+def fetch_article_bodies(
+    limit: int = 200,
+    since_hours: int = 24,
+    workers: int = BODY_WORKERS,
+    per_host: int = BODY_PER_HOST,
+    host_rps: float = BODY_HOST_RPS,
+) -> int:
+    """
+    본문이 없는 기사 최대 limit건을 가져와 article_body에 저장합니다.
+    일시적 실패는 status='retry'(백오프 후 재시도), 영구 실패·재시도 소진은 status='error'로 기록합니다.
+    Returns: 저장한 건수
+    """
+    session = SessionLocal()
+    try:
+        targets = _pending_articles(session, since_hours, limit)
+        if not targets:
+            print("📰 본문 수집 대상 없음")
+            return 0
+
+        t0 = time.time()
+        limiter, rate = HostLimiter(per_host), HostRateLimiter(host_rps)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="body-fetch") as pool:
+            rows = list(pool.map(lambda t: _fetch_one(t[0], t[1], t[2], limiter, rate), targets))
+
+        # 재시도한 기사는 기존 행을 덮어씀
+        stmt = insert(ArticleBody.__table__).values(rows)
+        session.execute(stmt.on_duplicate_key_update(
+            body=stmt.inserted.body, status=stmt.inserted.status,
+            attempts=stmt.inserted.attempts, fetched_at=stmt.inserted.fetched_at,
+        ))
+        session.commit()
+        ok = sum(r["status"] == "ok" for r in rows)
+        retry = sum(r["status"] == "retry" for r in rows)
+        print(f"✅ 본문 수집: {len(rows)}건 중 {ok}건 성공, {retry}건 재시도 예정 ({time.time() - t0:.1f}s)")
+        return len(rows)
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기사 본문 크롤러")
+    parser.add_argument("--limit", type=int, default=200, help="한 번에 수집할 최대 기사 수 (default: 200)")
+    parser.add_argument("--since-hours", type=int, default=24, help="최근 N시간 내 수집된 기사만 (default: 24)")
+    parser.add_argument("--workers", type=int, default=BODY_WORKERS)
+    parser.add_argument("--host-rps", type=float, default=BODY_HOST_RPS, help="호스트별 초당 요청 수")
+    args = parser.parse_args()
+    fetch_article_bodies(limit=args.limit, since_hours=args.since_hours,
+                         workers=args.workers, host_rps=args.host_rps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# collector/dedup.py
+# 역할: 언론사 간 재게재(연합뉴스 전재 등) 기사 근사 중복 탐지
+# - 제목+요약 문자 3-gram SimHash(64bit)
+# - 64bit를 8bit 밴드 8개로 나눈 LSH 인덱스: 해밍 거리 7 이하인 쌍은
+#   비둘기집 원리로 최소 한 밴드가 완전히 같으므로 후보 누락 없이 조회
+# - 기본 임계값 6: 제목·요약이 짧아 "[속보]" 접두어나 문장부호 차이만으로도 5~6비트가 바뀜
+#   (서로 다른 기사는 대개 20비트 이상 차이)
+# - 토픽별 인덱스는 최근 window_hours 시간의 원본(canonical) 기사만 유지
+
+import hashlib
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select, update
+
+from models.article import Article
+from models.topic import TopicEnum
+
+SIMHASH_BITS     = 64
+MAX_DISTANCE     = int(os.getenv("DEDUP_MAX_DISTANCE", 6))
+DEDUP_WINDOW_H   = int(os.getenv("DEDUP_WINDOW_HOURS", 48))
+_BANDS           = 8      # MAX_DISTANCE < _BANDS 여야 후보 누락이 없음
+_BAND_BITS       = SIMHASH_BITS // _BANDS
+_BAND_MASK       = (1 << _BAND_BITS) - 1
+_U64             = (1 << 64) - 1
+
+_CLEAN_RE = re.compile(r"<[^>]+>|http\S+|[^0-9a-z가-힣]")
+
+
+def _shingles(text: str, k: int = 3) -> Iterable[str]:
+    norm = _CLEAN_RE.sub("", text.lower())
+    if len(norm) <= k:
+        return [norm] if norm else []
+    return {norm[i:i + k] for i in range(len(norm) - k + 1)}
+
+
+def simhash(text: str) -> int:
+    """문자 3-gram SimHash (부호 없는 64bit 정수)"""
+    weights = [0] * SIMHASH_BITS
+    for sh in _shingles(text):
+        h = int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    out = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            out |= 1 << bit
+    return out
+
+
+def to_signed(h: int) -> int:
+    """MySQL BIGINT(signed) 컬럼 저장용"""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def to_unsigned(h: int) -> int:
+    return h & _U64
+
+
+class SimHashIndex:
+    """밴드 LSH 기반 SimHash 인덱스 (메모리, 시간 창 기반 만료)"""
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, window_hours: int = DEDUP_WINDOW_H):
+        self.max_distance = max_distance
+        self.window = window_hours * 3600
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, int, float]]] = defaultdict(list)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, article_id: int, h: int, ts: float | None = None):
+        ts = time.time() if ts is None else ts
+        for b in range(_BANDS):
+            self._buckets[(b, (h >> (b * _BAND_BITS)) & _BAND_MASK)].append((article_id, h, ts))
+        self._size += 1
+
+    def query(self, h: int) -> int | None:
+        """해밍 거리 max_distance 이하인 가장 가까운 기사 ID (없으면 None)"""
+        best, best_d = None, self.max_distance + 1
+        for b in range(_BANDS):
+            for aid, other, _ in self._buckets.get((b, (h >> (b * _BAND_BITS)) & _BAND_MASK), ()):
+                d = (h ^ other).bit_count()
+                if d < best_d:
+                    best, best_d = aid, d
+        return best
+
+    def evict(self, now: float | None = None):
+        """window보다 오래된 항목 제거"""
+        cutoff = (time.time() if now is None else now) - self.window
+        removed = 0
+        for key in list(self._buckets):
+            kept = [e for e in self._buckets[key] if e[2] >= cutoff]
+            removed += len(self._buckets[key]) - len(kept)
+            if kept:
+                self._buckets[key] = kept
+            else:
+                del self._buckets[key]
+        self._size -= removed // _BANDS
+
+
+# 토픽별 인덱스 (프로세스 내 캐시, 최초 사용 시 DB에서 최근 원본 기사로 채움)
+_indexes: Dict[TopicEnum, SimHashIndex] = {}
+
+
+def _get_index(session, topic: TopicEnum) -> SimHashIndex:
+    index = _indexes.get(topic)
+    if index is None:
+        index = SimHashIndex()
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=DEDUP_WINDOW_H)
+        rows = session.execute(
+            select(Article.id, Article.simhash, Article.fetched_at)
+            .where(
+                Article.topic == topic,
+                Article.fetched_at >= cutoff,
+                Article.simhash.is_not(None),
+                Article.canonical_id.is_(None),
+            )
+        )
+        for aid, h, fetched_at in rows:
+            index.add(aid, to_unsigned(h), fetched_at.timestamp() if fetched_at else None)
+        _indexes[topic] = index
+    else:
+        index.evict()
+    return index
+
+
+def reset_index(topic: TopicEnum | None = None):
+    """트랜잭션 롤백 등으로 인덱스가 DB와 어긋났을 때 비움 (다음 사용 시 DB에서 다시 채움)"""
+    if topic is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(topic, None)
+
+
+def assign_canonicals(session, topic: TopicEnum, new_articles: List[Tuple[int, int]]) -> List[int]:
+    """
+    새로 저장된 기사들 [(article_id, signed simhash)]를 ID 순서대로 인덱스에 조회해
+    근사 중복이면 canonical_id를 원본 ID로 갱신하고, 아니면 원본으로 인덱스에 추가합니다.
+    커밋은 호출 측에서 합니다. Returns: 원본(canonical) 기사 ID 리스트
+    """
+    index = _get_index(session, topic)
+    canonical_ids: List[int] = []
+    updates = []
+    for aid, h in sorted(new_articles):
+        if h is None:
+            canonical_ids.append(aid)
+            continue
+        h = to_unsigned(h)
+        match = index.query(h)
+        if match == aid:            # 동시 수집으로 이미 인덱스에 들어간 자기 자신
+            canonical_ids.append(aid)
+        elif match is None:
+            index.add(aid, h)
+            canonical_ids.append(aid)
+        else:
+            updates.append({"id": aid, "canonical_id": match})
+
+    if updates:
+        session.execute(update(Article), updates)
+    return canonical_ids
@@ -0,0 +1,90 @@
+# collector/feed_scheduler.py
+# 역할: 피드별 적응형 수집 주기 결정
+# - 최근 신규 기사 수로 피드별 발행 속도(EMA, 건/시간)를 학습해 다음 수집 시각을 정함
+# - 연속 실패 시 서킷 브레이커로 지수 백오프 (매번 20초 타임아웃을 낭비하지 않도록)
+# - 오랫동안 실패하거나 새 기사가 없는 피드는 dead로 강등해 하루 한 번만 확인
+# 상태는 collector.feed_state 의 Redis 해시(feed:state:{url})에 함께 저장됩니다.
+
+import os
+import time
+from typing import Dict
+
+MIN_INTERVAL      = int(os.getenv("FEED_MIN_INTERVAL", 10 * 60))      # 최소 10분
+MAX_INTERVAL      = int(os.getenv("FEED_MAX_INTERVAL", 6 * 3600))     # 최대 6시간
+DEAD_INTERVAL     = int(os.getenv("FEED_DEAD_INTERVAL", 24 * 3600))   # dead 피드는 하루 한 번
+TARGET_PER_POLL   = float(os.getenv("FEED_TARGET_PER_POLL", 5))       # 한 번 수집할 때 기대하는 신규 기사 수
+RATE_ALPHA        = 0.3                                               # EMA 가중치
+BREAKER_THRESHOLD = 3      # 연속 실패 n회부터 백오프
+DEAD_AFTER_FAILS  = 10     # 연속 실패 n회면 dead
+DEAD_AFTER_IDLE   = 72 * 3600   # n초 동안 새 기사가 없으면 dead
+
+
+def _f(state: Dict[str, str], key: str, default: float = 0.0) -> float:
+    try:
+        return float(state.get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_due(state: Dict[str, str], now: float | None = None) -> bool:
+    """다음 수집 시각이 지났거나 기록이 없으면 True"""
+    now = time.time() if now is None else now
+    return _f(state, "next_poll_at") <= now
+
+
+def interval_for_rate(rate: float) -> int:
+    """발행 속도(건/시간) → 수집 주기(초). 한 번에 TARGET_PER_POLL건 정도 쌓이면 수집"""
+    if rate <= 0:
+        return MAX_INTERVAL
+    return int(min(MAX_INTERVAL, max(MIN_INTERVAL, TARGET_PER_POLL / rate * 3600)))
+
+
+def on_success(state: Dict[str, str], new_items: int, now: float | None = None) -> Dict[str, object]:
+    """
+    수집 성공(304 / 변경 없음 포함) 후 갱신할 필드를 반환합니다.
+    new_items: 이번 수집에서 새로 저장된 기사 수
+    """
+    now = time.time() if now is None else now
+    last_poll = _f(state, "last_poll_at", 0.0)
+    elapsed_h = max((now - last_poll) / 3600, MIN_INTERVAL / 3600) if last_poll else 1.0
+
+    observed = new_items / elapsed_h
+    prev = state.get("rate")
+    rate = observed if prev is None else RATE_ALPHA * observed + (1 - RATE_ALPHA) * _f(state, "rate")
+
+    last_new = now if new_items > 0 else _f(state, "last_new_at", now)
+    dead = (now - last_new) >= DEAD_AFTER_IDLE
+    interval = DEAD_INTERVAL if dead else interval_for_rate(rate)
+
+    return {
+        "rate": round(rate, 4),
+        "fails": 0,
+        "dead": int(dead),
+        "last_poll_at": int(now),
+        "last_new_at": int(last_new),
+        "next_poll_at": int(now + interval),
+    }
+
+
+def on_failure(state: Dict[str, str], now: float | None = None) -> Dict[str, object]:
+    """
+    수집 실패 후 갱신할 필드를 반환합니다.
+    BREAKER_THRESHOLD 미만이면 평소 주기대로 재시도, 이상이면 서킷을 열고 지수 백오프.
+    """
+    now = time.time() if now is None else now
+    fails = int(_f(state, "fails")) + 1
+    dead = fails >= DEAD_AFTER_FAILS
+
+    if dead:
+        interval = DEAD_INTERVAL
+    elif fails >= BREAKER_THRESHOLD:
+        interval = min(MAX_INTERVAL * 2, MIN_INTERVAL * 2 ** (fails - BREAKER_THRESHOLD + 1))
+    else:
+        interval = interval_for_rate(_f(state, "rate"))
+
+    return {
+        "fails": fails,
+        "dead": int(dead),
+        "last_poll_at": int(now),
+        "next_poll_at": int(now + interval),
+    }
@@ -0,0 +1,73 @@
+# collector/feed_state.py
+# 역할: 피드별 상태(ETag, Last-Modified, 최상단 아이템 해시)를 Redis에 보관
+# 조건부 GET(If-None-Match / If-Modified-Since)과 "변경 없음" 판별에 사용
+
+import hashlib
+import os
+import re
+from typing import Dict
+
+import redis
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_DB   = int(os.getenv("REDIS_DB", 0))
+
+# 오래 수집되지 않은 피드 상태는 자연 소멸 (기본 7일)
+FEED_STATE_TTL = int(os.getenv("FEED_STATE_TTL", 7 * 86400))
+
+redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+
+# RSS <item> 또는 Atom <entry> 의 첫 블록
+_TOP_ITEM_RE = re.compile(rb"<(item|entry)[\s>].*?</\1>", re.S | re.I)
+
+
+def _key(url: str) -> str:
+    return f"feed:state:{url}"
+
+
+def load_feed_state(url: str) -> Dict[str, str]:
+    """저장된 피드 상태를 dict로 반환 (없으면 빈 dict). Redis 장애 시에도 빈 dict."""
+    try:
+        return redis_client.hgetall(_key(url)) or {}
+    except redis.RedisError as e:
+        print(f"⚠️ 피드 상태 로드 실패 ({url}): {e}")
+        return {}
+
+
+def save_feed_state(url: str, **fields):
+    """None이 아닌 필드만 갱신하고 TTL을 연장합니다."""
+    mapping = {k: str(v) for k, v in fields.items() if v is not None}
+    if not mapping:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(_key(url), mapping=mapping)
+        pipe.expire(_key(url), FEED_STATE_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"⚠️ 피드 상태 저장 실패 ({url}): {e}")
+
+
+def conditional_headers(state: Dict[str, str]) -> Dict[str, str]:
+    """이전 응답의 검증자로 조건부 GET 헤더 구성"""
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def top_item_hash(content: bytes) -> str | None:
+    """
+    피드 XML에서 첫 번째 item/entry 블록만 잘라 MD5.
+    서버가 304를 지원하지 않아도(lastBuildDate만 바뀌는 경우 포함)
+    최상단 기사가 그대로면 feedparser.parse 없이 건너뛸 수 있습니다.
+    """
+    if not content:
+        return None
+    m = _TOP_ITEM_RE.search(content)
+    if m is None:
+        return None
+    return hashlib.md5(m.group(0)).hexdigest()
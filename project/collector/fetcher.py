@@ -0,0 +1,167 @@
+# collector/fetcher.py
+# 역할: RSS 피드를 동시에(스레드 풀) 가져오는 HTTP 계층
+# - 호스트별 동시 요청 수 제한 (언론사 서버에 부담 주지 않도록)
+# - keep-alive 커넥션 풀을 공유하는 requests.Session 사용
+
+import os
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+
+# 환경변수로 조정 가능한 기본값
+FETCH_TIMEOUT   = float(os.getenv("RSS_FETCH_TIMEOUT", 20))
+FETCH_WORKERS   = int(os.getenv("RSS_FETCH_WORKERS", 16))
+PER_HOST_LIMIT  = int(os.getenv("RSS_PER_HOST_LIMIT", 2))
+USER_AGENT      = os.getenv("RSS_USER_AGENT", "Mozilla/5.0 (compatible; HotIssueBot/1.0)")
+
+
+@dataclass
+class FetchResult:
+    url: str
+    content: bytes | None = None
+    status: int | None = None
+    headers: Mapping[str, str] | None = None   # CaseInsensitiveDict
+    error: str | None = None
+    partial: bool = False      # IncompleteRead로 일부만 받은 경우
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+_sessions: Dict[int, requests.Session] = {}
+_session_lock = threading.Lock()
+
+
+def get_http_session(per_host: int = PER_HOST_LIMIT) -> requests.Session:
+    """
+    프로세스 전역에서 공유하는 requests.Session.
+    호스트별 keep-alive 커넥션을 재사용합니다.
+    per_host: 호스트별 동시 요청 수. 커넥션 풀 크기를 이 값 이상으로 잡아야
+              urllib3가 남는 커넥션을 버리지 않으므로("Connection pool is full") 풀 크기별로 세션을 따로 둡니다.
+    """
+    pool_size = max(per_host, 4)
+    session = _sessions.get(pool_size)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(pool_size)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=32,            # 호스트 수만큼 풀 유지
+                    pool_maxsize=pool_size,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": USER_AGENT})
+                _sessions[pool_size] = session
+    return session
+
+
+class HostLimiter:
+    """호스트별 세마포어로 동시 요청 수를 제한합니다."""
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT):
+        self.per_host = per_host
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._sems[host] = sem
+        return sem
+
+
+def _read_body(resp: requests.Response) -> Tuple[bytes, Exception | None]:
+    """
+    본문을 직접 모읍니다. 연결이 중간에 끊겨도 받은 만큼은 돌려줍니다.
+    (requests의 resp.content는 IncompleteRead를 ChunkedEncodingError로 감싸며 partial 데이터를 버림)
+    Returns: (본문, 끊긴 경우 예외 / 정상이면 None)
+    """
+    buf = bytearray()
+    raw = resp.raw
+    try:
+        if hasattr(raw, "read1"):       # urllib3 2.x: 도착한 만큼만 읽기
+            while True:
+                chunk = raw.read1(64 * 1024, decode_content=True)
+                if not chunk:
+                    break
+                buf.extend(chunk)
+        else:
+            for chunk in resp.iter_content(chunk_size=8 * 1024):
+                buf.extend(chunk)
+    except (ProtocolError, requests.exceptions.ChunkedEncodingError, http.client.IncompleteRead) as e:
+        return bytes(buf), e
+    return bytes(buf), None
+
+
+def fetch_feed(
+    url: str,
+    limiter: HostLimiter | None = None,
+    timeout: float = FETCH_TIMEOUT,
+    headers: Dict[str, str] | None = None,
+) -> FetchResult:
+    """
+    단일 피드를 가져옵니다. 예외는 FetchResult.error로 돌려주고 던지지 않습니다.
+    headers에 조건부 GET 헤더를 넘기면 304 응답은 content=None, status=304로 반환됩니다.
+    """
+    session = get_http_session(limiter.per_host if limiter is not None else PER_HOST_LIMIT)
+    sem = limiter(url) if limiter is not None else None
+    try:
+        if sem is not None:
+            sem.acquire()
+        try:
+            resp = session.get(url, timeout=timeout, headers=headers, stream=True)
+            try:
+                if resp.status_code == 304:
+                    return FetchResult(url=url, status=304, headers=resp.headers)
+                resp.raise_for_status()
+                content, broken = _read_body(resp)
+                if broken is not None:
+                    return FetchResult(url=url, content=content, status=resp.status_code,
+                                       headers=resp.headers, error=str(broken), partial=True)
+                return FetchResult(url=url, content=content, status=resp.status_code,
+                                   headers=resp.headers)
+            finally:
+                resp.close()
+        finally:
+            if sem is not None:
+                sem.release()
+    except Exception as e:
+        return FetchResult(url=url, error=str(e))
+
+
+def fetch_all(
+    urls: Iterable[str],
+    max_workers: int = FETCH_WORKERS,
+    per_host: int = PER_HOST_LIMIT,
+    headers_by_url: Dict[str, Dict[str, str]] | None = None,
+) -> Iterator[Tuple[int, FetchResult]]:
+    """
+    urls를 스레드 풀로 동시에 가져오며, 입력 순서대로 (index, FetchResult)를 yield 합니다.
+    앞선 피드가 끝나는 즉시 소비자가 파싱·저장을 시작할 수 있고,
+    전체 소요 시간은 가장 느린 피드 수준으로 줄어듭니다.
+    headers_by_url: url별 추가 요청 헤더 (조건부 GET 등)
+    """
+    url_list: List[str] = list(urls)
+    if not url_list:
+        return
+    headers_by_url = headers_by_url or {}
+    limiter = HostLimiter(per_host)
+    workers = max(1, min(max_workers, len(url_list)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rss-fetch") as pool:
+        futures = [pool.submit(fetch_feed, url, limiter, FETCH_TIMEOUT, headers_by_url.get(url))
+                   for url in url_list]
+        for idx, fut in enumerate(futures):
+            yield idx, fut.result()
@@ -0,0 +1,217 @@
+# collector/parsers.py
+# 역할: RSS/Atom 파서 백엔드
+# - "fast": xml.etree iterparse 기반 스트리밍 파서 (잘 짜인 RSS 2.0 / Atom 전용)
+# - "feedparser": 기존 feedparser (느리지만 깨진 문서도 관대하게 처리)
+# fast 경로에서 XML 오류나 모르는 형식이면 자동으로 feedparser로 폴백합니다.
+# 두 백엔드 모두 같은 형태의 dict 리스트를 돌려줍니다:
+#   {"link", "title", "summary", "published_parsed"(UTC time tuple 또는 None)}
+
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List
+
+import feedparser
+from feedparser.mixin import _FeedParserMixin
+from feedparser.sanitizer import _sanitize_html
+
+RSS_PARSER        = os.getenv("RSS_PARSER", "fast")
+RSS_PARSE_WORKERS = int(os.getenv("RSS_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+
+
+class UnsupportedFeed(Exception):
+    """fast 파서가 처리하지 않는 문서 (feedparser로 폴백)"""
+
+
+def _utc_tuple(dt: datetime | None):
+    if dt is None:
+        return None
+    if dt.tzinfo is None:                       # feedparser와 같이 시간대 없으면 UTC로 간주
+        dt = dt.replace(tzinfo=timezone.utc)
+    return tuple(dt.utctimetuple())              # feedparser처럼 tm_isdst=0
+
+
+def _parse_rfc822(text: str | None):
+    if not text:
+        return None
+    try:
+        return _utc_tuple(parsedate_to_datetime(text.strip()))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _parse_iso(text: str | None):
+    if not text:
+        return None
+    try:
+        return _utc_tuple(datetime.fromisoformat(text.strip().replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _text(elem, tag: str) -> str | None:
+    child = elem.find(tag)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def _sanitize(text: str | None, htmlish: bool) -> str | None:
+    """
+    feedparser와 같은 HTML 정리: script·style 등 위험한 태그/속성 제거 (feedparser 내부 sanitizer 재사용)
+    htmlish=False(일반 텍스트로 선언된 값)는 feedparser처럼 HTML로 보일 때만 정리합니다.
+    """
+    if not text or ("<" not in text and "&" not in text):
+        return text
+    if not htmlish and not _FeedParserMixin.looks_like_html(text):
+        return text
+    return _sanitize_html(text, "utf-8", "text/html")
+
+
+def _guid_link(elem) -> str | None:
+    """<link>가 없을 때 feedparser처럼 guid를 링크로 쓰되, isPermaLink="false"인 불투명 ID는 제외"""
+    guid = elem.find("guid")
+    if guid is None or guid.text is None:
+        return None
+    if guid.get("isPermaLink", "true").strip().lower() != "true":
+        return None
+    return guid.text.strip()
+
+
+def _entry(link, title, summary, published_parsed) -> Dict:
+    entry = {"link": link, "summary": summary, "published_parsed": published_parsed}
+    if title is not None:          # feedparser처럼 제목이 없으면 키를 빼서 호출 측 기본값 사용
+        entry["title"] = title
+    return entry
+
+
+def _rss_item(elem) -> Dict:
+    published = _parse_rfc822(_text(elem, "pubDate")) or _parse_iso(_text(elem, _DC_DATE))
+    return _entry(
+        link=_text(elem, "link") or _guid_link(elem),
+        title=_sanitize(_text(elem, "title"), htmlish=False),
+        summary=_sanitize(_text(elem, "description"), htmlish=True) or "",
+        published_parsed=published,
+    )
+
+
+def _atom_entry(elem) -> Dict:
+    link = None
+    for ln in elem.findall(f"{_ATOM}link"):
+        if ln.get("rel", "alternate") == "alternate":
+            link = ln.get("href")
+            break
+    published = _parse_iso(_text(elem, f"{_ATOM}published")) or _parse_iso(_text(elem, f"{_ATOM}updated"))
+    summary_elem = elem.find(f"{_ATOM}summary")
+    if summary_elem is None or not (summary_elem.text or "").strip():
+        summary_elem = elem.find(f"{_ATOM}content")
+    summary = None
+    if summary_elem is not None and summary_elem.text is not None:
+        # Atom은 type 속성으로 HTML 여부를 선언 (기본 "text")
+        summary = _sanitize(summary_elem.text.strip(), htmlish=summary_elem.get("type", "text") in ("html", "xhtml"))
+    title_elem = elem.find(f"{_ATOM}title")
+    title = None
+    if title_elem is not None and title_elem.text is not None:
+        title = _sanitize(title_elem.text.strip(), htmlish=title_elem.get("type", "text") in ("html", "xhtml"))
+    return _entry(link=link, title=title, summary=summary or "", published_parsed=published)
+
+
+def parse_fast(content: bytes) -> List[Dict]:
+    """
+    iterparse로 item/entry 단위로 읽고 바로 버리는 스트리밍 파서.
+    잘못된 XML이면 ET.ParseError, RSS 2.0 / Atom이 아니면 UnsupportedFeed.
+    """
+    entries: List[Dict] = []
+    root_tag = None
+    for event, elem in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            if root_tag is None:
+                root_tag = elem.tag
+                if root_tag not in ("rss", f"{_ATOM}feed"):
+                    raise UnsupportedFeed(root_tag)
+            continue
+        if elem.tag == "item":
+            entries.append(_rss_item(elem))
+            elem.clear()
+        elif elem.tag == f"{_ATOM}entry":
+            entries.append(_atom_entry(elem))
+            elem.clear()
+    return entries
+
+
+def parse_with_feedparser(content: bytes) -> List[Dict]:
+    feed = feedparser.parse(content)
+    return [
+        _entry(
+            link=e.get("link"),
+            title=e.get("title"),
+            summary=e.get("summary", ""),
+            published_parsed=tuple(e.published_parsed) if e.get("published_parsed") else None,
+        )
+        for e in feed.entries
+    ]
+
+
+def parse_feed(content: bytes, backend: str | None = None) -> List[Dict]:
+    """
+    피드 바이트 → 엔트리 dict 리스트.
+    backend: "fast"(기본, 실패 시 feedparser 폴백) 또는 "feedparser"
+    프로세스 풀에서도 호출되므로 모듈 최상위 함수로 유지합니다.
+    """
+    backend = backend or RSS_PARSER
+    if backend == "fast" and content:
+        try:
+            return parse_fast(content)
+        except (ET.ParseError, UnsupportedFeed):
+            pass
+    return parse_with_feedparser(content)
+
+
+# --- 프로세스 풀 파싱 ---
+# 파싱(CPU)을 별도 프로세스에서 돌려 네트워크 대기·DB 저장과 겹치게 합니다.
+# API 프로세스(스레드·JVM 보유)를 fork하지 않도록 spawn 컨텍스트를 씁니다.
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_parse_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def _shutdown_parse_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_parse(content: bytes, workers: int = RSS_PARSE_WORKERS, backend: str | None = None) -> Future:
+    """
+    parse_feed를 프로세스 풀에 제출합니다. workers=0이면 현재 스레드에서 바로 파싱한
+    결과를 담은 완료된 Future를 돌려줍니다.
+    """
+    backend = backend or RSS_PARSER
+    if workers <= 0:
+        fut: Future = Future()
+        try:
+            fut.set_result(parse_feed(content, backend))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+    return _get_parse_pool(workers).submit(parse_feed, content, backend)
@@ -0,0 +1,204 @@
+# collector/replay.py
+# 역할: 실제 언론사에 요청하지 않고 수집기를 측정하기 위한 리플레이 하네스
+# 1) archive_feeds: rss_urls_by_topic 의 원본 XML을 gzip으로 data/feeds/ 에 저장
+# 2) ReplayServer: 저장된 피드를 로컬 HTTP로 제공 (지연·에러·잘린 본문 재현, ETag 지원)
+#
+# 사용 예:
+#   python -m collector.replay archive --out data/feeds
+#   python -m collector.replay serve --port 8765 --latency 0.2 0.8 --error-rate 0.05
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from collector.fetcher import fetch_all
+from collector.rss_list import rss_urls_by_topic
+
+DEFAULT_FIXTURE_DIR = "data/feeds"
+MANIFEST = "manifest.json"
+
+
+def _slug(url: str) -> str:
+    return hashlib.md5(url.encode("utf-8")).hexdigest()[:12]
+
+
+def archive_feeds(out_dir: str = DEFAULT_FIXTURE_DIR, urls_by_topic: dict | None = None) -> int:
+    """
+    현재 피드 원본을 {out_dir}/{slug}.xml.gz 로 저장하고 manifest.json 을 씁니다.
+    전송 중 끊겨 일부만 받은 피드는 저장하지 않습니다. 저장한 피드 수를 반환합니다.
+    """
+    urls_by_topic = urls_by_topic or rss_urls_by_topic
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    pairs = [(topic, url) for topic, urls in urls_by_topic.items() for url in urls]
+    manifest: List[Dict[str, str]] = []
+    for idx, res in fetch_all([url for _, url in pairs]):
+        topic, url = pairs[idx]
+        if res.partial:
+            # 잘린 XML을 fixture로 남기면 이후 라운드가 깨진 문서 파싱을 측정하게 되므로 저장하지 않음
+            print(f"⚠️ 아카이브 건너뜀 ({url}): 본문이 중간에 끊김 ({len(res.content)} bytes, {res.error})")
+            continue
+        if res.error:
+            print(f"⚠️ 아카이브 실패 ({url}): {res.error}")
+            continue
+        slug = _slug(url)
+        with gzip.open(out / f"{slug}.xml.gz", "wb") as f:
+            f.write(res.content)
+        manifest.append({"topic": topic, "url": url, "slug": slug})
+        print(f"✓ [{topic}] {url} → {slug}.xml.gz ({len(res.content)} bytes)")
+
+    (out / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✅ 피드 {len(manifest)}개 아카이브 완료: {out}")
+    return len(manifest)
+
+
+def load_fixtures(fixture_dir: str = DEFAULT_FIXTURE_DIR) -> List[Tuple[Dict[str, str], bytes]]:
+    """manifest 순서대로 (manifest 항목, 압축 해제된 XML) 리스트를 반환"""
+    base = Path(fixture_dir)
+    manifest = json.loads((base / MANIFEST).read_text(encoding="utf-8"))
+    return [(item, gzip.decompress((base / f"{item['slug']}.xml.gz").read_bytes())) for item in manifest]
+
+
+class ReplayServer:
+    """
+    아카이브된 피드를 http://127.0.0.1:{port}/{slug} 로 제공하는 로컬 서버.
+    - latency: (최소, 최대) 초 사이 균등 분포 지연
+    - error_rate: 503 응답 비율
+    - truncate_rate: Content-Length보다 짧게 보내고 끊는 비율 (IncompleteRead 경로)
+    - If-None-Match 가 본문 ETag와 같으면 304
+    """
+
+    def __init__(
+        self,
+        fixture_dir: str = DEFAULT_FIXTURE_DIR,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Tuple[float, float] = (0.0, 0.0),
+        error_rate: float = 0.0,
+        truncate_rate: float = 0.0,
+        seed: int = 42,
+    ):
+        self.fixtures = load_fixtures(fixture_dir)
+        self.bodies = {item["slug"]: body for item, body in self.fixtures}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls_by_topic(self) -> Dict[str, List[str]]:
+        """parse_and_store(urls_by_topic=...) 에 그대로 넘길 수 있는 로컬 URL 맵"""
+        mapping: Dict[str, List[str]] = {}
+        for item, _ in self.fixtures:
+            mapping.setdefault(item["topic"], []).append(f"{self.base_url}/{item['slug']}")
+        return mapping
+
+    def _roll(self) -> Tuple[float, float]:
+        with self._rng_lock:
+            return self._rng.uniform(*self.latency), self._rng.random()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # 벤치마크 출력이 묻히지 않도록 조용히
+                pass
+
+            def do_GET(self):
+                delay, dice = server._roll()
+                if delay:
+                    time.sleep(delay)
+
+                body = server.bodies.get(self.path.lstrip("/"))
+                if body is None:
+                    self.send_error(404)
+                    return
+                if dice < server.error_rate:
+                    self.send_error(503)
+                    return
+
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                truncated = dice < server.error_rate + server.truncate_rate
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                if truncated:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                if truncated:
+                    self.wfile.write(body[: len(body) // 2])
+                    self.close_connection = True
+                else:
+                    self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS 피드 아카이브 / 리플레이 서버")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_arch = sub.add_parser("archive", help="실제 피드를 fixture로 저장")
+    p_arch.add_argument("--out", type=str, default=DEFAULT_FIXTURE_DIR)
+
+    p_serve = sub.add_parser("serve", help="fixture를 로컬 HTTP로 제공")
+    p_serve.add_argument("--fixtures", type=str, default=DEFAULT_FIXTURE_DIR)
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--latency", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    p_serve.add_argument("--error-rate", type=float, default=0.0)
+    p_serve.add_argument("--truncate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.cmd == "archive":
+        archive_feeds(args.out)
+        return
+
+    server = ReplayServer(args.fixtures, port=args.port, latency=tuple(args.latency),
+                          error_rate=args.error_rate, truncate_rate=args.truncate_rate)
+    print(f"▶️ 리플레이 서버: {server.base_url} (피드 {len(server.bodies)}개)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
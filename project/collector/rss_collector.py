@@ -4,107 +4,307 @@
 #일단은 rss에서 뉴스 크롤링하여 제목만 추출하고 저장하는 코드로 구현
 # 나중에 뉴스 본문도 크롤링하여 저장하는 코드로 수정할 예정
 
-import feedparser
+from collections import deque
 from datetime import datetime, timezone, timedelta
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, insert, select, and_, or_
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Dict, Iterator, List, Tuple
 from database.connection import SessionLocal
-from models.article import Article
+from models.article import Article, ArticleBody
 from collector.rss_list import rss_urls_by_topic  # 토픽 이름(key)은 문자열이지만,
 from models.topic import TopicEnum                  # 실제 DB 저장은 Enum 멤버로 변환
+from collector.fetcher import fetch_all, fetch_feed, FETCH_WORKERS, PER_HOST_LIMIT
+from collector import feed_scheduler
+from collector.article_queue import publish_new_articles
+from collector.parsers import submit_parse, RSS_PARSE_WORKERS
+from collector.dedup import simhash, to_signed, assign_canonicals, reset_index
+from collector.feed_state import load_feed_state, save_feed_state, conditional_headers, top_item_hash
 import hashlib
-import requests
-import http.client
 from zoneinfo import ZoneInfo
 
-def parse_and_store():
+
+def _entry_to_row(entry, topic_enum: TopicEnum) -> dict | None:
+    """RSS 엔트리 → article 테이블 row(dict). link가 없으면 None"""
+    # 1) RSS 엔트리에서 데이터 추출
+    link = entry.get("link")
+    if not link:
+        return None
+    publ_pars = entry.get("published_parsed")
+    if publ_pars:
+        published_utc = datetime(*publ_pars[:6], tzinfo=timezone.utc)
+        published = published_utc.astimezone(ZoneInfo("Asia/Seoul"))
+    else:
+        published = None
+
+    title   = entry.get("title", "제목 없음")
+    summary = entry.get("summary", "")
+    return {
+        "title": title,
+        "link": link,
+        # 2) link_hash 계산 (MD5)
+        "link_hash": hashlib.md5(link.encode("utf-8")).hexdigest(),
+        "summary": summary,
+        "published": published,
+        "fetched_at": datetime.now(timezone.utc),
+        "topic": topic_enum,
+        # 3) 재게재 기사 탐지용 SimHash
+        "simhash": to_signed(simhash(f"{title} {summary}")),
+    }
+
+
+def _store_feed(session, topic: str, topic_enum: TopicEnum, url: str, entries: List[dict]) -> Tuple[int, int, List[int]]:
+    """
+    파싱된 피드 하나(collector.parsers.parse_feed 결과)를 한 번에 저장합니다.
+    1) 피드 내부 중복 제거 → 2) link_hash IN (...) 한 번으로 기존 기사 걸러내기
+    3) 남은 기사만 multi-row INSERT IGNORE 한 번 + commit 한 번
+    4) 신규 기사 중 다른 언론사 재게재본은 canonical_id로 원본에 연결 (collector/dedup.py)
+    Returns: (저장 건수, 건너뛴 건수, 신규 원본 기사 ID 리스트)
+    """
+    print(f"[{topic}] {url} 피드 아이템 수:", len(entries))
+
+    rows: Dict[str, dict] = {}
+    for entry in entries:
+        row = _entry_to_row(entry, topic_enum)
+        if row is not None:
+            rows.setdefault(row["link_hash"], row)
+    if not rows:
+        return 0, len(entries), []
+
+    existing = set(
+        session.execute(
+            select(Article.link_hash).where(Article.link_hash.in_(list(rows)))
+        ).scalars()
+    )
+    survivors = [row for h, row in rows.items() if h not in existing]
+
+    inserted, new_ids = 0, []
+    if survivors:
+        # 동시에 다른 수집기가 같은 기사를 넣었더라도 IGNORE로 무시
+        stmt = insert(Article.__table__).values(survivors).prefix_with("IGNORE")
+        inserted = session.execute(stmt).rowcount
+        if inserted:
+            new_rows = session.execute(
+                select(Article.id, Article.simhash)
+                .where(Article.link_hash.in_([r["link_hash"] for r in survivors]))
+            ).all()
+            new_ids = assign_canonicals(session, topic_enum, [tuple(r) for r in new_rows])
+        session.commit()
+
+    skipped = len(entries) - inserted
+    print(f"✓ [{topic}] 저장 {inserted}건 (재게재 {inserted - len(new_ids)}건) / ⚠ 중복 건너뜀 {skipped}건")
+    return inserted, skipped, new_ids
+
+
+def _iter_feeds(urls_by_topic: dict):
+    """(topic 문자열, TopicEnum, url) 을 rss_list 순서대로 나열"""
+    for topic, url_list in urls_by_topic.items():
+        try:
+            topic_enum = TopicEnum(topic)
+        except ValueError:
+            # 만약 rss_list에 토픽이 enum 정의에 없다면 기본값 할당하거나 무시
+            print(f"⚠ 알 수 없는 토픽: {topic} (넘겨뜀)")
+            continue
+        for url in url_list:
+            yield topic, topic_enum, url
+
+
+def parse_and_store(
+    urls_by_topic: dict | None = None,
+    concurrent: bool = True,
+    max_workers: int = FETCH_WORKERS,
+    per_host: int = PER_HOST_LIMIT,
+    conditional: bool = True,
+    only_due: bool = False,
+    parse_workers: int = RSS_PARSE_WORKERS,
+):
+    """
+    모든 피드를 가져와 파싱 후 저장합니다.
+    - concurrent=True: 피드를 스레드 풀로 동시에 가져오고(호스트별 per_host개 제한),
+      파싱·저장은 rss_list 순서(토픽별 순서)대로 이 스레드에서 진행
+    - concurrent=False: 기존처럼 한 피드씩 순차 요청
+    - conditional=True: Redis에 저장된 ETag/Last-Modified로 조건부 GET,
+      304 이거나 최상단 아이템 해시가 같으면 파싱·저장을 건너뜀
+    - only_due=True: feed_scheduler가 정한 다음 수집 시각이 지난 피드만 수집
+    - parse_workers: 파싱용 프로세스 수 (0이면 이 스레드에서 파싱)
+      받은 피드는 즉시 파싱 풀에 넘기고, 앞선 피드의 파싱이 끝나는 대로 순서대로 저장
+    수집 결과(신규 건수/실패)는 항상 feed_scheduler에 기록되어 다음 주기를 조정합니다.
+    """
+    feeds = list(_iter_feeds(urls_by_topic or rss_urls_by_topic))
+    states = {url: load_feed_state(url) for _, _, url in feeds}
+    if only_due:
+        due = [f for f in feeds if feed_scheduler.is_due(states[f[2]])]
+        print(f"⏱ 수집 대상 피드 {len(due)}/{len(feeds)}개")
+        feeds = due
+    urls = [url for _, _, url in feeds]
+    headers_by_url = {url: conditional_headers(states[url]) for url in urls} if conditional else {}
+    if concurrent:
+        results = fetch_all(urls, max_workers=max_workers, per_host=per_host,
+                            headers_by_url=headers_by_url)
+    else:
+        results = ((idx, fetch_feed(url, headers=headers_by_url.get(url)))
+                   for idx, url in enumerate(urls))
+
+    totals = {"inserted": 0, "skipped": 0}
     session = SessionLocal()
+
+    def _store(idx, res, top_hash, parsed):
+        topic, topic_enum, url = feeds[idx]
+        try:
+            entries = parsed.result()
+        except Exception as e:
+            print(f"⚠️ RSS 파싱 실패 ({url}): {e}")
+            save_feed_state(url, **feed_scheduler.on_failure(states[url]))
+            return
+        try:
+            inserted, skipped, new_ids = _store_feed(session, topic, topic_enum, url, entries)
+        except SQLAlchemyError as e:
+            session.rollback()
+            reset_index(topic_enum)
+            print(f"⚠️ DB 저장 실패 ({url}): {e}")
+            return
+        # 신규 기사는 바로 임베딩 워커로 (다음 정각 클러스터링에서 캐시 적중)
+        publish_new_articles(new_ids, topic_enum.value)
+        totals["inserted"] += inserted
+        totals["skipped"] += skipped
+
+        # 저장이 끝난 뒤에만 검증자를 갱신 (실패 시 다음 실행에서 다시 받음)
+        fields = feed_scheduler.on_success(states[url], inserted)
+        if conditional:
+            resp_headers = res.headers or {}
+            fields.update(
+                etag=resp_headers.get("ETag"),
+                last_modified=resp_headers.get("Last-Modified"),
+                top_hash=top_hash,
+            )
+        save_feed_state(url, **fields)
+
+    # 파싱 중인 피드 (rss_list 순서 유지)
+    pending = deque()
     try:
-        for topic, url_list in rss_urls_by_topic.items():
-            try:
-                topic_enum = TopicEnum(topic)
-            except ValueError:
-                # 만약 rss_list에 토픽이 enum 정의에 없다면 기본값 할당하거나 무시
-                print(f"⚠ 알 수 없는 토픽: {topic} (넘겨뜀)")
+        for idx, res in results:
+            topic, topic_enum, url = feeds[idx]
+            state = states[url]
+            # --- 견고하게 RSS 가져오기 ---
+            if res.partial:
+                print(f"⚠️ IncompleteRead from {url}: {res.error}; proceeding with partial data")
+            elif res.error:
+                print(f"⚠️ RSS fetch error ({url}): {res.error}")
+                save_feed_state(url, **feed_scheduler.on_failure(state))
+                continue
+            if res.not_modified:
+                print(f"[{topic}] {url} 304 Not Modified → 건너뜀")
+                save_feed_state(url, **feed_scheduler.on_success(state, 0))
+                continue
+
+            top_hash = None if res.partial else top_item_hash(res.content)
+            if conditional and top_hash and top_hash == state.get("top_hash"):
+                print(f"[{topic}] {url} 최상단 기사 변경 없음 → 건너뜀")
+                save_feed_state(url, **feed_scheduler.on_success(state, 0))
                 continue
 
-            for url in url_list:    
-                # --- 견고하게 RSS 가져오기 ---
-                try:
-                    resp = requests.get(url, timeout=20)
-                    resp.raise_for_status()
-                    content = resp.content
-                except http.client.IncompleteRead as ir:
-                    print(f"⚠️ IncompleteRead from {url}: {ir}; proceeding with partial data")
-                    content = ir.partial
-                except Exception as e:
-                    print(f"⚠️ RSS fetch error ({url}): {e}")
-                    continue
-                feed = feedparser.parse(content)
-
-                print(f"[{topic}] {url} 피드 아이템 수:", len(feed.entries))
-                for entry in feed.entries:
-                    # 1) RSS 엔트리에서 데이터 추출
-                    link      = entry.link
-                    title     = entry.get("title", "제목 없음")
-                    summary   = entry.get("summary", "")
-                    publ_pars = entry.get("published_parsed")
-                    if publ_pars:
-                        published_utc = datetime(*publ_pars[:6], tzinfo=timezone.utc)
-                        published = published_utc.astimezone(ZoneInfo("Asia/Seoul"))
-                    else:
-                        published = None
-
-                    # 2) link_hash 계산 (MD5)
-                    link_hash = hashlib.md5(link.encode("utf-8")).hexdigest()
-
-                    # 3) Article 인스턴스 생성
-                    art = Article(
-                        title=title,
-                        link=link,
-                        link_hash=link_hash,
-                        summary=summary,
-                        published=published,
-                        fetched_at=datetime.now(timezone.utc),
-                        topic=topic_enum
-                    )
-
-                    # 3) 중복(Unique) 처리: IntegrityError 발생 시 무시
-                    session.add(art)
-                    try:
-                        session.commit()
-                        print(f"✓ 저장: {title}")
-                    except IntegrityError:
-                        session.rollback()
-                        print(f"⚠ 중복 건너뜀: link_hash={link_hash}")
+            pending.append((idx, res, top_hash, submit_parse(res.content, parse_workers)))
+            # 앞쪽 피드 파싱이 끝났으면 다음 피드를 기다리는 동안 저장
+            while pending and pending[0][3].done():
+                _store(*pending.popleft())
+
+        while pending:
+            _store(*pending.popleft())
 
     finally:
         session.close()
 
+    print(f"📊 RSS 수집 결과: 저장 {totals['inserted']}건, 중복 {totals['skipped']}건")
+    return totals["inserted"], totals["skipped"]
+
 if __name__ == "__main__":
     parse_and_store()
     print("RSS 크롤링 → MySQL 저장 완료.")
 
 
 # 1) 임베딩용: (id, text) 튜플 반환
-def fetch_texts_with_ids_by_topic(topic: TopicEnum, limit: int | None = None, since_hours: int | None = None):
+def _window_select(
+    topic: TopicEnum, since_hours: int | None, canonical_only: bool,
+    with_body: bool, body_chars: int,
+):
+    """
+    topic + 발행 시각 창 조회문.
+    WHERE topic = ? AND published >= ? (AND canonical_id IS NULL) 는
+    ix_article_topic_published(topic, published, canonical_id) 범위 스캔으로 처리됩니다.
+    (커버링 인덱스는 아님: TEXT 컬럼인 title·summary는 인덱스에 없어 조건에 맞는 행만 PK로 다시 읽음)
+    canonical_only여도 원본이 시간 창 밖에 있는 재게재본은 포함합니다
+    (원본이 클러스터링되지 않으면 사본을 붙일 곳이 없어 지도에서 사라지므로 사본 자신을 클러스터링).
+    """
+    cols = [Article.id, Article.title, Article.summary]
+    if with_body:
+        cols.append(func.substr(ArticleBody.body, 1, body_chars))
+    stmt = select(*cols).where(Article.topic == topic)
+    if with_body:
+        stmt = stmt.outerjoin(ArticleBody, ArticleBody.article_id == Article.id)
+    cutoff = None
+    if since_hours is not None:
+        cutoff = datetime.utcnow() - timedelta(hours=since_hours)
+        stmt = stmt.where(Article.published >= cutoff)
+    if canonical_only and cutoff is None:
+        stmt = stmt.where(Article.canonical_id.is_(None))
+    elif canonical_only:
+        canonical = aliased(Article)
+        stmt = stmt.outerjoin(
+            canonical, and_(canonical.id == Article.canonical_id, canonical.published >= cutoff)
+        ).where(or_(Article.canonical_id.is_(None), canonical.id.is_(None)))
+    return stmt
+
+
+def _row_text(row) -> str:
+    text = f"{row[1]} {row[2] or ''}"
+    if len(row) > 3:
+        text += f" {row[3] or ''}"
+    return text.strip()
+
+
+def iter_texts_with_ids_by_topic(
+    topic: TopicEnum, since_hours: int | None = None, chunk_size: int = 1000,
+    canonical_only: bool = True, with_body: bool = False, body_chars: int = 1000,
+) -> Iterator[Tuple[List[int], List[str]]]:
+    """
+    fetch_texts_with_ids_by_topic 의 스트리밍 버전.
+    서버 사이드 커서(stream_results + yield_per)로 읽으며 (기사 ID 리스트, text 리스트)를 chunk_size개씩 yield 합니다.
+    드라이버가 결과 전체를 버퍼링하지 않으므로 메모리는 chunk 하나 크기로 제한됩니다.
+    소비하는 동안 커넥션을 잡고 있으므로, chunk 하나 처리 시간이 MySQL net_write_timeout 보다 짧도록 chunk_size를 잡습니다.
+    """
+    stmt = _window_select(topic, since_hours, canonical_only, with_body, body_chars)
+    session = SessionLocal()
+    try:
+        result = session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        for part in result.partitions(chunk_size):
+            yield [row[0] for row in part], [_row_text(row) for row in part]
+    finally:
+        session.close()
+
+
+def fetch_texts_with_ids_by_topic(
+    topic: TopicEnum, limit: int | None = None, since_hours: int | None = None,
+    canonical_only: bool = True, with_body: bool = False, body_chars: int = 1000,
+):
     """
     topic으로 필터링해서 (article_id, text) 튜플 리스트 반환
     - text는 “제목 + 요약” 형태
     - limit: 최대 n개 기사만 가져옴
     - since_hours: 최근 n시간 이내에 발행된 기사만
+    - canonical_only: 다른 언론사 재게재본(canonical_id가 있는 기사)은 제외
+      (원본이 since_hours 창 밖에 있는 사본은 대신 포함)
+    - with_body: article_body에 본문이 있으면 앞부분 body_chars자를 덧붙임
+      (임베딩 단계는 EMBED_WITH_BODY 로 켜고, 캐시 이름이 "{토픽}:body"로 분리됨)
     """
+    stmt = _window_select(topic, since_hours, canonical_only, with_body, body_chars)
+    if limit is not None:
+        stmt = stmt.order_by(Article.fetched_at.desc()).limit(limit)
     session = SessionLocal()
     try:
-        q = session.query(Article.id, Article.title, Article.summary).filter(Article.topic == topic)
-        if since_hours is not None:
-            cutoff = datetime.utcnow() - timedelta(hours=since_hours)
-            q = q.filter(Article.published >= cutoff)
-        if limit is not None:
-            q = q.order_by(Article.fetched_at.desc()).limit(limit)
-        rows = q.all()
+        rows = session.execute(stmt).all()
     finally:
         session.close()
-    return [(aid, f"{title} {summary or ''}".strip()) for aid, title, summary in rows]
+    return [(row[0], _row_text(row)) for row in rows]
 
 
 # 2) 키워드용: 순수 문자열 리스트 반환
@@ -130,4 +330,30 @@ def fetch_all_texts_by_topic(limit: int | None = None, since_hours: int | None =
         rows = q.all()
     finally:
         session.close()
-    return [f"{t.title} {t.summary or ''}".strip() for t in rows]
\ No newline at end of file
+    return [f"{t.title} {t.summary or ''}".strip() for t in rows]
+
+
+# 3) 임베딩 워커용: 지정한 ID의 (id, text) 튜플 반환
+def fetch_texts_by_ids(
+    article_ids: list[int], with_body: bool = False, body_chars: int = 1000,
+) -> list[tuple[int, str]]:
+    """
+    article_ids에 해당하는 (article_id, "제목 요약") 리스트를 반환합니다.
+    없는 ID는 건너뜁니다.
+    with_body: fetch_texts_with_ids_by_topic 과 같은 규칙으로 본문 앞부분을 덧붙임
+               (정각 임베딩 단계와 같은 설정이어야 같은 기사에 같은 벡터가 캐시됨)
+    """
+    if not article_ids:
+        return []
+    cols = [Article.id, Article.title, Article.summary]
+    if with_body:
+        cols.append(func.substr(ArticleBody.body, 1, body_chars))
+    stmt = select(*cols).where(Article.id.in_(article_ids))
+    if with_body:
+        stmt = stmt.outerjoin(ArticleBody, ArticleBody.article_id == Article.id)
+    session = SessionLocal()
+    try:
+        rows = session.execute(stmt).all()
+    finally:
+        session.close()
+    return [(row[0], _row_text(row)) for row in rows]
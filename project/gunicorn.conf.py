@@ -0,0 +1,112 @@
+# gunicorn.conf.py
+# 역할: 멀티 워커 운영용 gunicorn 설정 (app.py 옆의 pre-fork 진입점)
+# - preload_app: 마스터가 app:app 을 import 하고 SBERT 가중치를 올린 뒤 fork
+#   → 워커들은 가중치를 copy-on-write 로 공유 (워커 수만큼 메모리가 늘지 않음)
+# - gc.freeze(): fork 직전 객체들을 GC 대상에서 빼서, GC가 참조를 건드려 페이지가 복사되는 것을 줄임
+# - JVM(Okt)은 fork 후 살아남지 못하므로 워커마다 post_worker_init 에서 띄우고,
+#   임베딩 워밍업 추론까지 끝낸 뒤에야 요청을 받음 → 첫 스크랩/지식맵 요청 지연 제거
+#   (워밍업 동안 하트비트를 보내 worker timeout 에 걸려 재시작되지 않게 함)
+# - EMBED_BACKEND=onnx 이면 ONNX 내보내기·양자화를 마스터에서 한 번만(별도 프로세스로) 끝내 둠
+#   → 워커들이 동시에 내보내다 timeout 으로 죽는 일이 없음
+# - 스케줄러(정각 파이프라인 등)는 워커 하나만 실행 (RUN_SCHEDULER)
+# - EMBED_SERVER_URL 이 설정되어 있으면(docker-compose 기본) 모델은 임베딩 서버에만 있고,
+#   여기서는 Okt 워밍업·스케줄러 단일화만 적용됩니다 (preload·gc.freeze 는 쓰지 않음).
+#   웹 프로세스가 직접 모델을 공유하는 preload 구성은 docker-compose.preload.yml (EMBED_SERVER_URL 을 비움)
+#
+# 실행: gunicorn -c gunicorn.conf.py app:app   (docker-compose 의 web 서비스 기본 명령)
+# 코드 자동 재시작이 필요한 로컬 개발은 docker-compose.dev.yml (uvicorn --reload)
+
+import gc
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# 마스터에서 토크나이저 스레드 풀이 생긴 채로 fork 되지 않도록
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "true").lower() == "true"
+# 워커당 torch 연산 스레드 수 (기본: 코어를 워커 수로 나눔)
+TORCH_THREADS = int(os.getenv("TORCH_THREADS_PER_WORKER", max(1, (os.cpu_count() or 1) // max(1, workers))))
+
+
+def _uses_local_model() -> bool:
+    from clustering.embedder import EMBED_SERVER_URL
+    return not EMBED_SERVER_URL
+
+
+@contextmanager
+def _heartbeat(worker):
+    """오래 걸리는 워밍업 동안 마스터에 살아 있다고 알림 (timeout 보다 자주)"""
+    done = threading.Event()
+
+    def _beat():
+        while not done.wait(max(1.0, timeout / 4)):
+            worker.notify()
+
+    t = threading.Thread(target=_beat, name="warmup-heartbeat", daemon=True)
+    t.start()
+    try:
+        yield
+    finally:
+        done.set()
+        t.join()
+
+
+def when_ready(server):
+    """마스터: 워커를 띄우기 전에 가중치만 로드 (추론은 하지 않음 — OpenMP 스레드 풀을 만든 채 fork 하면 위험)"""
+    from clustering.embedder import EMBED_BACKEND, _get_model, _MODEL_NAME
+
+    if PRELOAD_MODEL and _uses_local_model():
+        if EMBED_BACKEND == "onnx":
+            # 내보내기(torch 추론 포함)는 별도 프로세스에서 한 번만 → 워커는 파일만 읽음
+            from clustering.onnx_backend import _model_dir, _INT8_FILE
+            if not (_model_dir(_MODEL_NAME) / _INT8_FILE).exists():
+                server.log.info("ONNX 모델 내보내기·양자화 중 (최초 1회)")
+                subprocess.run([sys.executable, "-m", "clustering.onnx_backend", "export",
+                                "--model", _MODEL_NAME], check=True)
+            # onnxruntime 세션은 생성 시 스레드 풀을 만들므로 fork 전에 만들지 않음 (워커에서 로드)
+            server.log.info("EMBED_BACKEND=onnx → 세션은 워커에서 로드합니다")
+        else:
+            _get_model()
+            server.log.info("SBERT 가중치를 마스터에 로드했습니다 (워커와 copy-on-write 공유)")
+    gc.collect()
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    """마스터: 살아 있는 워커 중 스케줄러 담당이 없으면 이번 워커에게 맡김"""
+    alive = {w.age for w in server.WORKERS.values()}
+    owner = getattr(server, "_scheduler_owner_age", None)
+    if owner not in alive:
+        server._scheduler_owner_age = owner = worker.age
+    os.environ["RUN_SCHEDULER"] = "true" if owner == worker.age else "false"
+
+
+def post_fork(server, worker):
+    if _uses_local_model():
+        try:
+            import torch
+            torch.set_num_threads(TORCH_THREADS)
+        except ImportError:
+            pass
+
+
+def post_worker_init(worker):
+    """워커: 요청을 받기 전에 JVM(Okt) 기동 + 임베딩 워밍업 추론"""
+    from clustering.embedder import make_embeddings, preprocess_text
+
+    try:
+        with _heartbeat(worker):
+            preprocess_text("워밍업 문장입니다")
+            make_embeddings(["워밍업 문장입니다"])
+        worker.log.info(f"워커 {worker.pid} 워밍업 완료 (scheduler={os.getenv('RUN_SCHEDULER')})")
+    except Exception as e:
+        worker.log.warning(f"워커 {worker.pid} 워밍업 실패 (첫 요청에서 다시 로드): {e}")
@@ -3,7 +3,7 @@
 # 모든 모델 import 해서 Base metadata 구성
 
 from .user import User, KnowledgeMap
-from .article import Article, Cluster, ClusterKeyword
+from .article import Article, ArticleBody, Cluster, ClusterKeyword, KeywordEmbedding
 from .note import Note, NoteArticle
 from .scrap import Scrap, PKeyword, PKeywordArticle
 from .base import Base
\ No newline at end of file
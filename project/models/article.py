@@ -1,8 +1,8 @@
 # models/article.py
 # 역할: 기사 관련 모델 정의
-# article, cluster, cluster_article, cluster_keyword, keyword
+# article, cluster, cluster_article, cluster_keyword, keyword, keyword_embedding
 
-from sqlalchemy import Column, BigInteger, Date, Integer, String, DateTime, Text, ForeignKey, CHAR, UniqueConstraint, Index, Enum as SQLEnum
+from sqlalchemy import Column, BigInteger, Date, Integer, String, DateTime, Text, ForeignKey, CHAR, UniqueConstraint, Index, LargeBinary, Enum as SQLEnum
 from datetime import datetime, timezone, timedelta
 from models.base import Base
 from sqlalchemy.orm import relationship
@@ -12,6 +12,8 @@ KST = ZoneInfo("Asia/Seoul")
 
 class Article(Base):
     __tablename__ = "article"
+    # 시간 창 조회(topic = ? AND published >= ? AND canonical_id IS NULL)용 복합 인덱스
+    __table_args__ = (Index("ix_article_topic_published", "topic", "published", "canonical_id"),)
 
     id = Column(BigInteger, primary_key=True, index=True)
     title = Column(String(512), nullable=False)
@@ -22,12 +24,31 @@ class Article(Base):
     fetched_at = Column(DateTime(timezone=True), default=datetime.now(KST))
     # Enum으로 토픽을 엄격하게 제한
     topic = Column(SQLEnum(TopicEnum, name="topic_enum"), nullable=False)
+    # 제목+요약 SimHash(64bit, signed로 저장)와 원본 기사 ID
+    # canonical_id가 있으면 다른 언론사에 재게재된 사본 → 임베딩/클러스터링에서 제외
+    simhash = Column(BigInteger, nullable=True)
+    canonical_id = Column(BigInteger, ForeignKey("article.id", ondelete="SET NULL"), nullable=True, index=True)
 
     # 관계
     scrap = relationship("Scrap", back_populates="article")
     note_article = relationship("NoteArticle", back_populates="article")
     cluster_article = relationship("ClusterArticle", back_populates="article")
     pkeyword_articles = relationship("PKeywordArticle", back_populates="article")
+    # 본문은 별도 테이블에 두고 필요할 때만 로드 (article row를 가볍게 유지)
+    body = relationship("ArticleBody", back_populates="article", uselist=False, lazy="select")
+
+# 기사 본문 (collector/body_fetcher.py가 주기적으로 채움)
+class ArticleBody(Base):
+    __tablename__ = "article_body"
+
+    article_id = Column(BigInteger, ForeignKey("article.id", ondelete="CASCADE"), primary_key=True)
+    body = Column(Text, nullable=True)
+    status = Column(String(16), nullable=False)     # ok / empty / retry(일시 실패) / error(영구 실패)
+    attempts = Column(Integer, nullable=False, default=1, server_default="1")
+    fetched_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+
+    # 관계
+    article = relationship("Article", back_populates="body")
 
 class Cluster(Base):
     __tablename__ = "cluster"
@@ -78,6 +99,21 @@ class Keyword(Base):
     # trend_keywords = relationship("TrendKeyword", back_populates="keyword")
     # today_keywords = relationship("TodayKeywordHourly", back_populates="keyword")
 
+
+class KeywordEmbedding(Base):
+    """
+    키워드 이름 → SBERT 벡터 (전역, 사용자 무관). Redis 해시(kwemb:{model})의 영구 저장소.
+    vector: L2 정규화된 float32 little-endian 바이트
+    """
+    __tablename__ = "keyword_embedding"
+    __table_args__ = (UniqueConstraint("model", "name", name="uq_keyword_embedding_model_name"),)
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    model = Column(String(100), nullable=False)             # 예: "jhgan/ko-sbert-sts:onnx"
+    name = Column(String(100), nullable=False)              # keyword.name / pkeyword.name 과 같은 길이
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
 # 트렌드 페이지 - 하루마다 업데이트 되는 top n개 키워드 저장하는 테이블
 class TrendKeyword(Base):
     __tablename__ = "trend_keyword"
@@ -0,0 +1,205 @@
+# tasks/embed_worker.py
+# 역할: 수집기가 발행한 신규 기사 ID(emb:queue)를 소비해 임베딩 캐시를 미리 채우는 백그라운드 워커
+# 매시 정각 run_embedding_stage 는 대부분 캐시 적중 → UMAP + 클러스터링만 남습니다.
+#
+# 실행: python -m tasks.embed_worker
+
+import argparse
+import os
+import socket
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+import redis
+
+from collector.article_queue import redis_client, EMBED_QUEUE_KEY, EMBED_QUEUE_MAXLEN
+from collector.rss_collector import fetch_texts_by_ids
+from clustering.embedder import (
+    make_embeddings, clean_for_embedding, embedding_cache_name,
+    EMBED_INPUT, EMBED_WITH_BODY, EMBED_BODY_CHARS,
+)
+from clustering.prep_cache import preprocess_cached, preprocess_cached_async
+from clustering.cache_redis import save_embedding_cache
+from clustering.cache import open_embedding_store
+
+EMBED_GROUP     = os.getenv("EMBED_QUEUE_GROUP", "embedder")
+EMBED_CACHE_TTL = int(os.getenv("EMBED_CACHE_TTL", 24 * 3600))
+EMBED_STORE_DIR = os.getenv("EMBED_STORE_DIR", "data")     # run_embedding_stage 의 data_dir 과 같아야 함
+# 이 횟수만큼 전달됐는데도 ACK 못 한 메시지는 dead-letter 스트림으로 옮기고 ACK (큐가 막히지 않도록)
+EMBED_MAX_DELIVERIES = int(os.getenv("EMBED_MAX_DELIVERIES", 5))
+EMBED_DEADLETTER_KEY = os.getenv("EMBED_DEADLETTER_KEY", f"{EMBED_QUEUE_KEY}:dead")
+
+
+def _ensure_group():
+    try:
+        redis_client.xgroup_create(EMBED_QUEUE_KEY, EMBED_GROUP, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _read(consumer: str, stream_id: str, count: int, block_ms: int | None):
+    resp = redis_client.xreadgroup(
+        EMBED_GROUP, consumer, {EMBED_QUEUE_KEY: stream_id}, count=count, block=block_ms
+    )
+    return resp[0][1] if resp else []
+
+
+def _dead_letter_exhausted(consumer: str, max_deliveries: int = EMBED_MAX_DELIVERIES) -> int:
+    """
+    이 컨슈머의 pending 메시지 중 max_deliveries번 이상 전달된 것을 dead-letter 스트림으로 옮기고 ACK 합니다.
+    (pending 메시지는 매 루프 "0"부터 다시 읽으므로, 계속 실패하는 메시지가 뒤따르는 배치를 모두 막지 않도록)
+    """
+    pending = redis_client.xpending_range(
+        EMBED_QUEUE_KEY, EMBED_GROUP, min="-", max="+", count=1000, consumername=consumer
+    )
+    moved = 0
+    for p in pending:
+        if p["times_delivered"] < max_deliveries:
+            continue
+        msg_id = p["message_id"]
+        for _, fields in redis_client.xrange(EMBED_QUEUE_KEY, msg_id, msg_id):
+            redis_client.xadd(
+                EMBED_DEADLETTER_KEY,
+                {**fields, "source_id": msg_id, "deliveries": p["times_delivered"]},
+                maxlen=EMBED_QUEUE_MAXLEN, approximate=True,
+            )
+        redis_client.xack(EMBED_QUEUE_KEY, EMBED_GROUP, msg_id)
+        moved += 1
+        print(f"☠️ 임베딩 메시지 {msg_id}: {p['times_delivered']}회 실패 → {EMBED_DEADLETTER_KEY} 로 이동")
+    return moved
+
+
+def _collect_batch(
+    consumer: str, batch_size: int, max_wait: float
+) -> Tuple[List[str], Dict[str, List[Tuple[str, List[int]]]]]:
+    """
+    batch_size건이 모이거나 max_wait초가 지날 때까지 메시지를 모읍니다.
+    먼저 이전에 처리하다 만(ACK 안 된) 메시지를 가져오고, 그다음 새 메시지를 읽습니다.
+    Returns: (메시지 ID 리스트, topic → [(메시지 ID, 기사 ID 리스트), ...])
+    """
+    msg_ids: List[str] = []
+    by_topic: Dict[str, List[Tuple[str, List[int]]]] = defaultdict(list)
+    n_articles = 0
+
+    def _add(entries):
+        nonlocal n_articles
+        for msg_id, fields in entries:
+            if fields is None:
+                # pending 상태에서 MAXLEN 으로 잘려 나간 항목: 본문이 없으니 ACK 만 하고 건너뜀
+                # (해당 기사는 정각 run_embedding_stage 가 캐시 미스로 임베딩)
+                redis_client.xack(EMBED_QUEUE_KEY, EMBED_GROUP, msg_id)
+                print(f"⚠️ 임베딩 메시지 {msg_id}: 스트림에서 잘려 나감 → ACK 후 건너뜀")
+                continue
+            try:
+                ids = [int(x) for x in fields.get("ids", "").split(",") if x]
+            except ValueError:
+                redis_client.xack(EMBED_QUEUE_KEY, EMBED_GROUP, msg_id)
+                print(f"⚠️ 임베딩 메시지 {msg_id}: 잘못된 ids {fields.get('ids')!r} → ACK 후 건너뜀")
+                continue
+            msg_ids.append(msg_id)
+            by_topic[fields.get("topic", "")].append((msg_id, ids))
+            n_articles += len(ids)
+
+    _add(_read(consumer, "0", batch_size, None))
+    deadline = time.monotonic() + max_wait
+    while n_articles < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        entries = _read(consumer, ">", batch_size, max(1, int(remaining * 1000)))
+        if not entries:
+            break
+        _add(entries)
+    return msg_ids, by_topic
+
+
+def embed_articles(topic: str, article_ids: List[int]) -> int:
+    """
+    기사들을 run_embedding_stage와 같은 방식(전처리 → SBERT)으로 임베딩해
+    토픽별 Redis 캐시와 디스크 저장소(Redis 재시작 대비)에 저장합니다. 저장한 건수를 반환합니다.
+    """
+    rows = fetch_texts_by_ids(sorted(set(article_ids)), with_body=EMBED_WITH_BODY, body_chars=EMBED_BODY_CHARS)
+    if not rows:
+        return 0
+    ids, raw_texts = zip(*rows)
+    # 정각 클러스터링이 같은 전처리 결과를 재사용하도록 캐시에 남김
+    if EMBED_INPUT == "raw":
+        cleaned = preprocess_cached_async(ids, raw_texts)
+        embs = make_embeddings(clean_for_embedding(raw_texts))
+        cleaned.result()
+    else:
+        embs = make_embeddings(preprocess_cached(ids, raw_texts))
+    cache_name = embedding_cache_name(topic)
+    save_embedding_cache(np.array(ids, dtype=int), embs, cache_name, ttl=EMBED_CACHE_TTL)
+    open_embedding_store(EMBED_STORE_DIR, cache_name).append(ids, embs)
+    return len(ids)
+
+
+def _embed_topic(topic: str, messages: List[Tuple[str, List[int]]]) -> Tuple[int, List[str]]:
+    """
+    한 토픽의 메시지들을 한 번에 임베딩합니다. 실패하면 메시지별로 다시 시도해
+    문제 있는 메시지만 남깁니다. Returns: (저장 건수, ACK 할 메시지 ID 리스트)
+    """
+    try:
+        total = embed_articles(topic, [aid for _, ids in messages for aid in ids])
+        return total, [msg_id for msg_id, _ in messages]
+    except Exception as e:
+        print(f"⚠️ [{topic}] 임베딩 실패: {e}")
+        if len(messages) == 1:
+            return 0, []
+    total, done = 0, []
+    for msg_id, ids in messages:
+        try:
+            total += embed_articles(topic, ids)
+            done.append(msg_id)
+        except Exception as e:
+            print(f"⚠️ [{topic}] 메시지 {msg_id} 임베딩 실패: {e}")
+    return total, done
+
+
+def run_worker(batch_size: int = 64, max_wait: float = 2.0, consumer: str | None = None):
+    # 재시작 후에도 같은 이름이어야 ACK 안 된 자기 메시지를 다시 가져옴
+    consumer = consumer or socket.gethostname()
+    _ensure_group()
+    print(f"🚀 임베딩 워커 시작 (stream={EMBED_QUEUE_KEY}, group={EMBED_GROUP}, consumer={consumer})")
+    while True:
+        try:
+            _dead_letter_exhausted(consumer)
+            msg_ids, by_topic = _collect_batch(consumer, batch_size, max_wait)
+        except redis.RedisError as e:
+            print(f"⚠️ 큐 읽기 실패: {e} → 5초 후 재시도")
+            time.sleep(5)
+            continue
+        if not msg_ids:
+            continue
+
+        t0 = time.time()
+        total, acked = 0, []
+        # 토픽별로 따로 처리 → 한 토픽의 실패가 다른 토픽을 막지 않음
+        for topic, messages in by_topic.items():
+            n, done = _embed_topic(topic, messages)
+            total += n
+            acked.extend(done)
+        # 임베딩·캐시 저장이 끝난 메시지만 ACK (실패한 것은 pending으로 남아 다음 루프에서 재시도,
+        # EMBED_MAX_DELIVERIES번 넘게 실패하면 dead-letter 로 이동)
+        if acked:
+            redis_client.xack(EMBED_QUEUE_KEY, EMBED_GROUP, *acked)
+        print(f"✅ 임베딩 워커: {total}건 캐시 저장, {len(acked)}/{len(msg_ids)} 메시지 ACK ({time.time() - t0:.2f}s)")
+        if len(acked) < len(msg_ids):
+            time.sleep(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="신규 기사 선(先)임베딩 워커")
+    parser.add_argument("--batch-size", type=int, default=64, help="마이크로 배치 최대 기사 수 (default: 64)")
+    parser.add_argument("--max-wait", type=float, default=2.0, help="배치를 채우기 위해 기다리는 최대 초 (default: 2.0)")
+    parser.add_argument("--consumer", type=str, default=None, help="컨슈머 이름 (default: 호스트명)")
+    args = parser.parse_args()
+    run_worker(batch_size=args.batch_size, max_wait=args.max_wait, consumer=args.consumer)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,8 @@ from sqlalchemy.orm import Session
 from database.connection import SessionLocal
 from models.user import KnowledgeMap, User
 from models.scrap import PKeyword, PKeywordArticle
-from clustering.embedder import make_embeddings
+from clustering.keyword_store import get_keyword_vectors
 from clustering.keyword_extractor import get_top_keywords
-from sklearn.metrics.pairwise import cosine_similarity
 from redis import Redis
 import json
 from api.utils.cache import set_cache
@@ -45,10 +44,11 @@ def build_knowledge_map(user_id: int):
             pk.knowledge_map_id = knowledge_map.id
 
         # 5. 임베딩 및 유사도 계산
+        # 전역 키워드 벡터 저장소에서 조회 (없는 키워드만 모델로 계산), 정규화 벡터라 코사인 = 행렬 곱
         print("📍 Step 5: 임베딩 및 유사도 계산")
         keyword_texts = [kw.name for kw in top_keywords]
-        embeddings = make_embeddings(keyword_texts)
-        sim_matrix = cosine_similarity(embeddings)
+        embeddings = get_keyword_vectors(keyword_texts)
+        sim_matrix = embeddings @ embeddings.T
 
         # 6. 간선 생성 (dict로)
         print("📍 Step 6: 간선 생성")
@@ -0,0 +1,95 @@
+# tests/test_embedding_store.py
+# 역할: clustering.cache.EmbeddingStore (append-only memmap 저장소) 동작 확인
+# 실행: python -m pytest -q tests
+
+import numpy as np
+import pytest
+
+from clustering import cache
+from clustering.cache import EmbeddingStore
+
+DIM = 4
+
+
+def _vecs(ids):
+    """기사 ID마다 고유한 벡터 (id, id+0.25, ...)"""
+    ids = np.asarray(ids, dtype=np.float32)
+    return ids[:, None] + np.arange(DIM, dtype=np.float32) * 0.25
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    monkeypatch.setattr(cache, "EMB_STORE_SEGMENT_ROWS", 3)
+
+
+def test_append_lookup_reopen(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=DIM)
+    store.append([1, 2, 3, 4, 5], _vecs([1, 2, 3, 4, 5]))
+    assert len(store.meta["segments"]) == 2
+
+    ids, embs = EmbeddingStore(tmp_path, dim=DIM).lookup([5, 9, 2])
+    assert ids.tolist() == [5, 2]
+    np.testing.assert_array_equal(embs, _vecs([5, 2]))
+
+
+def test_latest_record_wins(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=DIM)
+    store.append([1, 2], _vecs([1, 2]))
+    store.append([1], _vecs([7]))
+    _, embs = store.lookup([1])
+    np.testing.assert_array_equal(embs, _vecs([7]))
+
+
+def test_compact_keeps_window_and_reopens(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=DIM)
+    store.append(range(1, 8), _vecs(range(1, 8)))
+    store.append([2], _vecs([20]))
+
+    removed = store.compact(keep_ids=[2, 6, 7])
+    assert removed == 5
+    assert store.meta["gen"] == 1
+    assert not (tmp_path / "g0_00000.f32").exists()
+
+    ids, embs = EmbeddingStore(tmp_path, dim=DIM).lookup(range(1, 8))
+    assert ids.tolist() == [2, 6, 7]
+    np.testing.assert_array_equal(embs, _vecs([20, 6, 7]))
+
+
+def test_maybe_compact_respects_ratio(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=DIM)
+    store.append(range(1, 5), _vecs(range(1, 5)))
+    assert store.maybe_compact(keep_ids=[1, 2, 3], ratio=0.5) == 0
+    assert store.maybe_compact(keep_ids=[1], ratio=0.5) == 3
+
+
+def test_stale_instances_see_each_other(tmp_path):
+    a = EmbeddingStore(tmp_path, dim=DIM)
+    b = EmbeddingStore(tmp_path, dim=DIM)
+    a.append([1, 2], _vecs([1, 2]))
+    b.append([3], _vecs([3]))
+    ids, embs = EmbeddingStore(tmp_path, dim=DIM).lookup([1, 2, 3])
+    assert ids.tolist() == [1, 2, 3]
+    np.testing.assert_array_equal(embs, _vecs([1, 2, 3]))
+
+    # 다른 인스턴스가 압축한 뒤에도 옛 인스턴스의 조회·추가가 새 세대를 씀
+    a.compact(keep_ids=[3])
+    assert b.lookup([1, 3])[0].tolist() == [3]
+    b.append([4], _vecs([4]))
+    ids, embs = a.lookup([3, 4])
+    np.testing.assert_array_equal(embs, _vecs([3, 4]))
+
+
+def test_torn_tails_are_truncated_before_append(tmp_path):
+    store = EmbeddingStore(tmp_path, dim=DIM)
+    store.append([1], _vecs([1]))
+    with open(tmp_path / store.meta["segments"][0], "ab") as f:
+        f.write(b"\x00" * 5)                  # 벡터 기록 도중 죽음
+    with open(tmp_path / store.meta["index"], "ab") as f:
+        f.write(b"\x01" * 7)                  # 인덱스 기록 도중 죽음
+
+    reopened = EmbeddingStore(tmp_path, dim=DIM)
+    reopened.append([2], _vecs([2]))
+    store.append([3], _vecs([3]))            # 열어 둔 채였던 인스턴스도 잘라낸 뒤 추가
+    ids, embs = EmbeddingStore(tmp_path, dim=DIM).lookup([1, 2, 3])
+    assert ids.tolist() == [1, 2, 3]
+    np.testing.assert_array_equal(embs, _vecs([1, 2, 3]))